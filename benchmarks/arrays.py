@@ -0,0 +1,86 @@
+"""
+Benchmarks for array storage, comparing packed storage with boxed lists.
+
+Run with `python -m benchmarks.arrays [-n ELEMENTS]`
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from cambridgeScript.interpreter import interpreter
+from cambridgeScript.interpreter.arrays import Array
+from cambridgeScript.interpreter.interpreter import Interpreter
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import parse_tokens
+from cambridgeScript.parser.parser import Parser
+
+PROGRAMS = {
+    "INTEGER fill+sum": """
+DECLARE a : ARRAY[1:{n}] OF INTEGER
+DECLARE i : INTEGER
+DECLARE total : INTEGER
+total <- 0
+FOR i <- 1 TO {n}
+    a[i] <- i * 3
+NEXT
+FOR i <- 1 TO {n}
+    total <- total + a[i]
+NEXT
+""",
+    "REAL 2D fill": """
+DECLARE g : ARRAY[1:{rows}, 1:1000] OF REAL
+DECLARE i : INTEGER
+DECLARE j : INTEGER
+FOR i <- 1 TO {rows}
+    FOR j <- 1 TO 1000
+        g[i, j] <- i / j
+    NEXT
+NEXT
+""",
+}
+
+
+class _BoxedArray(Array):
+    # Stores every element as a separate Python object, for comparison
+    def _allocate(self, size, default):
+        return [default] * size
+
+
+def _run(array_class: type[Array], code: str, trace: bool) -> tuple[float, int]:
+    program = Parser.parse_program(parse_tokens(code))
+    interpreter.Array = array_class
+    try:
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        Interpreter(VariableState()).visit(program)
+        elapsed = time.perf_counter() - start
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        else:
+            peak = 0
+    finally:
+        interpreter.Array = Array
+    return elapsed, peak
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", type=int, default=1_000_000, help="elements")
+    args = arg_parser.parse_args()
+    for name, template in PROGRAMS.items():
+        code = template.format(n=args.n, rows=max(args.n // 1000, 1))
+        boxed_time, _ = _run(_BoxedArray, code, trace=False)
+        packed_time, _ = _run(Array, code, trace=False)
+        _, boxed_peak = _run(_BoxedArray, code, trace=True)
+        _, packed_peak = _run(Array, code, trace=True)
+        print(
+            f"{name:<18} boxed {boxed_time:7.3f}s {boxed_peak / args.n:6.1f} B/elem  "
+            f"packed {packed_time:7.3f}s {packed_peak / args.n:6.1f} B/elem"
+        )
+
+
+if __name__ == "__main__":
+    main()
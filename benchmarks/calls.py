@@ -0,0 +1,80 @@
+"""
+Benchmarks for calls to library functions.
+
+Compares calls bound to their library function before execution with calls
+looked up by name every time they are made, and with calls to an equivalent
+user-defined function.
+
+Run with `python -m benchmarks.calls [-n CALLS]`
+"""
+
+import argparse
+import time
+
+from cambridgeScript.interpreter.interpreter import Interpreter
+from cambridgeScript.interpreter.library import BUILTINS
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import parse_tokens
+from cambridgeScript.parser.parser import Parser
+from cambridgeScript.syntax_tree import Identifier, Program
+
+PROGRAM = """
+DECLARE total : INTEGER
+DECLARE i : INTEGER
+total <- 0
+FOR i <- 1 TO {n}
+    total <- total + MOD(i, 7)
+NEXT
+OUTPUT total
+"""
+
+USER_PROGRAM = """
+FUNCTION remainder(a : INTEGER, b : INTEGER) RETURNS INTEGER
+    RETURN MOD(a, b)
+ENDFUNCTION
+DECLARE total : INTEGER
+DECLARE i : INTEGER
+total <- 0
+FOR i <- 1 TO {n}
+    total <- total + remainder(i, 7)
+NEXT
+OUTPUT total
+"""
+
+
+class _LookupInterpreter(Interpreter):
+    # Interpreter that finds library functions by name at each call
+    def visit_program(self, stmt: Program) -> None:
+        self.visit_statements(stmt.statements)
+
+    def visit_function_call(self, expr):
+        if isinstance(expr.function, Identifier):
+            name = expr.function.token.value
+            if name not in self.global_state.functions and name in BUILTINS:
+                args = [self.visit(param) for param in expr.params]
+                return BUILTINS[name].function(*args)
+        return super().visit_function_call(expr)
+
+
+def _time(interpreter_class: type[Interpreter], code: str) -> float:
+    program = Parser.parse_program(parse_tokens(code))
+    start = time.perf_counter()
+    interpreter_class(VariableState()).visit(program)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", type=int, default=200_000, help="calls")
+    args = arg_parser.parse_args()
+    lookup = _time(_LookupInterpreter, PROGRAM.format(n=args.n))
+    bound = _time(Interpreter, PROGRAM.format(n=args.n))
+    user = _time(Interpreter, USER_PROGRAM.format(n=args.n))
+    print(
+        f"lookup {lookup:8.3f}s  bound {bound:8.3f}s  "
+        f"user-defined {user:8.3f}s  speedup {lookup / bound:5.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmarks for the cost of recording coverage.
+
+Compares running a program with and without a Coverage installed, on both
+the recursive and the stack interpreter.
+
+Run with `python -m benchmarks.coverage [-n ITERATIONS] [-r REPEATS]`
+"""
+
+import argparse
+import time
+
+from cambridgeScript.api import compile_program
+from cambridgeScript.interpreter.console import OutputWriter
+from cambridgeScript.interpreter.coverage import Coverage
+from cambridgeScript.interpreter.interpreter import Interpreter
+from cambridgeScript.interpreter.stack import StackInterpreter
+from cambridgeScript.interpreter.variables import VariableState
+
+PROGRAM = """
+FUNCTION step(x : INTEGER) RETURNS INTEGER
+    IF x > 500 THEN
+        RETURN x - 500
+    ENDIF
+    RETURN MOD(x * 31 + 7, 1000)
+ENDFUNCTION
+DECLARE total : INTEGER
+DECLARE i : INTEGER
+total <- 0
+FOR i <- 1 TO {n}
+    IF MOD(i, 3) = 0 THEN
+        total <- total + 1
+    ELSE
+        total <- total - 1
+    ENDIF
+NEXT
+i <- 0
+WHILE i < {n} DO
+    total <- step(total + i)
+    i <- i + 1
+ENDWHILE
+OUTPUT total
+"""
+
+
+def _time(cls: type[Interpreter], code: str, record: bool) -> float:
+    interpreter = cls(VariableState(), output=OutputWriter.to_bytes())
+    program = compile_program(code)
+    if record:
+        Coverage(program).install(interpreter)
+    start = time.perf_counter()
+    interpreter.visit(program)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", type=int, default=20_000, help="iterations")
+    arg_parser.add_argument("-r", type=int, default=5, help="repeats")
+    args = arg_parser.parse_args()
+    code = PROGRAM.format(n=args.n)
+    for cls in (Interpreter, StackInterpreter):
+        # Best of several runs, taken in turns and alternating which goes
+        # first, so that changes in the speed of the machine affect both
+        best = [float("inf"), float("inf")]
+        for repeat in range(args.r):
+            order = (False, True) if repeat % 2 else (True, False)
+            for record in order:
+                best[record] = min(best[record], _time(cls, code, record))
+        plain, recorded = best
+        print(
+            f"{cls.__name__:<20} plain {plain:8.3f}s  coverage {recorded:8.3f}s "
+            f"({recorded / plain - 1:+.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmarks for reading files line by line.
+
+Compares Python's own file iteration with the file reader used by READFILE,
+and with a program reading the file with READFILE.
+
+Run with `python -m benchmarks.files [-n LINES]`
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from cambridgeScript.interpreter.files import FileReader
+from cambridgeScript.interpreter.interpreter import Interpreter
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import parse_tokens
+from cambridgeScript.parser.parser import Parser
+
+PROGRAM = """
+DECLARE line : STRING
+DECLARE count : INTEGER
+count <- 0
+OPENFILE "{path}" FOR READ
+WHILE NOT EOF("{path}") DO
+    READFILE "{path}", line
+    count <- count + 1
+ENDWHILE
+CLOSEFILE "{path}"
+OUTPUT count
+"""
+
+
+def _native(path: str) -> float:
+    start = time.perf_counter()
+    with open(path, encoding="utf-8") as file:
+        for _ in file:
+            pass
+    return time.perf_counter() - start
+
+
+def _reader(path: str) -> float:
+    start = time.perf_counter()
+    reader = FileReader(path)
+    while reader.read_line() is not None:
+        pass
+    reader.close()
+    return time.perf_counter() - start
+
+
+def _program(path: str) -> float:
+    program = Parser.parse_program(parse_tokens(PROGRAM.format(path=path)))
+    start = time.perf_counter()
+    Interpreter(VariableState()).visit(program)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", type=int, default=2_000_000, help="lines")
+    args = arg_parser.parse_args()
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+        file.writelines(f"record {i},{i * 7},{i % 13}\n" for i in range(args.n))
+    try:
+        megabytes = os.path.getsize(file.name) / 1e6
+        results = {
+            "native": _native(file.name),
+            "reader": _reader(file.name),
+            "READFILE": _program(file.name),
+        }
+    finally:
+        os.remove(file.name)
+    print(
+        "  ".join(
+            f"{name} {seconds:7.3f}s ({megabytes / seconds:7.1f} MB/s)"
+            for name, seconds in results.items()
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
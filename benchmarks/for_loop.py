@@ -0,0 +1,67 @@
+"""
+Benchmarks for integer FOR loops.
+
+Run with `python -m benchmarks.for_loop [-n ITERATIONS]`
+"""
+
+import argparse
+import time
+
+from cambridgeScript.interpreter.interpreter import Interpreter
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import parse_tokens
+from cambridgeScript.parser.parser import Parser
+
+PROGRAMS = {
+    "empty body": """
+DECLARE i : INTEGER
+FOR i <- 1 TO {n}
+NEXT
+""",
+    "assignment body": """
+DECLARE i : INTEGER
+DECLARE x : INTEGER
+FOR i <- 1 TO {n}
+    x <- i
+NEXT
+""",
+    "descending step": """
+DECLARE i : INTEGER
+DECLARE x : INTEGER
+FOR i <- {n} TO 1 STEP -1
+    x <- i
+NEXT
+""",
+}
+
+
+class _GenericLoopInterpreter(Interpreter):
+    # Interpreter with the integer fast path disabled, for comparison
+    def _is_simple_loop(self, stmt) -> bool:
+        return False
+
+
+def _time(interpreter_class: type[Interpreter], code: str) -> float:
+    program = Parser.parse_program(parse_tokens(code))
+    interpreter = interpreter_class(VariableState())
+    start = time.perf_counter()
+    interpreter.visit(program)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", type=int, default=10_000_000, help="iterations")
+    args = arg_parser.parse_args()
+    for name, template in PROGRAMS.items():
+        code = template.format(n=args.n)
+        generic = _time(_GenericLoopInterpreter, code)
+        fast = _time(Interpreter, code)
+        print(
+            f"{name:<16} generic {generic:8.3f}s  "
+            f"fast {fast:8.3f}s  speedup {generic / fast:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
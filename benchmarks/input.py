@@ -0,0 +1,71 @@
+"""
+Benchmarks for programs reading many lines of input.
+
+Compares calling input() for every INPUT statement with the block-reading
+input reader, with stdin redirected from a temporary file.
+
+Run with `python -m benchmarks.input [-n LINES]`
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from cambridgeScript.interpreter.console import OutputWriter, parse_value
+from cambridgeScript.interpreter.interpreter import Interpreter
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import parse_tokens
+from cambridgeScript.parser.parser import Parser
+
+PROGRAM = """
+DECLARE total : INTEGER
+DECLARE value : INTEGER
+DECLARE i : INTEGER
+total <- 0
+FOR i <- 1 TO {n}
+    INPUT value
+    total <- total + value
+NEXT
+OUTPUT total
+"""
+
+
+class _LineInputInterpreter(Interpreter):
+    # Interpreter calling input() for each line, for comparison
+    def visit_input(self, stmt) -> None:
+        self.output.flush()
+        value = parse_value(input(), self._declared_type(stmt.variable))
+        self._assign(stmt.variable, value)
+
+
+def _time(interpreter_class: type[Interpreter], code: str, path: str) -> float:
+    program = Parser.parse_program(parse_tokens(code))
+    with open(path) as stdin:
+        sys.stdin = stdin
+        try:
+            start = time.perf_counter()
+            interpreter_class(VariableState(), output=OutputWriter()).visit(program)
+            return time.perf_counter() - start
+        finally:
+            sys.stdin = sys.__stdin__
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", type=int, default=500_000, help="lines")
+    args = arg_parser.parse_args()
+    code = PROGRAM.format(n=args.n)
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+        file.writelines(f"{i}\n" for i in range(args.n))
+    try:
+        line = _time(_LineInputInterpreter, code, file.name)
+        block = _time(Interpreter, code, file.name)
+    finally:
+        os.remove(file.name)
+    print(f"input() {line:8.3f}s  blocks {block:8.3f}s  speedup {line / block:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmarks for programs writing many lines of output.
+
+Compares printing every line with the buffered output writer, writing to
+os.devnull so that the terminal doesn't dominate the timings.
+
+Run with `python -m benchmarks.output [-n LINES]`
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from cambridgeScript.interpreter.console import FlushPolicy, OutputWriter
+from cambridgeScript.interpreter.interpreter import Interpreter
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import parse_tokens
+from cambridgeScript.parser.parser import Parser
+
+PROGRAM = """
+DECLARE i : INTEGER
+FOR i <- 1 TO {n}
+    OUTPUT "line ", i
+NEXT
+"""
+
+
+class _PrintInterpreter(Interpreter):
+    # Interpreter printing each line, for comparison
+    def _output(self, values) -> None:
+        print("".join(map(str, values)))
+
+
+def _time(interpreter: Interpreter, code: str) -> float:
+    program = Parser.parse_program(parse_tokens(code))
+    start = time.perf_counter()
+    interpreter.visit(program)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", type=int, default=500_000, help="lines")
+    args = arg_parser.parse_args()
+    code = PROGRAM.format(n=args.n)
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        # Unbuffered like a pipe to a process reading line by line
+        sys.stdout = open(devnull.fileno(), "w", buffering=1, closefd=False)
+        try:
+            results["print"] = _time(_PrintInterpreter(VariableState()), code)
+        finally:
+            sys.stdout.close()
+            sys.stdout = sys.__stdout__
+        for policy in FlushPolicy:
+            interpreter = Interpreter(
+                VariableState(), output=OutputWriter(devnull, policy)
+            )
+            results[policy.value] = _time(interpreter, code)
+    print("  ".join(f"{name} {seconds:8.3f}s" for name, seconds in results.items()))
+
+
+if __name__ == "__main__":
+    main()
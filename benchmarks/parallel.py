@@ -0,0 +1,58 @@
+"""
+Benchmarks for running FOR loops with independent iterations in parallel.
+
+Run with `python -m benchmarks.parallel [-n ITERATIONS] [-w WORKERS]`
+"""
+
+import argparse
+import os
+import time
+
+from cambridgeScript.interpreter.interpreter import Interpreter
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import parse_tokens
+from cambridgeScript.parser.parser import Parser
+
+PROGRAM = """
+DECLARE position : ARRAY[1:{n}] OF REAL
+DECLARE speed : ARRAY[1:{n}] OF REAL
+DECLARE i : INTEGER
+DECLARE drag : REAL
+drag <- 0.01
+FOR i <- 1 TO {n}
+    speed[i] <- MOD(i, 17) * 0.25
+NEXT
+FOR i <- 1 TO {n}
+    IF speed[i] > 2 THEN
+        position[i] <- speed[i] * 20 - drag * speed[i] * speed[i] * 200
+    ELSE
+        position[i] <- speed[i] * 20
+    ENDIF
+NEXT
+OUTPUT position[{n}]
+"""
+
+
+def _time(code: str, workers: int) -> float:
+    program = Parser.parse_program(parse_tokens(code))
+    start = time.perf_counter()
+    Interpreter(VariableState(), workers=workers).visit(program)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", type=int, default=200_000, help="iterations")
+    arg_parser.add_argument("-w", type=int, default=os.cpu_count(), help="workers")
+    args = arg_parser.parse_args()
+    code = PROGRAM.format(n=args.n)
+    sequential = _time(code, 0)
+    parallel = _time(code, args.w)
+    print(
+        f"sequential {sequential:8.3f}s  {args.w} workers {parallel:8.3f}s  "
+        f"speedup {sequential / parallel:5.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmarks for many interactive sessions on one event loop.
+
+Starts a number of sessions sharing one compiled program, measures the memory
+held by each session while it waits for input, then feeds every session and
+times how long it takes them all to finish.
+
+Run with `python -m benchmarks.sessions [-n SESSIONS]`
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from cambridgeScript.api import compile_program
+from cambridgeScript.sessions import Session
+
+PROGRAM = """
+DECLARE guess : INTEGER
+DECLARE tries : INTEGER
+DECLARE i : INTEGER
+DECLARE total : INTEGER
+tries <- 0
+REPEAT
+    OUTPUT "Guess?"
+    INPUT guess
+    tries <- tries + 1
+    total <- 0
+    FOR i <- 1 TO 200
+        total <- total + i * guess
+    NEXT
+UNTIL guess = 42
+OUTPUT "Found in ", tries, " tries"
+"""
+
+
+async def _main(count: int) -> None:
+    program = compile_program(PROGRAM)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [Session(program) for _ in range(count)]
+    tasks = [asyncio.create_task(session.run()) for session in sessions]
+    while not all(session.waiting_for_input for session in sessions):
+        await asyncio.sleep(0)
+    per_session = (tracemalloc.get_traced_memory()[0] - before) / count
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for session in sessions:
+        session.send_input("7\n13\n42\n")
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    assert all(session.error is None for session in sessions)
+    print(
+        f"{count} sessions  {per_session / 1024:6.1f} KiB per waiting session  "
+        f"{elapsed:7.3f}s to finish"
+    )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", type=int, default=2000, help="sessions")
+    args = arg_parser.parse_args()
+    asyncio.run(_main(args.n))
+
+
+if __name__ == "__main__":
+    main()
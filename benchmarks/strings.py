@@ -0,0 +1,51 @@
+"""
+Benchmarks for building strings by repeated concatenation.
+
+Run with `python -m benchmarks.strings [-n APPENDS]`
+"""
+
+import argparse
+import time
+
+from cambridgeScript.interpreter.interpreter import Interpreter
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import parse_tokens
+from cambridgeScript.parser.parser import Parser
+
+PROGRAM = """
+DECLARE s : STRING
+DECLARE i : INTEGER
+s <- ""
+FOR i <- 1 TO {n}
+    s <- s + "line of output" + "\\n"
+NEXT
+OUTPUT LENGTH(s)
+"""
+
+
+class _PlainStringInterpreter(Interpreter):
+    # Interpreter that never uses ropes, for comparison
+    @staticmethod
+    def _is_append(stmt) -> bool:
+        return False
+
+
+def _time(interpreter_class: type[Interpreter], code: str) -> float:
+    program = Parser.parse_program(parse_tokens(code))
+    start = time.perf_counter()
+    interpreter_class(VariableState()).visit(program)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", type=int, default=100_000, help="appends")
+    args = arg_parser.parse_args()
+    code = PROGRAM.format(n=args.n)
+    plain = _time(_PlainStringInterpreter, code)
+    rope = _time(Interpreter, code)
+    print(f"str {plain:8.3f}s  rope {rope:8.3f}s  speedup {plain / rope:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Benchmark suite timing each phase of running the programs in
+benchmarks/corpus: lexing (parse_tokens), parsing (Parser.parse_program) and
+execution (Interpreter.visit, with output kept in memory).
+
+run writes the time of every repetition as JSON. compare flags the phases of
+a second result set that are slower than in the first by more than a
+threshold, where a one-sided Mann-Whitney U test shows the difference isn't
+noise, and exits with status 1 if there are any. The test is approximated
+with a normal distribution, so it needs at least 5 repetitions on each side.
+
+Run with
+    python -m benchmarks.suite run [-w WARMUP] [-r REPEATS] [-o FILE] [NAME...]
+    python -m benchmarks.suite compare BASE NEW [--threshold T] [--alpha A]
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from statistics import NormalDist, median
+
+from cambridgeScript.interpreter.console import OutputWriter
+from cambridgeScript.interpreter.interpreter import Interpreter
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import parse_tokens
+from cambridgeScript.parser.parser import Parser
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus")
+PHASES = ("lex", "parse", "execute")
+
+
+def load_corpus(names: list[str] | None = None) -> dict[str, str]:
+    """Read the programs of the corpus by name, all of them by default"""
+    if not names:
+        names = sorted(
+            os.path.splitext(entry)[0]
+            for entry in os.listdir(CORPUS)
+            if entry.endswith(".txt")
+        )
+    programs = {}
+    for name in names:
+        with open(os.path.join(CORPUS, name + ".txt")) as file:
+            programs[name] = file.read()
+    return programs
+
+
+def time_phases(code: str) -> tuple[float, float, float]:
+    """Time lexing, parsing and executing a program once, in seconds"""
+    start = time.perf_counter()
+    tokens = parse_tokens(code)
+    lexed = time.perf_counter()
+    program = Parser.parse_program(tokens)
+    parsed = time.perf_counter()
+    Interpreter(VariableState(), output=OutputWriter.to_bytes()).visit(program)
+    return lexed - start, parsed - lexed, time.perf_counter() - parsed
+
+
+def run_suite(programs: dict[str, str], warmup: int = 2, repeats: int = 10) -> dict:
+    """
+    Time the phases of each program.
+    :param programs: source code by name
+    :param warmup: untimed runs of each program first
+    :param repeats: timed runs of each program
+    :return: the settings, and the times of each phase of each program
+    """
+    for _ in range(warmup):
+        for code in programs.values():
+            time_phases(code)
+    results = {name: {phase: [] for phase in PHASES} for name in programs}
+    # Programs are taken in turns, so that changes in the speed of the
+    # machine affect each of them equally
+    for _ in range(repeats):
+        for name, code in programs.items():
+            gc.collect()
+            for phase, seconds in zip(PHASES, time_phases(code)):
+                results[name][phase].append(seconds)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "warmup": warmup,
+        "repeats": repeats,
+        "results": results,
+    }
+
+
+def mann_whitney(sample: list[float], other: list[float]) -> float:
+    """
+    Get the p-value of a one-sided Mann-Whitney U test that the values of a
+    sample tend to be larger than those of another, using the normal
+    approximation with a correction for ties.
+    """
+    values = sorted(
+        [(value, True) for value in sample] + [(value, False) for value in other]
+    )
+    n1, n2 = len(sample), len(other)
+    n = n1 + n2
+    # Sum of the ranks (from 1) of the sample, ties getting their mean rank
+    rank_sum = 0.0
+    ties = 0.0
+    start = 0
+    while start < n:
+        end = start
+        while end + 1 < n and values[end + 1][0] == values[start][0]:
+            end += 1
+        count = end - start + 1
+        rank = (start + end) / 2 + 1
+        rank_sum += rank * sum(values[i][1] for i in range(start, end + 1))
+        ties += count**3 - count
+        start = end + 1
+    u = rank_sum - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance == 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / variance**0.5
+    return 1 - NormalDist().cdf(z)
+
+
+def compare(
+    base: dict, new: dict, threshold: float = 0.05, alpha: float = 0.05
+) -> list[dict]:
+    """
+    Compare the phases of the programs in two result sets.
+    :param base: results of run_suite() to compare with
+    :param new: results of run_suite() to check
+    :param threshold: relative change in the median time to ignore
+    :param alpha: significance level of the test
+    :return: for each program and phase in both, the median times, relative
+        change, p-values, and status "slower", "faster" or "same"
+    """
+    rows = []
+    for name, phases in new["results"].items():
+        if name not in base["results"]:
+            continue
+        for phase in PHASES:
+            before = base["results"][name][phase]
+            after = phases[phase]
+            change = median(after) / median(before) - 1
+            slower = mann_whitney(after, before)
+            faster = mann_whitney(before, after)
+            if change > threshold and slower < alpha:
+                status = "slower"
+            elif change < -threshold and faster < alpha:
+                status = "faster"
+            else:
+                status = "same"
+            rows.append(
+                {
+                    "name": name,
+                    "phase": phase,
+                    "base": median(before),
+                    "new": median(after),
+                    "change": change,
+                    "p": min(slower, faster),
+                    "status": status,
+                }
+            )
+    return rows
+
+
+def _run(args: argparse.Namespace) -> int:
+    report = run_suite(load_corpus(args.names), args.warmup, args.repeats)
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    for name, phases in report["results"].items():
+        times = "  ".join(
+            f"{phase} {median(phases[phase]) * 1000:9.3f}ms" for phase in PHASES
+        )
+        print(f"{name:<15} {times}", file=sys.stderr)
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    with open(args.base) as file:
+        base = json.load(file)
+    with open(args.new) as file:
+        new = json.load(file)
+    rows = compare(base, new, args.threshold, args.alpha)
+    print(
+        f"{'Program':<15} {'Phase':<8} {'Base ms':>10} {'New ms':>10} "
+        f"{'Change':>8} {'p':>7}"
+    )
+    for row in rows:
+        flag = {"slower": "  REGRESSION", "faster": "  improved"}.get(row["status"], "")
+        print(
+            f"{row['name']:<15} {row['phase']:<8} {row['base'] * 1000:>10.3f} "
+            f"{row['new'] * 1000:>10.3f} {row['change']:>+8.1%} {row['p']:>7.4f}{flag}"
+        )
+    return 1 if any(row["status"] == "slower" for row in rows) else 0
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark suite for the corpus")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="time the programs of the corpus")
+    run_parser.add_argument("names", nargs="*", help="programs to run, by default all")
+    run_parser.add_argument("-w", "--warmup", type=int, default=2, help="untimed runs")
+    run_parser.add_argument("-r", "--repeats", type=int, default=10, help="timed runs")
+    run_parser.add_argument("-o", "--output", metavar="FILE", help="write JSON to FILE")
+    compare_parser = commands.add_parser(
+        "compare", help="flag significant regressions between two result sets"
+    )
+    compare_parser.add_argument("base", help="results to compare with")
+    compare_parser.add_argument("new", help="results to check")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.05,
+        help="relative change in median time to ignore (default 0.05)",
+    )
+    compare_parser.add_argument(
+        "--alpha", type=float, default=0.05, help="significance level (default 0.05)"
+    )
+    args = arg_parser.parse_args()
+    if args.command == "run":
+        sys.exit(_run(args))
+    sys.exit(_compare(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmarks for the cost of tracing hooks.
+
+Compares the interpreter from before the hook API was added (by default the
+parent of the commit adding tracing.py) with the current one: never hooked,
+with a hook installed and removed again, and running with a hook that does
+nothing. Without a hook, the current interpreter should only differ from the
+baseline by noise.
+
+The baseline is extracted from git into a temporary directory, so every run
+is timed in a separate process, importing the interpreter from either tree.
+
+Run with
+    python -m benchmarks.tracing [-n ITERATIONS] [-r REPEATS] [--baseline REF]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from statistics import median
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAM = """
+FUNCTION step(x : INTEGER) RETURNS INTEGER
+    RETURN MOD(x * 31 + 7, 1000)
+ENDFUNCTION
+DECLARE total : INTEGER
+DECLARE i : INTEGER
+total <- 0
+i <- 0
+WHILE i < {n} DO
+    total <- step(total + i)
+    i <- i + 1
+ENDWHILE
+OUTPUT total
+"""
+
+# Run in a separate process with the program on stdin and the setup as its
+# argument, printing the seconds taken
+_TIMER = """
+import sys
+import time
+
+from cambridgeScript.api import compile_program
+from cambridgeScript.interpreter.console import OutputWriter
+from cambridgeScript.interpreter.stack import StackInterpreter
+from cambridgeScript.interpreter.variables import VariableState
+
+
+def hook(event, line, state, arg):
+    pass
+
+
+setup = sys.argv[1]
+interpreter = StackInterpreter(VariableState(), output=OutputWriter.to_bytes())
+if setup != "plain":
+    from cambridgeScript.interpreter.tracing import set_trace
+
+    set_trace(interpreter, hook)
+    if setup == "removed":
+        set_trace(interpreter, None)
+program = compile_program(sys.stdin.read())
+start = time.perf_counter()
+interpreter.visit(program)
+print(time.perf_counter() - start)
+"""
+
+
+def _git(*args: str) -> bytes:
+    result = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, check=True)
+    return result.stdout
+
+
+def _default_baseline() -> str:
+    # The commit before tracing.py was added
+    added = _git(
+        "log",
+        "--diff-filter=A",
+        "--format=%H",
+        "--",
+        "cambridgeScript/interpreter/tracing.py",
+    ).split()
+    return added[-1].decode() + "^"
+
+
+def _extract(ref: str, directory: str) -> None:
+    archive = _git("archive", "--format=tar", ref, "cambridgeScript")
+    subprocess.run(["tar", "-x", "-C", directory], input=archive, check=True)
+
+
+def _time(tree: str, setup: str, code: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", _TIMER, setup],
+        input=code,
+        capture_output=True,
+        check=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": tree},
+    )
+    return float(result.stdout)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("-n", type=int, default=50_000, help="iterations")
+    arg_parser.add_argument("-r", type=int, default=10, help="repeats")
+    arg_parser.add_argument(
+        "--baseline",
+        metavar="REF",
+        help="revision without the hook API, by default the one before it",
+    )
+    args = arg_parser.parse_args()
+    code = PROGRAM.format(n=args.n)
+    with tempfile.TemporaryDirectory() as baseline:
+        _extract(args.baseline or _default_baseline(), baseline)
+        runs = [
+            ("baseline", baseline, "plain"),
+            ("no hook", ROOT, "plain"),
+            ("hook removed", ROOT, "removed"),
+            ("no-op hook", ROOT, "traced"),
+        ]
+        # Runs are taken in turns, and compared with the baseline run of the
+        # same turn, so that changes in the speed of the machine cancel out
+        times = [[] for _ in runs]
+        for _ in range(args.r):
+            for i, (_, tree, setup) in enumerate(runs):
+                times[i].append(_time(tree, setup, code))
+    for (name, _, _), seconds in zip(runs, times):
+        change = median(t / base for t, base in zip(seconds, times[0])) - 1
+        print(f"{name:<13} {median(seconds):8.3f}s ({change:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,10 @@
-# import click
-#
-# from .interpreter.programs import Program
-#
-#
-# @click.group(invoke_without_command=True)
-# @click.pass_context
-# def cli(ctx: click.Context):
-#     if ctx.invoked_subcommand:
-#         return
-#
-#     click.echo("REPL is under construction")
-#
-#
-# @cli.command()
-# @click.argument("file", type=click.File())
-# def run(file):
-#     code = file.read()
-#     code += "\n"
-#     program = Program.from_code(code)
-#     program.execute()
+import argparse
+import json
+import sys
 
 
-if __name__ == "__main__":
-    # cli()
+def _debug_run() -> None:
+    # Runs the program on stdin, printing its tokens and syntax tree
     from cambridgeScript.parser.lexer import parse_tokens
     from cambridgeScript.parser.parser import Parser
     from cambridgeScript.interpreter.variables import VariableState
@@ -35,3 +17,140 @@ if __name__ == "__main__":
     print(parsed)
     interpreter = Interpreter(VariableState())
     interpreter.visit(parsed)
+    print(f"Eliminated bounds checks: {interpreter.eliminated_checks}")
+
+
+def _test(args: argparse.Namespace) -> int:
+    from cambridgeScript.api import Limits
+    from cambridgeScript.testing import run_tests
+
+    with open(args.program) as file:
+        code = file.read()
+    report = run_tests(
+        code,
+        args.cases,
+        args.workers,
+        Limits(
+            max_steps=args.max_steps,
+            time_limit=args.time_limit,
+            max_memory=args.max_memory,
+            track_memory=True,
+        ),
+        cache_directory=args.cache,
+        coverage=args.coverage is not None or args.coverage_listing is not None,
+    )
+    report["program"] = args.program
+    coverage = report.pop("coverage", None)
+    if args.coverage is not None:
+        with open(args.coverage, "w") as file:
+            json.dump(coverage, file, indent=2)
+    if args.coverage_listing is not None:
+        from cambridgeScript.interpreter.coverage import write_listing
+
+        with open(args.coverage_listing, "w") as file:
+            write_listing(coverage, code, file)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    return 0 if report["failed"] == 0 else 1
+
+
+def _profile(args: argparse.Namespace) -> int:
+    from cambridgeScript.api import compile_program
+    from cambridgeScript.interpreter.interpreter import InterpreterError
+    from cambridgeScript.interpreter.profiler import (
+        AllocationProfiler,
+        ProfilingInterpreter,
+    )
+    from cambridgeScript.interpreter.variables import VariableState
+
+    with open(args.program) as file:
+        code = file.read()
+    if args.memory:
+        interpreter = AllocationProfiler(VariableState())
+    else:
+        interpreter = ProfilingInterpreter(VariableState())
+    status = 0
+    try:
+        interpreter.visit(compile_program(code))
+    except InterpreterError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        status = 1
+    print(file=sys.stderr)
+    if args.memory:
+        interpreter.write_report(code, sys.stderr, args.top)
+        return status
+    interpreter.write_listing(code, sys.stderr)
+    if args.collapsed is not None:
+        with open(args.collapsed, "w") as file:
+            interpreter.write_collapsed(file)
+    return status
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(
+        prog="cambridgeScript",
+        description="Without a command, runs the program on stdin in debug mode",
+    )
+    commands = arg_parser.add_subparsers(dest="command")
+    test_parser = commands.add_parser(
+        "test", help="run a program against a directory of test cases"
+    )
+    test_parser.add_argument("program", help="the program to test")
+    test_parser.add_argument(
+        "cases", help="directory of NAME.in and NAME.out files"
+    )
+    test_parser.add_argument(
+        "-j", "--workers", type=int, default=None, help="number of processes"
+    )
+    test_parser.add_argument(
+        "--cache",
+        metavar="DIR",
+        help="reuse the results of a deterministic program cached in DIR",
+    )
+    test_parser.add_argument(
+        "--max-steps", type=int, help="loop iterations and calls per case"
+    )
+    test_parser.add_argument(
+        "--time-limit", type=float, help="seconds each case may run for"
+    )
+    test_parser.add_argument(
+        "--max-memory", type=int, help="bytes of strings and arrays per case"
+    )
+    test_parser.add_argument(
+        "--coverage",
+        metavar="FILE",
+        help="write the statements and branches run by the cases to FILE as JSON",
+    )
+    test_parser.add_argument(
+        "--coverage-listing",
+        metavar="FILE",
+        help="write the source annotated with its coverage to FILE",
+    )
+    profile_parser = commands.add_parser(
+        "profile",
+        help="run a program on stdin, then show the time spent on each line",
+    )
+    profile_parser.add_argument("program", help="the program to profile")
+    profile_parser.add_argument(
+        "--collapsed",
+        metavar="FILE",
+        help="also write collapsed stacks for flamegraph tools to FILE",
+    )
+    profile_parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="show the lines allocating the most memory instead of time",
+    )
+    profile_parser.add_argument(
+        "--top", type=int, default=10, help="number of lines shown with --memory"
+    )
+    args = arg_parser.parse_args()
+    if args.command == "test":
+        sys.exit(_test(args))
+    if args.command == "profile":
+        sys.exit(_profile(args))
+    _debug_run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+API for running programs from other Python code.
+
+Every run gets its own interpreter, variables, I/O streams, files and random
+number generator, so any number of programs can run at the same time in one
+process, e.g. on the threads of a ProgramRunner.
+"""
+
+__all__ = [
+    "Limits",
+    "RunResult",
+    "compile_program",
+    "run",
+    "ProgramRunner",
+]
+
+import random
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, TextIO
+
+from cambridgeScript.cache import (
+    CachedResult,
+    ResultCache,
+    is_deterministic,
+    program_hash,
+)
+from cambridgeScript.interpreter.console import InputReader, OutputWriter
+from cambridgeScript.interpreter.coverage import Coverage
+from cambridgeScript.interpreter.files import FileTable
+from cambridgeScript.interpreter.interpreter import InterpreterError, LimitExceeded
+from cambridgeScript.interpreter.resolver import resolve_builtins
+from cambridgeScript.interpreter.stack import StackInterpreter
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import parse_tokens
+from cambridgeScript.parser.parser import Parser
+from cambridgeScript.syntax_tree import Program
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Resources a single run may use"""
+
+    # Maximum number of nested calls, None for no limit
+    max_call_depth: int | None = 10_000
+    # Number of results of pure functions to cache
+    memo_size: int = 0
+    # Processes to run independent loop iterations on, 0 for none
+    workers: int = 0
+    # Number of loop iterations and calls allowed, None for no limit
+    max_steps: int | None = None
+    # Seconds a run may take, None for no limit. Not used by sessions, which
+    # spend most of their time waiting for input
+    time_limit: float | None = None
+    # Bytes the strings and arrays of a run may use, None for no limit
+    max_memory: int | None = None
+    # Whether to report the peak memory used by runs without a memory limit
+    track_memory: bool = False
+
+
+@dataclass
+class RunResult:
+    # Output of the program, None if it was written to a supplied stream
+    output: bytes | None
+    # The error that stopped the program, if any
+    error: InterpreterError | None = None
+    # Most bytes used by strings and arrays at once, None if not tracked
+    peak_memory: int | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def compile_program(code: str) -> Program:
+    """
+    Parse a program so it can be run any number of times, from any thread.
+    :raises ParserError: if the program is invalid
+    """
+    program = Parser.parse_program(parse_tokens(code))
+    # Done once here, so runs sharing the program don't modify it
+    resolve_builtins(program)
+    return program
+
+
+def _input_reader(stdin: str | bytes | TextIO | BinaryIO | None) -> InputReader:
+    if stdin is None:
+        return InputReader.from_bytes(b"")
+    if isinstance(stdin, str):
+        return InputReader.from_bytes(stdin.encode())
+    if isinstance(stdin, bytes):
+        return InputReader.from_bytes(stdin)
+    return InputReader(stdin)
+
+
+class _RecordedOutput:
+    # Binary stream passing output on to another stream and keeping a copy
+
+    def __init__(self, stream: TextIO | BinaryIO, limit: int):
+        self._stream = stream
+        self._limit = limit
+        self._chunks: list[bytes] = []
+        self._size = 0
+        # Whether the output was too large to keep
+        self.overflowed = False
+
+    def write(self, data: bytes) -> None:
+        if not self.overflowed:
+            self._size += len(data)
+            self._chunks.append(data)
+            if self._size > self._limit:
+                self.overflowed = True
+                self._chunks.clear()
+        _write_bytes(self._stream, data)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+    def getvalue(self) -> bytes:
+        return b"".join(self._chunks)
+
+
+def _write_bytes(stream: TextIO | BinaryIO, data: bytes) -> None:
+    if hasattr(stream, "encoding"):
+        stream.write(data.decode())
+    else:
+        stream.write(data)
+    stream.flush()
+
+
+def _read_input(stdin: str | bytes | TextIO | BinaryIO | None) -> bytes:
+    # Reads all of the input, which is needed to look up cached results
+    if stdin is None:
+        return b""
+    if not isinstance(stdin, (str, bytes)):
+        stdin = stdin.read()
+    return stdin.encode() if isinstance(stdin, str) else stdin
+
+
+def _settings_key(limits: Limits) -> str:
+    # The limits which can change the result of a run
+    return repr(
+        (
+            limits.max_call_depth,
+            limits.max_steps,
+            limits.max_memory,
+            limits.track_memory,
+        )
+    )
+
+
+def run(
+    program: str | Program,
+    stdin: str | bytes | TextIO | BinaryIO | None = None,
+    stdout: TextIO | BinaryIO | None = None,
+    limits: Limits | None = None,
+    *,
+    seed: int | None = None,
+    directory: str | None = None,
+    cache: ResultCache | None = None,
+    coverage: Coverage | None = None,
+) -> RunResult:
+    """
+    Run a program in isolation.
+    :param program: the source code, or a program from compile_program()
+    :param stdin: the input of the program, none by default
+    :param stdout: stream to write the output to, by default it's returned
+    :param limits: resources the program may use
+    :param seed: seed for RANDOM, by default it's unpredictable
+    :param directory: directory the program's files are relative to
+    :param cache: where to look up and store the results of deterministic
+        programs, None to always run the program
+    :param coverage: coverage of the program to add this run to, results are
+        never taken from the cache while recording coverage
+    :return: the output and error of the program
+    :raises ParserError: if the source code is invalid
+    """
+    if isinstance(program, str):
+        program = compile_program(program)
+    if limits is None:
+        limits = Limits()
+    if cache is not None and coverage is None and is_deterministic(program):
+        return _run_cached(program, stdin, stdout, limits, cache)
+    return _run(program, stdin, stdout, limits, seed, directory, coverage)
+
+
+def _run_cached(
+    program: Program,
+    stdin: str | bytes | TextIO | BinaryIO | None,
+    stdout: TextIO | BinaryIO | None,
+    limits: Limits,
+    cache: ResultCache,
+) -> RunResult:
+    stdin = _read_input(stdin)
+    key = cache.key(program_hash(program), stdin, _settings_key(limits))
+    if (cached := cache.get(key)) is not None:
+        if stdout is not None:
+            _write_bytes(stdout, cached.output)
+        if cached.error is None:
+            error = None
+        elif cached.limit is not None:
+            error = LimitExceeded(cached.error, cached.limit, cached.line)
+        else:
+            error = InterpreterError(cached.error)
+        output = None if stdout is not None else cached.output
+        return RunResult(output, error, cached.peak_memory)
+    recorded = None if stdout is None else _RecordedOutput(stdout, cache.max_bytes)
+    result = _run(program, stdin, recorded, limits, None, None)
+    if recorded is None:
+        output = result.output
+    elif recorded.overflowed:
+        return result
+    else:
+        output = recorded.getvalue()
+    if isinstance(result.error, LimitExceeded) and (
+        result.error.limit == "time" or result.error.line is not None
+    ):
+        # Another run might finish in time, and lines depend on the layout,
+        # which programs sharing a hash may not share
+        return result
+    if isinstance(result.error, LimitExceeded):
+        cached = CachedResult(
+            output,
+            result.error.reason,
+            result.peak_memory,
+            result.error.limit,
+            result.error.line,
+        )
+    else:
+        error = None if result.error is None else str(result.error)
+        cached = CachedResult(output, error, result.peak_memory)
+    cache.put(key, cached)
+    return result
+
+
+def _run(
+    program: Program,
+    stdin: str | bytes | TextIO | BinaryIO | None,
+    stdout: TextIO | BinaryIO | None,
+    limits: Limits,
+    seed: int | None,
+    directory: str | None,
+    coverage: Coverage | None = None,
+) -> RunResult:
+    output = OutputWriter.to_bytes() if stdout is None else OutputWriter(stdout)
+    interpreter = StackInterpreter(
+        VariableState(),
+        memo_size=limits.memo_size,
+        max_depth=limits.max_call_depth,
+        output=output,
+        input=_input_reader(stdin),
+        workers=limits.workers,
+        max_steps=limits.max_steps,
+        time_limit=limits.time_limit,
+        max_memory=limits.max_memory,
+        track_memory=limits.track_memory,
+    )
+    if seed is not None:
+        interpreter.random = random.Random(seed)
+    interpreter.files = FileTable(directory)
+    if coverage is not None:
+        coverage.install(interpreter)
+    error = None
+    try:
+        interpreter.visit(program)
+    except InterpreterError as e:
+        error = e
+    return RunResult(
+        output.getvalue() if stdout is None else None,
+        error,
+        None if interpreter.memory is None else interpreter.memory.peak,
+    )
+
+
+class ProgramRunner:
+    """
+    Runs programs on a pool of threads.
+
+    With the GIL, threads only help while programs wait for I/O; on
+    free-threaded builds of CPython they run in parallel.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        """
+        :param max_workers: maximum number of programs running at once
+        """
+        self._pool = ThreadPoolExecutor(max_workers, "cambridgeScript")
+
+    def submit(
+        self,
+        program: str | Program,
+        stdin: str | bytes | TextIO | BinaryIO | None = None,
+        stdout: TextIO | BinaryIO | None = None,
+        limits: Limits | None = None,
+        **kwargs,
+    ) -> "Future[RunResult]":
+        """Start running a program, see run() for the parameters"""
+        return self._pool.submit(run, program, stdin, stdout, limits, **kwargs)
+
+    def close(self) -> None:
+        """Wait for the running programs and stop the threads"""
+        self._pool.shutdown()
+
+    def __enter__(self) -> "ProgramRunner":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
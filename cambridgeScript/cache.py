@@ -0,0 +1,213 @@
+"""
+Cache of the results of whole runs of deterministic programs.
+
+A deterministic program (no RANDOM, no files) always produces the same output
+from the same input, so its result can be stored on disk, keyed by a hash of
+its syntax tree and its input, and returned without running it again.
+"""
+
+__all__ = [
+    "program_hash",
+    "is_deterministic",
+    "CachedResult",
+    "ResultCache",
+]
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, fields, is_dataclass
+from enum import Enum
+from types import BuiltinFunctionType, FunctionType
+
+from cambridgeScript.interpreter.analysis import iter_nodes
+from cambridgeScript.interpreter.library import BUILTINS
+from cambridgeScript.syntax_tree import (
+    BuiltinCall,
+    FileOpenStmt,
+    FileReadStmt,
+    FileWriteStmt,
+    FileCloseStmt,
+    Program,
+)
+
+_FILE_STATEMENTS = (FileOpenStmt, FileReadStmt, FileWriteStmt, FileCloseStmt)
+# Token fields that don't affect what a program does
+_POSITION_FIELDS = {"line", "column"}
+
+
+def _canonical(value, parts: list[str]) -> None:
+    # Appends a description of value which doesn't depend on source positions
+    if is_dataclass(value):
+        parts.append(type(value).__name__ + "(")
+        for field in fields(value):
+            if field.name in _POSITION_FIELDS:
+                continue
+            _canonical(getattr(value, field.name), parts)
+            parts.append(",")
+        parts.append(")")
+    elif isinstance(value, (list, tuple)):
+        parts.append("[")
+        for item in value:
+            _canonical(item, parts)
+            parts.append(",")
+        parts.append("]")
+    elif isinstance(value, Enum):
+        parts.append(f"{type(value).__name__}.{value.name}")
+    elif isinstance(value, (FunctionType, BuiltinFunctionType)):
+        # Operators and builtins, whose repr() includes their address
+        parts.append(f"{value.__module__}.{value.__qualname__}")
+    else:
+        parts.append(f"{type(value).__name__}:{value!r}")
+
+
+def program_hash(program: Program) -> str:
+    """
+    Hash a program's syntax tree.
+    Programs differing only in layout (whitespace, line breaks) hash the same.
+    """
+    parts = []
+    _canonical(program, parts)
+    return hashlib.blake2b("".join(parts).encode(), digest_size=20).hexdigest()
+
+
+def is_deterministic(program: Program) -> bool:
+    """
+    Check that a program's result only depends on its input: it doesn't use
+    files, or builtins like RANDOM whose results can change.
+    The program's builtins must already be resolved.
+    """
+    for node in iter_nodes(program):
+        if isinstance(node, _FILE_STATEMENTS):
+            return False
+        if isinstance(node, BuiltinCall) and not BUILTINS[node.name.value].pure:
+            return False
+    return True
+
+
+@dataclass
+class CachedResult:
+    output: bytes
+    # Message of the error the program stopped with, if any
+    error: str | None
+    peak_memory: int | None = None
+    # The limit and line of a LimitExceeded error
+    limit: str | None = None
+    line: int | None = None
+
+
+class ResultCache:
+    """
+    Results of runs stored as files in a directory, keyed by program, input
+    and settings. The least recently used results are removed once the
+    directory grows over max_bytes.
+    """
+
+    directory: str
+    max_bytes: int
+
+    def __init__(self, directory: str, max_bytes: int = 256 << 20):
+        """
+        :param directory: where results are stored, created if needed
+        :param max_bytes: maximum total size of the stored results
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        # Running estimate of the size of the directory, only rescanned once
+        # it's over max_bytes (which also counts other processes' results)
+        self._total: int | None = None
+
+    @staticmethod
+    def key(program_key: str, stdin: bytes, settings: str = "") -> str:
+        """
+        Get the key of a run.
+        :param program_key: the program_hash() of the program
+        :param stdin: the input of the run
+        :param settings: anything else that affects the result, e.g. limits
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        for part in (program_key.encode(), settings.encode(), stdin):
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> CachedResult | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                header = file.readline()
+                output = file.read()
+            # Mark as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            # Possibly evicted by another process after being read
+            return None
+        header = json.loads(header)
+        return CachedResult(
+            output,
+            header["error"],
+            header.get("peak_memory"),
+            header.get("limit"),
+            header.get("line"),
+        )
+
+    def put(self, key: str, result: CachedResult) -> None:
+        if len(result.output) > self.max_bytes:
+            return
+        header = {
+            "error": result.error,
+            "peak_memory": result.peak_memory,
+            "limit": result.limit,
+            "line": result.line,
+        }
+        header = json.dumps(header).encode() + b"\n"
+        # Written to a temporary file first so readers never see partial files
+        fd, temporary = tempfile.mkstemp(dir=self.directory, prefix=".")
+        with os.fdopen(fd, "wb") as file:
+            file.write(header)
+            file.write(result.output)
+        if self._total is None:
+            self._total = self._scan()[1]
+        self._total += len(header) + len(result.output)
+        os.replace(temporary, self._path(key))
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _scan(self) -> tuple[list[tuple[int, str, int]], int]:
+        # Returns the time, path and size of each result, and their total size
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # Evicted by another process
+                    continue
+                entries.append((stat.st_mtime_ns, entry.path, stat.st_size))
+                total += stat.st_size
+        return entries, total
+
+    def _evict(self) -> None:
+        # Removes the least recently used results until under max_bytes
+        entries, total = self._scan()
+        self._total = total
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, path, size in entries:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self._total = total
@@ -0,0 +1,94 @@
+"""
+Client for the interpreter server, see server.py.
+
+Sends a program and its input to the server, and streams back its output.
+Only the standard library is imported, so starting the client is cheap.
+
+Exits with the status the server reports for the program (see server.py), or
+with one of the statuses below if the client couldn't get one.
+
+Run with `python -m cambridgeScript.client FILE [--socket PATH] < input`
+"""
+
+import argparse
+import os
+import socket
+import sys
+import threading
+
+from cambridgeScript.protocol import (
+    DEFAULT_SOCKET,
+    SOURCE,
+    INPUT,
+    OUTPUT,
+    ERROR,
+    EXIT,
+    send_frame,
+    read_frame,
+)
+
+# Exit statuses of the client's own failures, from sysexits.h, distinct from
+# those of the server
+EXIT_NO_SERVER = 69
+EXIT_CONNECTION_LOST = 74
+EXIT_BAD_REPLY = 76
+
+
+def _send_input(connection: socket.socket) -> None:
+    # Forwards stdin as it becomes available
+    try:
+        while data := os.read(sys.stdin.fileno(), 1 << 16):
+            send_frame(connection, INPUT, data)
+        connection.shutdown(socket.SHUT_WR)
+    except OSError:
+        # The program ended without reading all of its input
+        pass
+
+
+def submit(source: bytes, path: str = DEFAULT_SOCKET) -> int:
+    """
+    Run a program on the server, with this process's stdin and stdout.
+    :return: the exit status of the program, or of the client's failure
+    :raises FileNotFoundError, ConnectionRefusedError: if no server is
+        listening on the socket
+    """
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(path)
+    send_frame(connection, SOURCE, source)
+    threading.Thread(target=_send_input, args=(connection,), daemon=True).start()
+    stream = connection.makefile("rb")
+    while (frame := read_frame(stream)) is not None:
+        kind, data = frame
+        if kind == OUTPUT:
+            sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
+        elif kind == ERROR:
+            sys.stderr.write(data.decode(errors="replace") + "\n")
+        elif kind == EXIT and len(data) == 1:
+            return data[0]
+        else:
+            sys.stderr.write(f"Invalid reply from the server: {kind!r} frame\n")
+            return EXIT_BAD_REPLY
+    sys.stderr.write("Connection to the server was lost\n")
+    return EXIT_CONNECTION_LOST
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run a program on the server")
+    arg_parser.add_argument("file", help="the program to run")
+    arg_parser.add_argument("--socket", default=DEFAULT_SOCKET, help="socket path")
+    args = arg_parser.parse_args()
+    with open(args.file, "rb") as file:
+        source = file.read()
+    try:
+        sys.exit(submit(source, args.socket))
+    except (FileNotFoundError, ConnectionRefusedError):
+        sys.stderr.write(f"No server is listening on {args.socket}\n")
+        sys.exit(EXIT_NO_SERVER)
+    except OSError as e:
+        sys.stderr.write(f"Connection to the server was lost: {e}\n")
+        sys.exit(EXIT_CONNECTION_LOST)
+
+
+if __name__ == "__main__":
+    main()
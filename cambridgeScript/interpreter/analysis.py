@@ -0,0 +1,305 @@
+__all__ = [
+    "iter_nodes",
+    "node_line",
+    "assigned_names",
+    "AffineIndex",
+    "loop_index_candidates",
+    "pure_functions",
+    "ParallelLoop",
+    "parallel_loop",
+]
+
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Iterator
+
+from cambridgeScript.constants import Operator
+from cambridgeScript.interpreter.library import BUILTINS
+from cambridgeScript.parser.lexer import Token
+from cambridgeScript.syntax_tree import (
+    ArrayType,
+    Expression,
+    Identifier,
+    Literal,
+    ArrayIndex,
+    BinaryOp,
+    FunctionCall,
+    BuiltinCall,
+    Statement,
+    AssignmentStmt,
+    ProcedureCallStmt,
+    FileReadStmt,
+    InputStmt,
+    VariableDecl,
+    ForStmt,
+    IfStmt,
+    FunctionDecl,
+    OutputStmt,
+    FileOpenStmt,
+    FileWriteStmt,
+    FileCloseStmt,
+)
+
+Node = Expression | Statement
+
+
+def iter_nodes(node: Node | list[Statement]) -> Iterator[Node]:
+    """
+    Iterate over a node and every expression/statement nested inside it.
+    :param node: the node (or list of statements) to walk
+    :return: an iterator of nodes in pre-order
+    """
+    stack: list = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (list, tuple)):
+            stack.extend(reversed(item))
+            continue
+        if not is_dataclass(item) or isinstance(item, (type, Token)):
+            continue
+        if isinstance(item, (Expression, Statement)):
+            yield item
+        stack.extend(getattr(item, f.name) for f in reversed(fields(item)))
+
+
+def node_line(node: Node | list[Statement]) -> int | None:
+    """
+    Find the source line a node starts on.
+    :return: the line number, counting from 1, or None if it has no tokens
+    """
+    stack: list = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, Token):
+            if item.line is not None:
+                return item.line + 1
+        elif isinstance(item, (list, tuple)):
+            stack.extend(reversed(item))
+        elif is_dataclass(item) and not isinstance(item, type):
+            stack.extend(getattr(item, f.name) for f in reversed(fields(item)))
+    return None
+
+
+def assigned_names(statements: list[Statement]) -> set[str] | None:
+    """
+    Find the names of all variables which may be (re)bound by some statements.
+    Writes to array elements don't count as rebinding the array.
+    :param statements: statements to check
+    :return: the set of names, or None if it can't be determined (e.g. calls)
+    """
+    result: set[str] = set()
+    for node in iter_nodes(statements):
+        if isinstance(node, (FunctionCall, ProcedureCallStmt)):
+            return None
+        if isinstance(node, AssignmentStmt):
+            target = node.target
+        elif isinstance(node, (InputStmt, ForStmt)):
+            target = node.variable
+        elif isinstance(node, FileReadStmt):
+            target = node.target
+        elif isinstance(node, VariableDecl):
+            result.add(node.name.value)
+            continue
+        else:
+            continue
+        if isinstance(target, Identifier):
+            result.add(target.token.value)
+    return result
+
+
+@dataclass
+class AffineIndex:
+    """An array access where every index is a constant or variable +/- constant"""
+
+    node: ArrayIndex
+    array: str
+    # (variable, offset) for each dimension, variable is None for constants
+    terms: list[tuple[str | None, int]]
+
+
+def _affine_term(expr: Expression) -> tuple[str | None, int] | None:
+    if isinstance(expr, Literal):
+        value = expr.token.value
+        return (None, value) if type(value) is int else None
+    if isinstance(expr, Identifier):
+        return expr.token.value, 0
+    if not (
+        isinstance(expr, BinaryOp) and expr.operator in (Operator.ADD, Operator.SUB)
+    ):
+        return None
+    left, right = _affine_term(expr.left), _affine_term(expr.right)
+    if left is None or right is None:
+        return None
+    if expr.operator is Operator.SUB:
+        # variable - constant
+        if right[0] is not None:
+            return None
+        return left[0], left[1] - right[1]
+    if left[0] is not None and right[0] is not None:
+        return None
+    return left[0] or right[0], left[1] + right[1]
+
+
+def loop_index_candidates(stmt: ForStmt) -> list[AffineIndex]:
+    """
+    Find the array accesses in a loop body which can have their bounds checks
+    removed once the range of the loop variable is known.
+    Only accesses using the loop variable, on arrays that aren't rebound inside
+    the loop are returned.
+    :param stmt: the loop to check
+    :return: a list of candidate accesses
+    """
+    assigned = assigned_names(stmt.body)
+    if assigned is None or not isinstance(stmt.variable, Identifier):
+        return []
+    variable = stmt.variable.token.value
+    result = []
+    for node in iter_nodes(stmt.body):
+        if not (isinstance(node, ArrayIndex) and isinstance(node.array, Identifier)):
+            continue
+        array = node.array.token.value
+        terms = [_affine_term(index) for index in node.index]
+        if (
+            array not in assigned
+            and None not in terms
+            and any(name == variable for name, _ in terms)
+        ):
+            result.append(AffineIndex(node, array, terms))
+    return result
+
+
+# Statements with side effects outside of the function
+_IMPURE_STATEMENTS = (
+    OutputStmt,
+    InputStmt,
+    FileOpenStmt,
+    FileReadStmt,
+    FileWriteStmt,
+    FileCloseStmt,
+    ProcedureCallStmt,
+)
+
+
+def _local_calls(function: FunctionDecl) -> set[str] | None:
+    # Returns the names of functions called, or None if the function
+    # does anything other than computing with its local variables
+    params = function.params or []
+    local_names = {name.value for name, _ in params}
+    local_names.update(
+        node.name.value
+        for node in iter_nodes(function.body)
+        if isinstance(node, VariableDecl)
+    )
+    array_params = {
+        name.value for name, type_ in params if isinstance(type_, ArrayType)
+    }
+    calls = set()
+    callees = set()
+    for node in iter_nodes(function.body):
+        if isinstance(node, _IMPURE_STATEMENTS):
+            return None
+        if isinstance(node, BuiltinCall) and not BUILTINS[node.name.value].pure:
+            return None
+        if isinstance(node, FunctionCall):
+            if not isinstance(node.function, Identifier):
+                return None
+            calls.add(node.function.token.value)
+            callees.add(id(node.function))
+        elif isinstance(node, Identifier) and id(node) not in callees:
+            if node.token.value not in local_names:
+                return None
+        elif isinstance(node, AssignmentStmt):
+            target = node.target
+            if isinstance(target, ArrayIndex) and isinstance(target.array, Identifier):
+                # Arrays are passed by reference
+                if target.array.token.value in array_params:
+                    return None
+    return calls
+
+
+def pure_functions(functions: dict[str, FunctionDecl]) -> set[str]:
+    """
+    Find the functions whose result only depends on their arguments.
+    Pure functions have no I/O, don't use global variables, don't modify
+    arrays passed to them, and only call other pure functions.
+    :param functions: all functions of the program
+    :return: the names of the pure functions
+    """
+    calls = {}
+    for name, function in functions.items():
+        if (called := _local_calls(function)) is not None:
+            calls[name] = called
+    # Remove functions calling impure functions until nothing changes
+    changed = True
+    while changed:
+        changed = False
+        for name, called in list(calls.items()):
+            if not called <= calls.keys():
+                del calls[name]
+                changed = True
+    return set(calls)
+
+
+@dataclass
+class ParallelLoop:
+    """A FOR loop whose iterations are independent of each other"""
+
+    variable: str
+    # 1-dimensional arrays the body writes, only at the loop variable
+    written: set[str]
+    # Every other name the body reads
+    names: set[str]
+
+
+def _is_element(expr: Expression, variable: str) -> bool:
+    # Whether expr is <array>[<variable>]
+    return (
+        isinstance(expr, ArrayIndex)
+        and isinstance(expr.array, Identifier)
+        and len(expr.index) == 1
+        and isinstance(expr.index[0], Identifier)
+        and expr.index[0].token.value == variable
+    )
+
+
+def parallel_loop(stmt: ForStmt) -> ParallelLoop | None:
+    """
+    Check that the iterations of a loop can run in any order.
+    The body may only contain assignments and IF statements, without I/O or
+    calls to user-defined routines or impure builtins. It may only assign to
+    elements of arrays at the loop variable, and may only read those arrays
+    at the loop variable too, so no iteration can see another's writes.
+    :param stmt: the loop to check
+    :return: the variables used by the loop, or None if it isn't independent
+    """
+    if not isinstance(stmt.variable, Identifier):
+        return None
+    variable = stmt.variable.token.value
+    written = set()
+    # ids of the array identifiers of <array>[<variable>] accesses
+    element_arrays = set()
+    identifiers = []
+    for node in iter_nodes(stmt.body):
+        if isinstance(node, Statement) and not isinstance(
+            node, (AssignmentStmt, IfStmt)
+        ):
+            return None
+        if isinstance(node, FunctionCall):
+            return None
+        if isinstance(node, BuiltinCall) and not BUILTINS[node.name.value].pure:
+            return None
+        if isinstance(node, AssignmentStmt):
+            if not _is_element(node.target, variable):
+                return None
+            written.add(node.target.array.token.value)
+        if _is_element(node, variable):
+            element_arrays.add(id(node.array))
+        if isinstance(node, Identifier):
+            identifiers.append(node)
+    if not written:
+        return None
+    for identifier in identifiers:
+        # Written arrays can't be read at other indices or used whole
+        if identifier.token.value in written and id(identifier) not in element_arrays:
+            return None
+    names = {identifier.token.value for identifier in identifiers}
+    return ParallelLoop(variable, written, names - written - {variable})
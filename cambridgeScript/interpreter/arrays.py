@@ -0,0 +1,208 @@
+__all__ = [
+    "Array",
+]
+
+import math
+import sys
+from array import array
+from operator import mul
+
+from cambridgeScript.parser.lexer import Value
+from cambridgeScript.syntax_tree import PrimitiveType
+
+# Element types that can be stored unboxed, and their array.array typecodes
+_TYPECODES = {
+    PrimitiveType.INTEGER: "q",
+    PrimitiveType.REAL: "d",
+    PrimitiveType.BOOLEAN: "b",
+}
+
+_DEFAULTS: dict[PrimitiveType, Value] = {
+    PrimitiveType.INTEGER: 0,
+    PrimitiveType.REAL: 0.0,
+    PrimitiveType.CHAR: "",
+    PrimitiveType.STRING: "",
+    PrimitiveType.BOOLEAN: False,
+}
+
+# Bytes a dict takes per item just after it grows: two entries (a hash, a key
+# and a value pointer each) and three 4-byte slots in its index
+_DICT_ITEM_SIZE = 2 * 3 * 8 + 3 * 4
+# Size of the objects boxing the values of sparse cells. Booleans are shared,
+# and strings are objects whether the array is sparse or not
+_BOXED_SIZES = {
+    PrimitiveType.INTEGER: sys.getsizeof(1 << 16),
+    PrimitiveType.REAL: sys.getsizeof(0.0),
+}
+
+
+def _dense_fill_ratio(type_: PrimitiveType) -> float:
+    # Fraction of cells written at which a sparse array takes as much memory
+    # as the dense buffer, rounded down to a power of two
+    typecode = _TYPECODES.get(type_)
+    itemsize = array(typecode).itemsize if typecode is not None else 8
+    # The key of a cell is its offset, at least SPARSE_MIN_SIZE
+    cell_size = _DICT_ITEM_SIZE + sys.getsizeof(1 << 16) + _BOXED_SIZES.get(type_, 0)
+    return 2 ** math.floor(math.log2(itemsize / cell_size))
+
+
+class Array:
+    """
+    A fixed-size array with one or more dimensions.
+    Elements are kept in a single flat buffer in row-major order, numeric and
+    boolean elements are stored unboxed in an array.array.
+
+    Large arrays start out sparse, as a dict of the cells that were written,
+    and are only materialized into the flat buffer once enough cells are used.
+    """
+
+    # Arrays with at least this many elements start out sparse, and are made
+    # dense once their cells would take more memory than the dense buffer
+    SPARSE_MIN_SIZE = 1 << 16
+
+    type: PrimitiveType
+    bounds: list[tuple[int, int]]
+    size: int
+
+    def __init__(self, type_: PrimitiveType, bounds: list[tuple[int, int]]):
+        self.type = type_
+        self.bounds = bounds
+        strides = []
+        size = 1
+        for lower, upper in reversed(bounds):
+            if type(lower) is not int or type(upper) is not int:
+                raise TypeError("Array bounds must be integers")
+            if upper < lower:
+                raise ValueError(f"Invalid array range {lower}:{upper}")
+            strides.append(size)
+            size *= upper - lower + 1
+        self.size = size
+        self._strides = strides[::-1]
+        # Subtracted from the dot product of indices and strides to get offsets
+        self._base = sum(map(mul, (lower for lower, _ in bounds), self._strides))
+        self._is_bool = type_ is PrimitiveType.BOOLEAN
+        self._default = _DEFAULTS[type_]
+        # Used to check and normalize values stored in sparse arrays
+        self._probe = self._allocate(1, self._default)
+        self._data: array | list | None = None
+        self._cells: dict[int, Value] | None = None
+        if size >= self.SPARSE_MIN_SIZE:
+            self._cells = {}
+            self._dense_limit = int(size * _dense_fill_ratio(type_))
+        else:
+            self._data = self._allocate(size, self._default)
+
+    def _allocate(self, size: int, default: Value) -> array | list:
+        typecode = _TYPECODES.get(self.type)
+        if typecode is None:
+            return [default] * size
+        return array(typecode, [default]) * size
+
+    @property
+    def representation(self) -> str:
+        """The storage currently in use, either 'sparse' or 'dense'"""
+        return "dense" if self._cells is None else "sparse"
+
+    @property
+    def dense_buffer(self) -> array | None:
+        """The packed element buffer, or None if the array isn't stored packed"""
+        if isinstance(self._data, array):
+            return self._data
+        return None
+
+    @property
+    def dense_nbytes(self) -> int:
+        """Size in bytes of the element storage once the array is dense"""
+        if isinstance(self._probe, array):
+            return self._probe.itemsize * self.size
+        return 8 * self.size
+
+    def materializes(self, indices: list[Value]) -> bool:
+        """
+        Check whether writing an element makes a sparse array dense.
+        :raises IndexError: if the indices are out of bounds
+        """
+        if self._cells is None:
+            return False
+        offset = self.offset(indices)
+        return offset not in self._cells and len(self._cells) >= self._dense_limit
+
+    def _materialize(self) -> None:
+        # Switches from sparse to dense storage
+        data = self._allocate(self.size, self._default)
+        for offset, value in self._cells.items():
+            data[offset] = value
+        self._data = data
+        self._cells = None
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate size of the element storage in bytes"""
+        if self._cells is not None:
+            return sys.getsizeof(self._cells) + 32 * len(self._cells)
+        if isinstance(self._data, array):
+            return self._data.itemsize * len(self._data)
+        return 8 * len(self._data)
+
+    @property
+    def text_size(self) -> int:
+        """Total length of the elements of a CHAR or STRING array, 0 for others"""
+        if self.type not in (PrimitiveType.CHAR, PrimitiveType.STRING):
+            return 0
+        values = self._data if self._cells is None else self._cells.values()
+        return sum(map(len, values))
+
+    def offset(self, indices: list[Value]) -> int:
+        """
+        Convert a list of indices to an offset into the flat storage.
+        :raises IndexError: if the indices are out of bounds
+        """
+        if len(indices) != len(self.bounds):
+            raise IndexError(
+                f"Expected {len(self.bounds)} indices, got {len(indices)} instead"
+            )
+        offset = 0
+        for index, (lower, upper), stride in zip(indices, self.bounds, self._strides):
+            if type(index) is not int:
+                raise IndexError(f"Array index {index!r} isn't an integer")
+            if not lower <= index <= upper:
+                raise IndexError(f"Index {index} is out of range {lower}:{upper}")
+            offset += (index - lower) * stride
+        return offset
+
+    def _unchecked_offset(self, indices: list[int]) -> int:
+        return sum(map(mul, indices, self._strides)) - self._base
+
+    def get(self, indices: list[Value]) -> Value:
+        return self._read(self.offset(indices))
+
+    def get_unchecked(self, indices: list[int]) -> Value:
+        """Variant of get() for indices already known to be in bounds"""
+        return self._read(self._unchecked_offset(indices))
+
+    def set(self, indices: list[Value], value: Value) -> None:
+        self._write(self.offset(indices), value)
+
+    def set_unchecked(self, indices: list[int], value: Value) -> None:
+        """Variant of set() for indices already known to be in bounds"""
+        self._write(self._unchecked_offset(indices), value)
+
+    def _read(self, offset: int) -> Value:
+        if self._cells is not None:
+            value = self._cells.get(offset, self._default)
+        else:
+            value = self._data[offset]
+        return bool(value) if self._is_bool else value
+
+    def _write(self, offset: int, value: Value) -> None:
+        if self._cells is None:
+            self._data[offset] = value
+            return
+        self._probe[0] = value
+        self._cells[offset] = self._probe[0]
+        if len(self._cells) > self._dense_limit:
+            self._materialize()
+
+    def __repr__(self):
+        ranges = ", ".join(f"{lower}:{upper}" for lower, upper in self.bounds)
+        return f"Array[{ranges}] OF {self.type.name}"
@@ -0,0 +1,240 @@
+"""
+Buffered console I/O for the interpreter.
+
+Output is collected in memory and written to the underlying stream in large
+blocks, instead of once per OUTPUT statement. Input is read in large blocks
+too, and split into lines as INPUT statements need them.
+"""
+
+__all__ = [
+    "FlushPolicy",
+    "OutputWriter",
+    "InputReader",
+    "parse_value",
+]
+
+import codecs
+import io
+import sys
+from enum import Enum
+from typing import BinaryIO, TextIO
+
+from cambridgeScript.parser.lexer import Value
+from cambridgeScript.syntax_tree.types import PrimitiveType
+
+
+class FlushPolicy(Enum):
+    # Write after every line, for interactive use
+    LINE = "line"
+    # Write whenever the buffer is full
+    SIZE = "size"
+    # Only write when the program exits (or asks for input)
+    EXIT = "exit"
+
+
+class OutputWriter:
+    """
+    Buffers the lines written by OUTPUT statements.
+
+    Output goes to a text or binary stream, sys.stdout by default, or to
+    memory when created with OutputWriter.to_bytes().
+    """
+
+    policy: FlushPolicy
+    # Number of characters buffered before writing, for FlushPolicy.SIZE
+    buffer_size: int
+    encoding: str
+
+    def __init__(
+        self,
+        stream: TextIO | BinaryIO | None = None,
+        policy: FlushPolicy | str | None = None,
+        buffer_size: int = 1 << 16,
+        encoding: str = "utf-8",
+    ):
+        """
+        :param stream: where output is written, None for sys.stdout
+        :param policy: when output is written, by default after every line
+            for terminals and when the buffer is full otherwise
+        :param buffer_size: size of the buffer in characters
+        :param encoding: encoding used for binary streams
+        """
+        self._stream = stream
+        if policy is None:
+            policy = FlushPolicy.LINE if self._is_terminal() else FlushPolicy.SIZE
+        self.policy = FlushPolicy(policy)
+        self.buffer_size = buffer_size
+        self.encoding = encoding
+        self._pieces: list[str] = []
+        self._buffered = 0
+
+    @classmethod
+    def to_bytes(cls, encoding: str = "utf-8") -> "OutputWriter":
+        """Create a writer keeping the output in memory, see getvalue()"""
+        return cls(io.BytesIO(), FlushPolicy.EXIT, encoding=encoding)
+
+    @property
+    def stream(self) -> TextIO | BinaryIO:
+        # Looked up late so that redirecting sys.stdout works
+        return sys.stdout if self._stream is None else self._stream
+
+    def _is_terminal(self) -> bool:
+        try:
+            return self.stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def write_line(self, line: str) -> None:
+        self._pieces.append(line)
+        self._pieces.append("\n")
+        self._buffered += len(line) + 1
+        if self.policy is FlushPolicy.LINE or (
+            self.policy is FlushPolicy.SIZE and self._buffered >= self.buffer_size
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered output to the stream"""
+        if not self._pieces:
+            return
+        text = "".join(self._pieces)
+        self._pieces.clear()
+        self._buffered = 0
+        stream = self.stream
+        # Text streams have an encoding, binary ones don't
+        if hasattr(stream, "encoding"):
+            stream.write(text)
+        else:
+            stream.write(text.encode(self.encoding))
+        stream.flush()
+
+    def getvalue(self) -> bytes:
+        """Get the output written so far by a writer created by to_bytes()"""
+        self.flush()
+        if not isinstance(self.stream, io.BytesIO):
+            raise TypeError("Output isn't kept in memory")
+        return self.stream.getvalue()
+
+
+class InputReader:
+    """
+    Reads the lines used by INPUT statements.
+
+    Input comes from a text or binary stream, sys.stdin by default, or from
+    memory when created with InputReader.from_bytes(). It is read in blocks
+    of block_size, and lines are only split off when they are needed.
+    """
+
+    block_size: int
+
+    def __init__(
+        self,
+        stream: TextIO | BinaryIO | None = None,
+        block_size: int = 1 << 16,
+        encoding: str = "utf-8",
+    ):
+        """
+        :param stream: where input is read from, None for sys.stdin
+        :param block_size: number of bytes or characters read at once
+        :param encoding: encoding used for binary streams
+        """
+        self._stream = stream
+        self.block_size = block_size
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        # Text read so far and the position of the next line in it
+        self._block = ""
+        self._position = 0
+        self._at_eof = False
+
+    @classmethod
+    def from_bytes(cls, data: bytes, encoding: str = "utf-8") -> "InputReader":
+        """Create a reader for input kept in memory"""
+        return cls(io.BytesIO(data), encoding=encoding)
+
+    @property
+    def stream(self) -> TextIO | BinaryIO:
+        if self._stream is not None:
+            return self._stream
+        # Reading bytes from stdin doesn't wait for a whole block
+        return getattr(sys.stdin, "buffer", sys.stdin)
+
+    @property
+    def has_line(self) -> bool:
+        """Whether a line can be read without reading from the stream"""
+        return self._at_eof or self._block.find("\n", self._position) != -1
+
+    def _read_block(self) -> str | None:
+        # Returns the text read, None at the end of the stream
+        stream = self.stream
+        if hasattr(stream, "encoding"):
+            return stream.read(self.block_size) or None
+        # read1 returns whatever is available, so terminals don't block
+        read = getattr(stream, "read1", stream.read)
+        data = read(self.block_size)
+        text = self._decoder.decode(data, final=not data)
+        return text if data else text or None
+
+    def feed(self, text: str) -> None:
+        """Add input directly, instead of reading it from the stream"""
+        self._block = self._block[self._position :] + text
+        self._position = 0
+
+    def end(self) -> None:
+        """Mark the end of the input, the stream won't be read anymore"""
+        self._at_eof = True
+
+    def read_line(self) -> str | None:
+        """
+        Read the next line, without its line ending.
+        :return: the line, or None at the end of the input
+        """
+        while True:
+            end = self._block.find("\n", self._position)
+            if end != -1:
+                line = self._block[self._position : end]
+                self._position = end + 1
+                return line.removesuffix("\r")
+            if self._at_eof:
+                if self._position == len(self._block):
+                    return None
+                # Last line without a line ending
+                line = self._block[self._position :]
+                self._position = len(self._block)
+                return line.removesuffix("\r")
+            block = self._read_block()
+            if block is None:
+                self._at_eof = True
+                block = ""
+            self._block = self._block[self._position :] + block
+            self._position = 0
+
+
+def parse_value(text: str, type_: PrimitiveType | None) -> Value:
+    """
+    Convert a line of input to a value of a type.
+    :param text: the line of input
+    :param type_: the type of the variable being input, None to keep the text
+    :raises ValueError: if the text isn't a valid value of the type
+    """
+    if type_ is None or type_ is PrimitiveType.STRING:
+        return text
+    if type_ is PrimitiveType.INTEGER:
+        try:
+            return int(text)
+        except ValueError:
+            raise ValueError(f"Expected an INTEGER, got {text!r} instead") from None
+    if type_ is PrimitiveType.REAL:
+        try:
+            return float(text)
+        except ValueError:
+            raise ValueError(f"Expected a REAL, got {text!r} instead") from None
+    if type_ is PrimitiveType.BOOLEAN:
+        value = text.strip().upper()
+        if value not in ("TRUE", "FALSE"):
+            raise ValueError(f"Expected a BOOLEAN, got {text!r} instead")
+        return value == "TRUE"
+    if type_ is PrimitiveType.CHAR:
+        if len(text) != 1:
+            raise ValueError(f"Expected a CHAR, got {text!r} instead")
+        return text
+    raise ValueError(f"Can't input values of type {type_.name}")
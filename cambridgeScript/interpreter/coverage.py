@@ -0,0 +1,291 @@
+"""
+Statement and branch coverage of a program.
+
+Every statement of a program gets an index, numbering the statements of each
+block consecutively, and every IF gets one index per branch: THEN and ELSE
+(ELSE being taken whenever the condition is false, even without an ELSE
+block). As the program runs, the bytes of the executed statements and taken
+branches are set in two bitmaps.
+
+The interpreter doesn't execute CASE, so a CASE counts as a single statement,
+without branches or the statements of its cases, which could never be covered.
+
+Coverage.install() records into an interpreter by replacing its methods
+executing blocks and IFs with instance attributes, like tracing.set_trace(),
+so the only cost is setting a byte per statement. The same Coverage can be
+installed in many interpreters, and bitmaps from other processes merged in,
+to combine runs such as a batch of test cases into one report.
+
+Loops run all at once (vectorized or in parallel) don't execute their bodies
+statement by statement, so they are run normally while recording coverage.
+"""
+
+__all__ = [
+    "Coverage",
+    "write_listing",
+]
+
+from dataclasses import fields
+from typing import Generator, TextIO
+
+from cambridgeScript.cache import program_hash
+from cambridgeScript.interpreter.analysis import node_line
+from cambridgeScript.interpreter.interpreter import Interpreter, _Return
+from cambridgeScript.interpreter.stack import StackInterpreter
+from cambridgeScript.syntax_tree import (
+    Statement,
+    IfStmt,
+    CaseStmt,
+    Program,
+)
+
+
+class Coverage:
+    """Bitmaps of the statements and branches of a program that ran"""
+
+    program: Program
+    # Statements and branches (the IF and the branch's name), by index
+    statements: list[Statement]
+    branches: list[tuple[Statement, str]]
+    # A non-zero byte for each executed statement and taken branch
+    executed: bytearray
+    taken: bytearray
+
+    def __init__(self, program: Program):
+        """
+        :param program: the program to record, the one that will be run
+        """
+        self.program = program
+        self.statements = []
+        self.branches = []
+        # Index of the last statement of each block, and of the first branch
+        # of each IF, by id
+        self._last: dict[int, int] = {}
+        self._first_branches: dict[int, int] = {}
+        self._add_block(program.statements)
+        self.executed = bytearray(len(self.statements))
+        self.taken = bytearray(len(self.branches))
+
+    def _add_block(self, statements: list[Statement]) -> None:
+        self.statements.extend(statements)
+        self._last[id(statements)] = len(self.statements) - 1
+        for stmt in statements:
+            self._add_children(stmt)
+
+    def _add_children(self, stmt: Statement) -> None:
+        if isinstance(stmt, IfStmt):
+            self._first_branches[id(stmt)] = len(self.branches)
+            self.branches += [(stmt, "THEN"), (stmt, "ELSE")]
+        elif isinstance(stmt, CaseStmt):
+            # Not executed, see the module docstring
+            return
+        for field in fields(stmt):
+            value = getattr(stmt, field.name)
+            if isinstance(value, list) and value and isinstance(value[0], Statement):
+                self._add_block(value)
+
+    def install(self, interpreter: Interpreter) -> None:
+        """
+        Record the coverage of the program as an interpreter runs it.
+        :param interpreter: an interpreter which hasn't run anything yet
+        """
+        interpreter._vectorizer = None
+        interpreter._parallel = None
+        _Recorder(self, interpreter).install()
+
+    def merge(self, executed: bytes, taken: bytes) -> None:
+        """
+        Add the coverage of other runs of the same program.
+        :param executed: the executed bitmap of the other runs
+        :param taken: the taken bitmap of the other runs
+        :raises ValueError: if the bitmaps are for a different program
+        """
+        if len(executed) != len(self.executed) or len(taken) != len(self.taken):
+            raise ValueError("Coverage is for a different program")
+        for index, byte in enumerate(executed):
+            if byte:
+                self.executed[index] = 1
+        for index, byte in enumerate(taken):
+            if byte:
+                self.taken[index] = 1
+
+    def report(self) -> dict:
+        """
+        Get the coverage as JSON-serializable data: totals, the number of
+        statements and executed statements on each line, the branches never
+        taken, and the bitmaps in hexadecimal (which can be merged back).
+        """
+        lines: dict[str, dict[str, int]] = {}
+        for stmt, executed in zip(self.statements, self.executed):
+            line = node_line(stmt)
+            if line is None:
+                continue
+            counts = lines.setdefault(str(line), {"statements": 0, "executed": 0})
+            counts["statements"] += 1
+            counts["executed"] += bool(executed)
+        missed = [
+            {"line": node_line(stmt), "branch": label}
+            for (stmt, label), taken in zip(self.branches, self.taken)
+            if not taken
+        ]
+        return {
+            "program": program_hash(self.program),
+            "statements": {
+                "total": len(self.executed),
+                "executed": len(self.executed) - self.executed.count(0),
+                "bitmap": self.executed.hex(),
+            },
+            "branches": {
+                "total": len(self.taken),
+                "taken": len(self.taken) - self.taken.count(0),
+                "bitmap": self.taken.hex(),
+            },
+            "lines": lines,
+            "missed_branches": missed,
+        }
+
+
+def write_listing(report: dict, source: str, file: TextIO) -> None:
+    """
+    Write source code annotated with its coverage, marking lines with
+    statements that never ran with "!", followed by the branches never taken.
+    :param report: the coverage, from Coverage.report()
+    :param source: source code of the program
+    :param file: text stream to write to
+    """
+    lines = report["lines"]
+    file.write(f"{'Line':>6} {'Run':>7}    Source\n")
+    for number, text in enumerate(source.splitlines(), 1):
+        counts = lines.get(str(number))
+        if counts is None:
+            file.write(f"{number:>6} {'':>7}    {text}\n")
+            continue
+        run = f"{counts['executed']}/{counts['statements']}"
+        mark = "!" if counts["executed"] < counts["statements"] else " "
+        file.write(f"{number:>6} {run:>7} {mark}  {text}\n")
+    statements = report["statements"]
+    branches = report["branches"]
+    file.write(
+        f"\nStatements {statements['executed']}/{statements['total']} "
+        f"({statements['executed'] / (statements['total'] or 1):.1%}), "
+        f"branches {branches['taken']}/{branches['total']} "
+        f"({branches['taken'] / (branches['total'] or 1):.1%})\n"
+    )
+    for branch in report["missed_branches"]:
+        file.write(f"Line {branch['line']}: {branch['branch']} never taken\n")
+
+
+class _Recorder:
+    # The recording versions of an interpreter's methods
+
+    def __init__(self, coverage: Coverage, interpreter: Interpreter):
+        self.coverage = coverage
+        self.interpreter = interpreter
+        self.executed = coverage.executed
+        self.taken = coverage.taken
+        self._last = coverage._last
+        self._first_branches = coverage._first_branches
+        self._visit = interpreter.visit
+        # The methods being replaced, which may have been replaced already
+        self._visit_statements = interpreter.visit_statements
+        self._visit_if = interpreter.visit_if
+        if isinstance(interpreter, StackInterpreter):
+            self._statements = interpreter._statements
+            self._if = interpreter._if
+            self._contains_calls = interpreter._contains_calls
+            # Subclasses may do more for each statement, e.g. suspend
+            self._inline = type(interpreter)._statements is StackInterpreter._statements
+
+    def install(self) -> None:
+        interpreter = self.interpreter
+        interpreter.visit_statements = self.visit_statements
+        interpreter.visit_if = self.visit_if
+        if isinstance(interpreter, StackInterpreter):
+            interpreter._statements = self.statements
+            interpreter._if = self.if_
+
+    # Statements in a block run in order, so if a statement ran all of those
+    # before it did. Blocks are only marked as they finish, or when a
+    # statement leaves them early, rather than setting a byte per statement,
+    # and blocks whose last statement ran are left to the original methods
+    # (which still record the blocks nested in them).
+
+    def _mark(self, last: int, statements: list[Statement], count: int) -> None:
+        # Marks the first count statements of the block ending at last
+        first = last + 1 - len(statements)
+        if not self.executed[first + count - 1]:
+            self.executed[first : first + count] = b"\x01" * count
+
+    def visit_statements(self, statements: list[Statement]) -> None:
+        last = self._last.get(id(statements))
+        if last is None or self.executed[last]:
+            return self._visit_statements(statements)
+        visit = self._visit
+        stmt = None
+        try:
+            for stmt in statements:
+                visit(stmt)
+        except BaseException:
+            position = next(i for i, item in enumerate(statements) if item is stmt)
+            self._mark(last, statements, position + 1)
+            raise
+        self._mark(last, statements, len(statements))
+
+    def visit_if(self, stmt: IfStmt) -> None:
+        index = self._first_branches.get(id(stmt))
+        if index is None:
+            return self._visit_if(stmt)
+        if self._visit(stmt.condition):
+            self.taken[index] = 1
+            self.visit_statements(stmt.then_branch)
+        else:
+            self.taken[index + 1] = 1
+            if stmt.else_branch is not None:
+                self.visit_statements(stmt.else_branch)
+
+    # The generators for StackInterpreter are only replaced while there's
+    # something to record, so covered code runs without an extra generator
+
+    def statements(self, statements: list[Statement]) -> Generator:
+        last = self._last.get(id(statements))
+        if last is None or self.executed[last]:
+            return self._statements(statements)
+        return self._record_statements(statements, last)
+
+    def _record_statements(self, statements: list[Statement], last: int):
+        position = 0
+        try:
+            for position, stmt in enumerate(statements):
+                # Same as StackInterpreter._statements() for statements
+                # without calls, saving a generator for each
+                if self._inline and not self._contains_calls(stmt):
+                    self._visit(stmt)
+                    continue
+                result = yield from self._statements([stmt])
+                if result is not None:
+                    self._mark(last, statements, position + 1)
+                    return result
+        except _Return as result:
+            self._mark(last, statements, position + 1)
+            return result
+        except BaseException:
+            self._mark(last, statements, position + 1)
+            raise
+        self._mark(last, statements, len(statements))
+        return None
+
+    def if_(self, stmt: IfStmt) -> Generator:
+        index = self._first_branches.get(id(stmt))
+        if index is None or self.taken[index] and self.taken[index + 1]:
+            return self._if(stmt)
+        return self._record_if(stmt, index)
+
+    def _record_if(self, stmt: IfStmt, index: int):
+        interpreter = self.interpreter
+        if (yield from interpreter._evaluate(stmt.condition)):
+            self.taken[index] = 1
+            return (yield from interpreter._statements(stmt.then_branch))
+        self.taken[index + 1] = 1
+        if stmt.else_branch is not None:
+            return (yield from interpreter._statements(stmt.else_branch))
+        return None
@@ -0,0 +1,226 @@
+"""
+Files used by OPENFILE, READFILE, WRITEFILE and CLOSEFILE.
+
+Files opened for reading are memory-mapped, and split into lines a large block
+at a time as they are read. The offsets of the blocks found are kept after
+the file is closed, so reading the file again after reopening it doesn't have
+to search for them again. Files opened for writing are written through a large buffer.
+"""
+
+__all__ = [
+    "FileReader",
+    "FileWriter",
+    "FileTable",
+]
+
+import mmap
+import os
+
+from cambridgeScript.constants import Keyword
+
+# Number of bytes of lines split at once when reading
+READ_BLOCK_SIZE = 1 << 20
+# Size of the buffer of files opened for writing
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+class FileReader:
+    """Reads a file line by line"""
+
+    path: str
+    encoding: str
+    # Number of lines read since the file was (re)opened
+    line_number: int
+
+    def __init__(
+        self,
+        path: str,
+        encoding: str = "utf-8",
+        previous: "FileReader | None" = None,
+    ):
+        """
+        :param path: path of the file
+        :param encoding: encoding of the file
+        :param previous: a closed reader of the same file, whose blocks are
+            reused if the file hasn't changed since
+        """
+        self.path = path
+        self.encoding = encoding
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._version = (stat.st_size, stat.st_mtime_ns)
+        self._size = stat.st_size
+        if self._size:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # Empty files can't be mapped
+            self._data = b""
+        # Offsets where the blocks of lines found so far end
+        self._block_ends: list[int] = []
+        if previous is not None and previous._version == self._version:
+            self._block_ends = previous._block_ends
+        self.rewind()
+
+    @property
+    def at_eof(self) -> bool:
+        return self._next == len(self._lines) and self._end >= self._size
+
+    def rewind(self) -> None:
+        self.line_number = 0
+        # Lines of the current block, and the index of the next one
+        self._lines: list[str] = []
+        self._next = 0
+        self._block = -1
+        self._end = 0
+
+    def _read_block(self) -> bool:
+        # Splits the next block of whole lines, returns False at the end
+        start = self._end
+        if start >= self._size:
+            return False
+        self._block += 1
+        if self._block < len(self._block_ends):
+            end = self._block_ends[self._block]
+        else:
+            newline = self._data.find(b"\n", start + READ_BLOCK_SIZE)
+            end = self._size if newline == -1 else newline + 1
+            self._block_ends.append(end)
+        text = str(self._data[start:end], self.encoding)
+        if "\r" in text:
+            text = text.replace("\r\n", "\n")
+        self._lines = text.split("\n")
+        if text.endswith("\n"):
+            self._lines.pop()
+        self._next = 0
+        self._end = end
+        return True
+
+    def read_line(self) -> str | None:
+        """
+        Read the next line, without its line ending.
+        :return: the line, or None at the end of the file
+        """
+        if self._next == len(self._lines) and not self._read_block():
+            return None
+        line = self._lines[self._next]
+        self._next += 1
+        self.line_number += 1
+        return line
+
+    def close(self) -> None:
+        """Close the file, keeping only the offsets of its blocks"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+        self._file.close()
+        self.rewind()
+
+
+class FileWriter:
+    """Writes a file line by line"""
+
+    path: str
+
+    def __init__(self, path: str, encoding: str = "utf-8"):
+        self.path = path
+        self._file = open(
+            path, "w", encoding=encoding, newline="", buffering=WRITE_BUFFER_SIZE
+        )
+
+    def write_line(self, line: str) -> None:
+        self._file.write(line)
+        self._file.write("\n")
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class FileTable:
+    """
+    The files opened by a program, by name.
+
+    Opening a file that is already open for reading rewinds it. The blocks
+    found in files closed after reading are kept, and reused if the file is
+    opened for reading again without having changed.
+    """
+
+    directory: str | None
+
+    def __init__(self, directory: str | None = None):
+        """
+        :param directory: directory file names are relative to, which files
+            outside of can't be opened, None for the current directory
+            without restrictions
+        """
+        self.directory = directory
+        self._open: dict[str, FileReader | FileWriter] = {}
+        # Closed readers, which only hold the offsets of their blocks
+        self._closed: dict[str, FileReader] = {}
+
+    def _path(self, name: str) -> str:
+        if self.directory is None:
+            return name
+        # Absolute names, .. and symbolic links must stay in the directory
+        directory = os.path.realpath(self.directory)
+        path = os.path.realpath(os.path.join(directory, name))
+        if os.path.commonpath([directory, path]) != directory:
+            raise ValueError(f"File {name} is outside the program's directory")
+        return path
+
+    def open(self, name: str, mode: Keyword) -> None:
+        """
+        Open a file.
+        :raises OSError: if the file can't be opened
+        :raises ValueError: if the file is outside the directory
+        """
+        if (current := self._open.pop(name, None)) is not None:
+            if mode is Keyword.READ and isinstance(current, FileReader):
+                current.rewind()
+                self._open[name] = current
+                return
+            current.close()
+        path = self._path(name)
+        previous = self._closed.pop(name, None)
+        if mode is Keyword.READ:
+            self._open[name] = FileReader(path, previous=previous)
+        else:
+            self._open[name] = FileWriter(path)
+
+    def reader(self, name: str) -> FileReader:
+        """
+        Get a file opened for reading.
+        :raises ValueError: if the file isn't open for reading
+        """
+        file = self._open.get(name)
+        if not isinstance(file, FileReader):
+            raise ValueError(f"File {name} isn't open for reading")
+        return file
+
+    def writer(self, name: str) -> FileWriter:
+        """
+        Get a file opened for writing.
+        :raises ValueError: if the file isn't open for writing
+        """
+        file = self._open.get(name)
+        if not isinstance(file, FileWriter):
+            raise ValueError(f"File {name} isn't open for writing")
+        return file
+
+    def close(self, name: str) -> None:
+        """
+        Close a file.
+        :raises ValueError: if the file isn't open
+        """
+        file = self._open.pop(name, None)
+        if file is None:
+            raise ValueError(f"File {name} isn't open")
+        file.close()
+        if isinstance(file, FileReader):
+            self._closed[name] = file
+
+    def close_all(self) -> None:
+        """Close every file, forgetting the blocks of closed ones"""
+        for file in self._open.values():
+            file.close()
+        self._open.clear()
+        self._closed.clear()
@@ -1,4 +1,29 @@
+import sys
+from random import Random
+from time import monotonic
+
+from cambridgeScript.constants import Operator
+from cambridgeScript.interpreter.analysis import (
+    assigned_names,
+    loop_index_candidates,
+    node_line,
+    pure_functions,
+    AffineIndex,
+)
+from cambridgeScript.interpreter.arrays import Array
+from cambridgeScript.interpreter.console import (
+    InputReader,
+    OutputWriter,
+    parse_value,
+)
+from cambridgeScript.interpreter.files import FileTable
+from cambridgeScript.interpreter.memo import CallCache, cache_key
+from cambridgeScript.interpreter.memory import MemoryUsage, value_size
+from cambridgeScript.interpreter.parallel import ParallelLoopRunner
+from cambridgeScript.interpreter.resolver import resolve_builtins
+from cambridgeScript.interpreter.strings import Rope
 from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.interpreter.vectorize import np, LoopVectorizer
 from cambridgeScript.parser.lexer import LiteralToken, Value
 from cambridgeScript.syntax_tree import (
     Expression,
@@ -6,6 +31,7 @@ from cambridgeScript.syntax_tree import (
     Literal,
     ArrayIndex,
     FunctionCall,
+    BuiltinCall,
     UnaryOp,
     BinaryOp,
     Statement,
@@ -28,14 +54,46 @@ from cambridgeScript.syntax_tree import (
     FunctionDecl,
     ProcedureDecl,
     Program,
+    ArrayType,
+    Assignable,
 )
+from cambridgeScript.syntax_tree.types import PrimitiveType
 from cambridgeScript.syntax_tree.visitors import ExpressionVisitor, StatementVisitor
 
+# Number of steps between reads of the clock when there is a time limit
+CLOCK_INTERVAL = 10_000
+
 
 class InterpreterError(Exception):
     pass
 
 
+def _operation_error(error: Exception) -> InterpreterError:
+    # Error for an operator failing on its operands, e.g. 1 / 0 or "a" + 1
+    if isinstance(error, ZeroDivisionError):
+        return InterpreterError("Division by zero")
+    return InterpreterError(f"Invalid operation: {error}")
+
+
+class LimitExceeded(InterpreterError):
+    """Raised when a program uses more of a resource than it's allowed"""
+
+    # The resource, e.g. "steps" or "time"
+    limit: str
+    # Source line where the program was stopped, from 1
+    line: int | None
+    # The message without the line
+    reason: str
+
+    def __init__(self, message: str, limit: str, line: int | None):
+        self.reason = message
+        if line is not None:
+            message = f"{message} at line {line}"
+        super().__init__(message)
+        self.limit = limit
+        self.line = line
+
+
 class InvalidNode(InterpreterError):
     node: Statement | Expression
 
@@ -43,11 +101,162 @@ class InvalidNode(InterpreterError):
         self.node = node
 
 
+class _Return(Exception):
+    # Raised by RETURN statements to unwind to the function call
+    value: Value
+
+    def __init__(self, value: Value):
+        self.value = value
+
+
 class Interpreter(ExpressionVisitor, StatementVisitor):
+    # Variables of the function or procedure being executed
     variable_state: VariableState
-
-    def __init__(self, vairable_state: VariableState):
+    global_state: VariableState
+    # Number of array accesses that skipped their bounds check
+    eliminated_checks: int
+    # Results of calls to pure functions, None if memoization is disabled
+    call_cache: CallCache | None
+    output: OutputWriter
+    input: InputReader
+    files: FileTable
+    # Number of loop iterations and calls allowed, None for no limit
+    max_steps: int | None
+    # Seconds a program may run for, None for no limit
+    time_limit: float | None
+    # Bytes used by strings and arrays, None if they aren't counted
+    memory: MemoryUsage | None
+
+    def __init__(
+        self,
+        vairable_state: VariableState,
+        memo_size: int = 0,
+        output: OutputWriter | None = None,
+        input: InputReader | None = None,
+        workers: int = 0,
+        max_steps: int | None = None,
+        time_limit: float | None = None,
+        max_memory: int | None = None,
+        track_memory: bool = False,
+    ):
+        """
+        :param vairable_state: the global variables
+        :param memo_size: number of results of pure functions to cache
+        :param output: where OUTPUT writes to, by default stdout
+        :param input: where INPUT reads from, by default stdin
+        :param workers: number of processes to run independent FOR loop
+            iterations on, 0 or 1 to run every loop sequentially
+        :param max_steps: number of loop iterations and calls a program may
+            execute, None for no limit
+        :param time_limit: seconds a program may run for, None for no limit
+        :param max_memory: bytes the program's strings and arrays may use,
+            None for no limit
+        :param track_memory: whether to count the memory used even without
+            a limit, see self.memory
+        """
         self.variable_state = vairable_state
+        self.global_state = vairable_state
+        self.output = output if output is not None else OutputWriter()
+        self.input = input if input is not None else InputReader()
+        self.files = FileTable()
+        self.call_cache = CallCache(memo_size) if memo_size else None
+        self._random: Random | None = None
+        self._pure_functions: set[str] | None = None
+        self._simple_loops: dict[int, bool] = {}
+        self._vectorizer = LoopVectorizer() if np is not None else None
+        self._parallel = ParallelLoopRunner(workers) if workers > 1 else None
+        self.eliminated_checks = 0
+        self._index_candidates: dict[int, list[AffineIndex]] = {}
+        # Ranges of the loop variables of the simple loops being executed
+        self._index_ranges: dict[str, tuple[int, int]] = {}
+        # ids of ArrayIndex nodes which are currently known to be in bounds
+        self._safe_indices: set[int] = set()
+        self.max_steps = max_steps
+        self.time_limit = time_limit
+        self._start_limits()
+        self.memory = None
+        if max_memory is not None or track_memory:
+            self.memory = MemoryUsage(max_memory)
+
+    @property
+    def random(self) -> Random:
+        """The generator used by RANDOM"""
+        # Created on first use, as its state is fairly large
+        if self._random is None:
+            self._random = Random()
+        return self._random
+
+    @random.setter
+    def random(self, generator: Random) -> None:
+        self._random = generator
+
+    @property
+    def steps(self) -> int:
+        """Number of loop iterations and calls executed"""
+        return self._counted_steps + self._interval - self._steps_left
+
+    def _start_limits(self) -> None:
+        # Starts counting the steps and time used by a program
+        self._counted_steps = 0
+        self._deadline = None
+        if self.time_limit is not None:
+            self._deadline = monotonic() + self.time_limit
+        self._reset_countdown()
+
+    def _reset_countdown(self) -> None:
+        # Loops and calls decrement _steps_left, and only check the limits
+        # once it reaches 0
+        interval = sys.maxsize
+        if self.max_steps is not None:
+            interval = self.max_steps - self._counted_steps + 1
+        if self._deadline is not None:
+            interval = min(interval, CLOCK_INTERVAL)
+        self._interval = self._steps_left = interval
+
+    def _check_limits(self, node: Statement | Expression) -> None:
+        """
+        Check the limits, after the countdown reached 0 at a node.
+        :raises LimitExceeded: if the program has used up a limit
+        """
+        self._counted_steps += self._interval - self._steps_left
+        self._interval = self._steps_left
+        if self.max_steps is not None and self._counted_steps > self.max_steps:
+            raise LimitExceeded(
+                f"Step limit of {self.max_steps} exceeded", "steps", node_line(node)
+            )
+        if self._deadline is not None and monotonic() > self._deadline:
+            raise LimitExceeded(
+                f"Time limit of {self.time_limit}s exceeded", "time", node_line(node)
+            )
+        self._reset_countdown()
+
+    def _count_steps(self, node: Statement | Expression, count: int) -> None:
+        self._steps_left -= count
+        if self._steps_left <= 0:
+            self._check_limits(node)
+
+    def _track_memory(self, name: str, node: Statement | Expression, size: int):
+        """
+        Record a change in the memory used, made by a variable.
+        :raises LimitExceeded: if the program now uses too much memory
+        """
+        if self.memory.add(size):
+            raise LimitExceeded(
+                f"Memory limit of {self.memory.limit} bytes exceeded by {name}",
+                "memory",
+                node_line(node),
+            )
+
+    def _release_scope(self, state: VariableState) -> None:
+        # Releases the memory used by the local variables of a finished call
+        if self.memory is not None:
+            self.memory.add(
+                -sum(
+                    value_size(value)
+                    for name, value in state.variables.items()
+                    if name not in state.shared
+                )
+            )
 
     def visit(self, thing: Expression | Statement):
         if isinstance(thing, Expression):
@@ -62,17 +271,148 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
     def visit_binary_op(self, expr: BinaryOp) -> Value:
         left = self.visit(expr.left)
         right = self.visit(expr.right)
-        return expr.operator(left, right)
+        try:
+            return expr.operator(left, right)
+        except (ArithmeticError, TypeError, ValueError) as e:
+            raise _operation_error(e) from e
 
     def visit_unary_op(self, expr: UnaryOp) -> Value:
         operand = self.visit(expr.operand)
-        return expr.operator(operand)
+        try:
+            return expr.operator(operand)
+        except (ArithmeticError, TypeError, ValueError) as e:
+            raise _operation_error(e) from e
 
     def visit_function_call(self, expr: FunctionCall) -> Value:
-        raise NotImplemented
+        function = self._function(expr)
+        args = [self.visit(param) for param in expr.params]
+        self._steps_left -= 1
+        if self._steps_left <= 0:
+            self._check_limits(expr)
+        return self._call_function(function, args)
+
+    def visit_builtin_call(self, expr: BuiltinCall) -> Value:
+        args = [self.visit(param) for param in expr.params]
+        return self._call_builtin(expr, args)
+
+    def _call_builtin(self, expr: BuiltinCall, args: list[Value]) -> Value:
+        try:
+            if expr.contextual:
+                return expr.function(self, *args)
+            return expr.function(*args)
+        except (TypeError, ValueError) as e:
+            raise InterpreterError(f"{expr.name.value}: {e}") from e
+
+    def _function(self, expr: FunctionCall) -> FunctionDecl:
+        # Finds the function being called
+        if not isinstance(expr.function, Identifier):
+            raise InterpreterError(f"{expr.function!r} is not callable")
+        name = expr.function.token.value
+        if name not in self.global_state.functions:
+            raise InterpreterError(f"Function {name} isn't defined")
+        return self.global_state.functions[name]
+
+    def _procedure(self, stmt: ProcedureCallStmt) -> ProcedureDecl:
+        # Finds the procedure being called
+        name = stmt.name.value
+        if name not in self.global_state.procedures:
+            raise InterpreterError(f"Procedure {name} isn't defined")
+        return self.global_state.procedures[name]
+
+    def _new_scope(
+        self, routine: FunctionDecl | ProcedureDecl, args: list[Value]
+    ) -> VariableState:
+        # Creates the local variables for a call
+        params = routine.params or []
+        if len(args) != len(params):
+            raise InterpreterError(
+                f"{routine.name.value} expects {len(params)} arguments, "
+                f"got {len(args)} instead"
+            )
+        state = VariableState(
+            variables={name.value: arg for (name, _), arg in zip(params, args)},
+            constants=self.global_state.constants,
+            functions=self.global_state.functions,
+            procedures=self.global_state.procedures,
+            types={
+                name.value: type_
+                for name, type_ in params
+                if isinstance(type_, PrimitiveType)
+            },
+        )
+        if self.memory is not None:
+            # Arrays are passed by reference, so only copied strings count
+            state.shared = frozenset(
+                name.value for (name, _), arg in zip(params, args) if type(arg) is Array
+            )
+            for (name, _), arg in zip(params, args):
+                if type(arg) is not Array:
+                    self._track_memory(name.value, routine, value_size(arg))
+        return state
+
+    def _cache_key(self, function: FunctionDecl, args: list[Value]):
+        # Returns the key for memoizing a call, or None if it can't be cached
+        if self.call_cache is None:
+            return None
+        if self._pure_functions is None:
+            self._pure_functions = pure_functions(self.global_state.functions)
+        name = function.name.value
+        if name not in self._pure_functions:
+            return None
+        return cache_key(name, args)
+
+    def _call_function(self, function: FunctionDecl, args: list[Value]) -> Value:
+        key = self._cache_key(function, args)
+        if key is not None:
+            is_cached, value = self.call_cache.get(key)
+            if not is_cached:
+                value = self._execute_function(function, args)
+                self.call_cache.put(key, value)
+            return value
+        return self._execute_function(function, args)
+
+    def _execute_function(self, function: FunctionDecl, args: list[Value]) -> Value:
+        caller_state = self.variable_state
+        self.variable_state = self._new_scope(function, args)
+        try:
+            self.visit_statements(function.body)
+        except _Return as result:
+            return result.value
+        finally:
+            self._release_scope(self.variable_state)
+            self.variable_state = caller_state
+        raise InterpreterError(
+            f"Function {function.name.value} ended without returning a value"
+        )
+
+    def scope_of(self, name: str) -> dict[str, Value | Array | None]:
+        """
+        Get the variables that a name refers to: the local variables if it's
+        declared locally, otherwise the global variables if it's declared
+        globally, otherwise the local variables.
+        """
+        variables = self.variable_state.variables
+        if name not in variables and name in self.global_state.variables:
+            return self.global_state.variables
+        return variables
 
     def visit_array_index(self, expr: ArrayIndex) -> Value:
-        raise NotImplemented
+        array = self._array(expr)
+        indices = [self.visit(index) for index in expr.index]
+        if id(expr) in self._safe_indices:
+            self.eliminated_checks += 1
+            return array.get_unchecked(indices)
+        try:
+            return array.get(indices)
+        except IndexError as e:
+            raise InterpreterError(str(e)) from e
+
+    def _array(self, expr: ArrayIndex) -> Array:
+        # Evaluates the array being indexed
+        array = self.visit(expr.array)
+        if not isinstance(array, Array):
+            raise InterpreterError(f"{array!r} is not an array")
+        return array
 
     def visit_literal(self, expr: Literal) -> Value:
         if not isinstance(expr.token, LiteralToken):
@@ -81,18 +421,22 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
 
     def visit_identifier(self, expr: Identifier) -> Value:
         name = expr.token.value
-        if name not in self.variable_state.variables:
-            raise InterpreterError(f"Name {name} isn't defined")
-        value = self.variable_state.variables[name]
+        variables = self.variable_state.variables
+        if name not in variables:
+            variables = self.global_state.variables
+            if name not in variables:
+                raise InterpreterError(f"Name {name} isn't defined")
+        value = variables[name]
         if value is None:
             raise InterpreterError(f"Name {name} has no value")
         return value
 
     def visit_proc_decl(self, stmt: ProcedureDecl) -> None:
-        pass
+        self.variable_state.procedures[stmt.name.value] = stmt
 
     def visit_func_decl(self, stmt: FunctionDecl) -> None:
-        pass
+        self.variable_state.functions[stmt.name.value] = stmt
+        self._pure_functions = None
 
     def visit_if(self, stmt: IfStmt) -> None:
         condition = self.visit(stmt.condition)
@@ -105,66 +449,368 @@ class Interpreter(ExpressionVisitor, StatementVisitor):
         pass
 
     def visit_for_loop(self, stmt: ForStmt) -> None:
-        if isinstance(stmt, ArrayIndex):
-            raise NotImplemented
+        if isinstance(stmt.variable, ArrayIndex):
+            raise InterpreterError("FOR loop variable must be a name")
         name = stmt.variable.token.value
-        current_value = self.visit(stmt.start)
+        start_value = self.visit(stmt.start)
         end_value = self.visit(stmt.end)
         if stmt.step is not None:
             step_value = self.visit(stmt.step)
         else:
             step_value = 1
-        while current_value <= end_value:
-            self.variable_state.variables[name] = current_value
+        if step_value == 0:
+            raise InterpreterError("FOR loop STEP can't be 0")
+        if (
+            type(start_value) is int
+            and type(end_value) is int
+            and type(step_value) is int
+            and self._is_simple_loop(stmt)
+        ):
+            if self._vectorizer is not None and self._vectorizer.run(
+                self, stmt, start_value, end_value, step_value
+            ):
+                self._count_iterations(stmt, start_value, end_value, step_value)
+                return
+            # Workers can't be stopped by the time limit
+            if (
+                self._parallel is not None
+                and self.time_limit is None
+                and self._parallel.run(self, stmt, start_value, end_value, step_value)
+            ):
+                self._count_iterations(stmt, start_value, end_value, step_value)
+                return
+            self._run_range_loop(stmt, name, start_value, end_value, step_value)
+        else:
+            self._run_generic_loop(stmt, name, start_value, end_value, step_value)
+
+    def _count_iterations(self, stmt: ForStmt, start: int, end: int, step: int) -> None:
+        # Counts the steps of a loop that was run all at once
+        stop = end + 1 if step > 0 else end - 1
+        self._count_steps(stmt, len(range(start, stop, step)))
+
+    def _is_simple_loop(self, stmt: ForStmt) -> bool:
+        # Whether the loop variable is never assigned in the body
+        key = id(stmt)
+        if (result := self._simple_loops.get(key)) is None:
+            assigned = assigned_names(stmt.body)
+            result = assigned is not None and stmt.variable.token.value not in assigned
+            self._simple_loops[key] = result
+        return result
+
+    def _run_range_loop(
+        self, stmt: ForStmt, name: str, start: int, end: int, step: int
+    ) -> None:
+        # Fast path for integer loops, the variable is bound directly
+        variables = self.scope_of(name)
+        body = stmt.body
+        visit_statements = self.visit_statements
+        stop = end + 1 if step > 0 else end - 1
+        values = range(start, stop, step)
+        if not values:
+            return
+        previous_range = self._index_ranges.get(name)
+        self._index_ranges[name] = (min(start, values[-1]), max(start, values[-1]))
+        proven = self._prove_indices(stmt)
+        try:
+            for value in values:
+                self._steps_left -= 1
+                if self._steps_left <= 0:
+                    self._check_limits(stmt)
+                variables[name] = value
+                visit_statements(body)
+        finally:
+            self._safe_indices.difference_update(proven)
+            if previous_range is None:
+                del self._index_ranges[name]
+            else:
+                self._index_ranges[name] = previous_range
+
+    def _prove_indices(self, stmt: ForStmt) -> list[int]:
+        # Marks array accesses in the loop body that must be in bounds
+        key = id(stmt)
+        if (candidates := self._index_candidates.get(key)) is None:
+            candidates = loop_index_candidates(stmt)
+            self._index_candidates[key] = candidates
+        proven = []
+        for candidate in candidates:
+            if id(candidate.node) in self._safe_indices:
+                continue
+            array = self.scope_of(candidate.array).get(candidate.array)
+            if not isinstance(array, Array) or len(array.bounds) != len(
+                candidate.terms
+            ):
+                continue
+            for (variable, offset), (lower, upper) in zip(
+                candidate.terms, array.bounds
+            ):
+                if variable is None:
+                    low = high = offset
+                elif variable in self._index_ranges:
+                    low, high = self._index_ranges[variable]
+                    low, high = low + offset, high + offset
+                else:
+                    break
+                if not lower <= low <= high <= upper:
+                    break
+            else:
+                proven.append(id(candidate.node))
+        self._safe_indices.update(proven)
+        return proven
+
+    def _run_generic_loop(
+        self, stmt: ForStmt, name: str, start: Value, end: Value, step: Value
+    ) -> None:
+        in_range = Operator.LESS_EQUAL if step > 0 else Operator.GREAT_EQUAL
+        variables = self.scope_of(name)
+        current_value = start
+        while in_range(current_value, end):
+            self._steps_left -= 1
+            if self._steps_left <= 0:
+                self._check_limits(stmt)
+            variables[name] = current_value
             self.visit_statements(stmt.body)
-            current_value += step_value
+            current_value += step
 
     def visit_repeat_until(self, stmt: RepeatUntilStmt) -> None:
-        pass
+        self.visit_statements(stmt.body)
+        while not self.visit(stmt.condition):
+            self._steps_left -= 1
+            if self._steps_left <= 0:
+                self._check_limits(stmt.condition)
+            self.visit_statements(stmt.body)
 
     def visit_while(self, stmt: WhileStmt) -> None:
-        pass
+        while self.visit(stmt.condition):
+            self._steps_left -= 1
+            if self._steps_left <= 0:
+                self._check_limits(stmt)
+            self.visit_statements(stmt.body)
 
     def visit_variable_decl(self, stmt: VariableDecl) -> None:
-        self.variable_state.variables[stmt.name.value] = None
+        bounds = None
+        if isinstance(stmt.type, ArrayType):
+            bounds = [
+                (self.visit(lower), self.visit(upper))
+                for lower, upper in stmt.type.ranges
+            ]
+        self._declare(stmt, bounds)
+
+    def _declare(
+        self, stmt: VariableDecl, bounds: list[tuple[Value, Value]] | None
+    ) -> None:
+        # Declares a variable, given the evaluated bounds of an array
+        if isinstance(stmt.type, ArrayType):
+            try:
+                value = Array(stmt.type.type, bounds)
+            except (TypeError, ValueError) as e:
+                raise InterpreterError(str(e)) from e
+        else:
+            value = None
+            self.variable_state.types[stmt.name.value] = stmt.type
+        variables = self.variable_state.variables
+        name = stmt.name.value
+        if self.memory is not None:
+            size = value_size(value) - value_size(variables.get(name))
+            self._track_memory(name, stmt, size)
+        variables[name] = value
 
     def visit_constant_decl(self, stmt: ConstantDecl) -> None:
         pass
 
     def visit_input(self, stmt: InputStmt) -> None:
-        pass
+        self._assign(stmt.variable, self._read_input(stmt))
+
+    def _read_input(self, stmt: InputStmt) -> Value:
+        if not self.input.has_line:
+            # Show any prompt before waiting for input
+            self.output.flush()
+        try:
+            line = self.input.read_line()
+            if line is None:
+                raise InterpreterError("No more input")
+            value = parse_value(line, self._declared_type(stmt.variable))
+        except ValueError as e:
+            # Also raised for input that can't be decoded
+            raise InterpreterError(str(e)) from e
+        return value
+
+    def _declared_type(self, target: Assignable) -> PrimitiveType | None:
+        if isinstance(target, ArrayIndex):
+            return self._array(target).type
+        name = target.token.value
+        state = self.variable_state
+        if name not in state.variables and name in self.global_state.variables:
+            state = self.global_state
+        return state.types.get(name)
 
     def visit_output(self, stmt: OutputStmt) -> None:
         values = []
         for expr in stmt.values:
             values.append(self.visit(expr))
-        print("".join(map(str, values)))
+        self._output(values)
+
+    def _output(self, values: list[Value]) -> None:
+        self.output.write_line("".join(map(str, values)))
 
     def visit_return(self, stmt: ReturnStmt) -> None:
-        pass
+        raise _Return(self.visit(stmt.value))
 
     def visit_f_open(self, stmt: FileOpenStmt) -> None:
-        pass
+        name = stmt.file.value
+        try:
+            self.files.open(name, stmt.mode.keyword)
+        except OSError as e:
+            raise InterpreterError(f"Can't open file {name}: {e.strerror}") from e
+        except ValueError as e:
+            raise InterpreterError(str(e)) from e
 
     def visit_f_read(self, stmt: FileReadStmt) -> None:
-        pass
+        self._assign(stmt.target, self._read_file(stmt))
+
+    def _read_file(self, stmt: FileReadStmt) -> Value:
+        name = stmt.file.value
+        try:
+            reader = self.files.reader(name)
+            line = reader.read_line()
+            if line is None:
+                raise InterpreterError(f"No more lines in file {name}")
+            value = parse_value(line, self._declared_type(stmt.target))
+        except ValueError as e:
+            raise InterpreterError(str(e)) from e
+        return value
 
     def visit_f_write(self, stmt: FileWriteStmt) -> None:
-        pass
+        self._write_file(stmt, self.visit(stmt.value))
+
+    def _write_file(self, stmt: FileWriteStmt, value: Value) -> None:
+        name = stmt.file.value
+        try:
+            self.files.writer(name).write_line(str(value))
+        except ValueError as e:
+            raise InterpreterError(str(e)) from e
 
     def visit_f_close(self, stmt: FileCloseStmt) -> None:
-        pass
+        try:
+            self.files.close(stmt.file.value)
+        except ValueError as e:
+            raise InterpreterError(str(e)) from e
 
     def visit_proc_call(self, stmt: ProcedureCallStmt) -> None:
-        pass
+        procedure = self._procedure(stmt)
+        args = [self.visit(arg) for arg in stmt.args or []]
+        self._steps_left -= 1
+        if self._steps_left <= 0:
+            self._check_limits(stmt)
+        caller_state = self.variable_state
+        self.variable_state = self._new_scope(procedure, args)
+        try:
+            self.visit_statements(procedure.body)
+        except _Return:
+            raise InterpreterError(
+                f"Procedure {procedure.name.value} can't return a value"
+            )
+        finally:
+            self._release_scope(self.variable_state)
+            self.variable_state = caller_state
+
+    def _assign(
+        self, target: Assignable, value: Value, indices: list[Value] | None = None
+    ) -> None:
+        # indices are those of an array element, if already evaluated
+        if isinstance(target, ArrayIndex):
+            self._assign_element(target, value, indices)
+            return
+        name = target.token.value
+        variables = self.variable_state.variables
+        if name not in variables:
+            variables = self.global_state.variables
+            if name not in variables:
+                raise InterpreterError(f"{name} was not declared")
+        if self.memory is not None:
+            size = value_size(value) - value_size(variables[name])
+            self._track_memory(name, target, size)
+        variables[name] = value
 
     def visit_assign(self, stmt: AssignmentStmt) -> None:
-        if isinstance(stmt.target, ArrayIndex):
-            raise NotImplemented
-        name = stmt.target.token.value
-        if name not in self.variable_state.variables:
-            raise InterpreterError(f"{name} was not declared")
-        self.variable_state.variables[name] = self.visit(stmt.value)
+        self._assign_result(stmt, self.visit(stmt.value))
+
+    def _assign_result(
+        self, stmt: AssignmentStmt, value: Value, indices: list[Value] | None = None
+    ) -> None:
+        if type(value) is str and self._is_append(stmt):
+            # Later appends to the variable won't have to copy the string
+            value = Rope(value)
+        self._assign(stmt.target, value, indices)
+
+    @staticmethod
+    def _is_append(stmt: AssignmentStmt) -> bool:
+        # Whether the statement is of the form s <- s + ...
+        if not isinstance(stmt.target, Identifier):
+            return False
+        expr = stmt.value
+        while isinstance(expr, BinaryOp) and expr.operator is Operator.ADD:
+            expr = expr.left
+        return (
+            isinstance(expr, Identifier)
+            and expr.token.value == stmt.target.token.value
+        )
+
+    def _assign_element(
+        self, target: ArrayIndex, value: Value, indices: list[Value] | None = None
+    ) -> None:
+        array = self._array(target)
+        if indices is None:
+            indices = [self.visit(index) for index in target.index]
+        if self.memory is not None:
+            if isinstance(target.array, Identifier):
+                name = target.array.token.value
+            else:
+                name = repr(array)
+        try:
+            if self.memory is not None:
+                size = self._element_size(array, indices)
+                if array.materializes(indices):
+                    # Charged before the dense buffer is allocated
+                    growth = array.dense_nbytes - array.nbytes
+                    self._track_memory(name, target, growth)
+                    size += growth
+            if id(target) in self._safe_indices:
+                self.eliminated_checks += 1
+                array.set_unchecked(indices, value)
+            else:
+                array.set(indices, value)
+        except IndexError as e:
+            raise InterpreterError(str(e)) from e
+        except (TypeError, OverflowError) as e:
+            raise InterpreterError(
+                f"Can't store {value!r} in an array of {array.type.name}"
+            ) from e
+        if self.memory is not None:
+            size = self._element_size(array, indices) - size
+            self._track_memory(name, target, size)
+
+    @staticmethod
+    def _element_size(array: Array, indices: list[Value]) -> int:
+        # Size of the array's storage and the element's characters, as sparse
+        # arrays grow when elements are written
+        size = array.nbytes
+        if array.type in (PrimitiveType.CHAR, PrimitiveType.STRING):
+            size += len(array.get(indices))
+        return size
 
     def visit_program(self, stmt: Program) -> None:
-        self.visit_statements(stmt.statements)
+        resolve_builtins(stmt)
+        self._start_limits()
+        try:
+            self.visit_statements(stmt.statements)
+        except _Return:
+            raise InterpreterError("RETURN can only be used in a function")
+        finally:
+            self._finish_program()
+
+    def _finish_program(self) -> None:
+        # Releases everything the program used, even if it failed
+        self.files.close_all()
+        if self._parallel is not None:
+            self._parallel.shutdown()
+        self.output.flush()
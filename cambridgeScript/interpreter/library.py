@@ -0,0 +1,93 @@
+__all__ = [
+    "Builtin",
+    "BUILTINS",
+    "builtin",
+]
+
+import math
+from dataclasses import dataclass
+from typing import Callable, TYPE_CHECKING
+
+from cambridgeScript.interpreter import strings
+from cambridgeScript.parser.lexer import Value
+
+if TYPE_CHECKING:
+    from cambridgeScript.interpreter.interpreter import Interpreter
+
+
+@dataclass(frozen=True)
+class Builtin:
+    name: str
+    function: Callable[..., Value]
+    # Whether the result only depends on the arguments
+    pure: bool = True
+    # Whether the function takes the interpreter as its first argument
+    contextual: bool = False
+
+
+# Library functions, by name
+BUILTINS: dict[str, Builtin] = {}
+
+
+def builtin(name: str, *, pure: bool = True, contextual: bool = False):
+    """Decorator registering a library function"""
+
+    def decorator(function: Callable[..., Value]) -> Callable[..., Value]:
+        BUILTINS[name] = Builtin(name, function, pure, contextual)
+        return function
+
+    return decorator
+
+
+def _check_number(*values: Value) -> None:
+    for value in values:
+        if type(value) not in (int, float):
+            raise TypeError(f"Expected a number, got {value!r} instead")
+
+
+@builtin("DIV")
+def div(dividend: int | float, divisor: int | float) -> int:
+    _check_number(dividend, divisor)
+    if divisor == 0:
+        raise ValueError("Division by zero")
+    return int(dividend // divisor)
+
+
+@builtin("MOD")
+def mod(dividend: int | float, divisor: int | float) -> int | float:
+    _check_number(dividend, divisor)
+    if divisor == 0:
+        raise ValueError("Division by zero")
+    return dividend % divisor
+
+
+@builtin("ROUND")
+def round_(value: int | float, places: int) -> int | float:
+    _check_number(value)
+    if type(places) is not int:
+        raise TypeError("ROUND places must be an integer")
+    return round(value, places)
+
+
+@builtin("INT")
+def int_(value: int | float) -> int:
+    _check_number(value)
+    if not math.isfinite(value):
+        raise ValueError(f"Can't convert {value} to an integer")
+    return int(value)
+
+
+@builtin("RANDOM", pure=False, contextual=True)
+def random(interpreter: "Interpreter") -> float:
+    return interpreter.random.random()
+
+
+@builtin("EOF", pure=False, contextual=True)
+def eof(interpreter: "Interpreter", name: str) -> bool:
+    return interpreter.files.reader(str(name)).at_eof
+
+
+builtin("LENGTH")(strings.length)
+builtin("SUBSTRING")(strings.substring)
+builtin("UCASE")(strings.ucase)
+builtin("LCASE")(strings.lcase)
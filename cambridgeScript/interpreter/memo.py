@@ -0,0 +1,74 @@
+__all__ = [
+    "CallCache",
+    "cache_key",
+]
+
+from collections import OrderedDict
+from typing import Hashable
+
+from cambridgeScript.interpreter.strings import Rope
+from cambridgeScript.parser.lexer import Value
+
+_KEY_TYPES = (int, float, str, bool)
+
+
+def cache_key(name: str, args: list[Value]) -> Hashable | None:
+    """
+    Create the key for caching a call.
+    :return: the key, or None if some arguments can't be used in a key
+    """
+    key = [name]
+    for arg in args:
+        if isinstance(arg, Rope):
+            arg = str(arg)
+        # Types are part of the key, since 1, 1.0 and TRUE are all equal
+        if type(arg) not in _KEY_TYPES:
+            return None
+        key.append((type(arg), arg))
+    return tuple(key)
+
+
+class CallCache:
+    """A bounded least-recently-used cache for the results of pure functions"""
+
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+    def __init__(self, maxsize: int):
+        if maxsize <= 0:
+            raise ValueError("Cache size must be positive")
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+        self._results: OrderedDict[Hashable, Value] = OrderedDict()
+
+    def get(self, key: Hashable) -> tuple[bool, Value | None]:
+        """
+        Look up a call.
+        :return: whether the call was cached, and its result
+        """
+        try:
+            value = self._results[key]
+        except KeyError:
+            self.misses += 1
+            return False, None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def put(self, key: Hashable, value: Value) -> None:
+        self._results[key] = value
+        self._results.move_to_end(key)
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._results),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
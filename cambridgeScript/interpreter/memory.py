@@ -0,0 +1,51 @@
+"""
+Approximate accounting of the memory used by a program's values.
+
+Only strings and arrays are counted, as other values have a small fixed size.
+Strings count one byte per character, and arrays the size of their storage
+(see Array.nbytes) plus the characters of their string elements.
+"""
+
+__all__ = [
+    "value_size",
+    "MemoryUsage",
+]
+
+from cambridgeScript.interpreter.arrays import Array
+from cambridgeScript.interpreter.strings import Rope
+from cambridgeScript.parser.lexer import Value
+
+
+def value_size(value: Value | Array | None) -> int:
+    """Get the approximate number of bytes a value uses"""
+    if type(value) is str or type(value) is Rope:
+        return len(value)
+    if type(value) is Array:
+        return value.nbytes + value.text_size
+    return 0
+
+
+class MemoryUsage:
+    """Running total of the bytes used by the values of a program"""
+
+    # Maximum number of bytes, None for no limit
+    limit: int | None
+    used: int
+    # Highest value of used so far
+    peak: int
+
+    def __init__(self, limit: int | None = None):
+        self.limit = limit
+        self.used = 0
+        self.peak = 0
+
+    def add(self, size: int) -> bool:
+        """
+        Add to the number of bytes used, negative to release them.
+        :return: whether more than the limit is now used
+        """
+        self.used += size
+        if self.used <= self.peak:
+            return False
+        self.peak = self.used
+        return self.limit is not None and self.used > self.limit
@@ -0,0 +1,179 @@
+"""
+Runs FOR loops with independent iterations on a pool of processes.
+
+The iterations are split into one chunk per worker. Each worker runs its chunk
+with its own interpreter, on a copy of the variables the loop uses, and sends
+back the elements it wrote. These are then stored into the real arrays.
+
+If any chunk fails, nothing is stored and the loop is executed normally
+instead, so that errors are raised exactly as they would be sequentially.
+"""
+
+__all__ = [
+    "ParallelLoopRunner",
+]
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from cambridgeScript.interpreter.analysis import ParallelLoop, parallel_loop
+from cambridgeScript.interpreter.arrays import Array
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import Value
+from cambridgeScript.syntax_tree import ForStmt, PrimitiveType, Statement
+
+if TYPE_CHECKING:
+    from cambridgeScript.interpreter.interpreter import Interpreter
+
+# Loops with fewer iterations aren't worth sending to other processes
+MIN_ITERATIONS = 10_000
+
+
+def _run_chunk(
+    interpreter_class: type["Interpreter"],
+    body: list[Statement],
+    loop: ParallelLoop,
+    indices: range,
+    variables: dict[str, Value | Array],
+) -> dict[str, list[Value]] | None:
+    # Runs in a worker, returns the written elements or None if it failed
+    interpreter = interpreter_class(VariableState(variables=variables))
+    try:
+        for index in indices:
+            variables[loop.variable] = index
+            interpreter.visit_statements(body)
+    except Exception:
+        # The loop is rerun sequentially, which raises the error again
+        return None
+    return {
+        name: [variables[name].get_unchecked([index]) for index in indices]
+        for name in loop.written
+    }
+
+
+def _text_growth(
+    variables: dict[str, Value | Array],
+    chunks: list[range],
+    results: list[dict[str, list[Value]]],
+) -> dict[str, int]:
+    # Change in the characters of the string arrays the results are stored in
+    growth = {}
+    for chunk, result in zip(chunks, results):
+        for name, values in result.items():
+            array = variables[name]
+            if array.type not in (PrimitiveType.CHAR, PrimitiveType.STRING):
+                continue
+            old = sum(len(array.get_unchecked([index])) for index in chunk)
+            growth[name] = growth.get(name, 0) + sum(map(len, values)) - old
+    return growth
+
+
+class ParallelLoopRunner:
+    """Checks FOR loops for independent iterations and runs them in parallel"""
+
+    workers: int
+
+    def __init__(self, workers: int):
+        """
+        :param workers: number of worker processes
+        """
+        self.workers = workers
+        self._pool: ProcessPoolExecutor | None = None
+        self._loops: dict[int, ParallelLoop | None] = {}
+
+    def run(
+        self,
+        interpreter: "Interpreter",
+        stmt: ForStmt,
+        start: int,
+        end: int,
+        step: int,
+    ) -> bool:
+        """
+        Attempt to run a loop with integer bounds in parallel.
+        :return: whether the loop was run, if not it must be run normally
+        """
+        stop = end + 1 if step > 0 else end - 1
+        indices = range(start, stop, step)
+        if len(indices) < MIN_ITERATIONS:
+            return False
+        key = id(stmt)
+        if key not in self._loops:
+            self._loops[key] = parallel_loop(stmt)
+        loop = self._loops[key]
+        if loop is None:
+            return False
+        variables = {}
+        for name in loop.names | loop.written:
+            scope = interpreter.scope_of(name)
+            if name not in scope:
+                # Let the sequential loop report the error
+                return False
+            variables[name] = scope[name]
+        arrays = [variables.get(name) for name in loop.written]
+        if not all(
+            isinstance(array, Array) and len(array.bounds) == 1 for array in arrays
+        ):
+            return False
+        # A written array could also be passed in under another name
+        written_ids = {id(array) for array in arrays}
+        if len(written_ids) != len(arrays) or any(
+            id(value) in written_ids
+            for name, value in variables.items()
+            if name not in loop.written
+        ):
+            return False
+        for array in arrays:
+            lower, upper = array.bounds[0]
+            if not (lower <= indices[0] <= upper and lower <= indices[-1] <= upper):
+                return False
+        # Any write could make a sparse array dense, which is left to the
+        # sequential loop to charge for
+        if interpreter.memory is not None and any(
+            array.representation == "sparse" for array in arrays
+        ):
+            return False
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        chunk_size = -(-len(indices) // self.workers)
+        chunks = [
+            indices[i : i + chunk_size] for i in range(0, len(indices), chunk_size)
+        ]
+        futures = [
+            self._pool.submit(
+                _run_chunk,
+                type(interpreter),
+                stmt.body,
+                loop,
+                chunk,
+                variables,
+            )
+            for chunk in chunks
+        ]
+        results = [future.result() for future in futures]
+        if None in results:
+            return False
+        growth = {}
+        if interpreter.memory is not None:
+            growth = _text_growth(variables, chunks, results)
+            limit = interpreter.memory.limit
+            if limit is not None and interpreter.memory.used + sum(
+                growth.values()
+            ) > limit:
+                # Let the sequential loop raise the error where it happens
+                return False
+        for chunk, result in zip(chunks, results):
+            for name, values in result.items():
+                array = variables[name]
+                for index, value in zip(chunk, values):
+                    array.set_unchecked([index], value)
+        for name, size in growth.items():
+            interpreter._track_memory(name, stmt, size)
+        interpreter.scope_of(loop.variable)[loop.variable] = indices[-1]
+        return True
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,335 @@
+"""
+Profiles the time spent on, and the memory allocated by, each line of a
+program.
+
+ProfilingInterpreter times every statement it executes, and attributes the
+time to the statement's source line and to the function or procedure it is
+in. Self time excludes the time of nested statements (e.g. the body of a
+loop) and of calls, total time includes them. Recursive calls are only
+counted once in total times, like in cProfile.
+
+The results can be written as an annotated listing of the source, and as
+collapsed stacks ("(main):12;fib:3 1500" per line, in microseconds) for
+flamegraph tools.
+
+AllocationProfiler counts the strings and arrays created by each line, and
+their sizes.
+"""
+
+__all__ = [
+    "LineStats",
+    "RoutineStats",
+    "ProfilingInterpreter",
+    "AllocationStats",
+    "AllocationProfiler",
+]
+
+from collections import defaultdict
+from dataclasses import dataclass
+from time import perf_counter_ns
+from typing import TextIO
+
+from cambridgeScript.interpreter.analysis import node_line
+from cambridgeScript.interpreter.interpreter import Interpreter, _operation_error
+from cambridgeScript.interpreter.memory import value_size
+from cambridgeScript.interpreter.strings import Rope
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import Value
+from cambridgeScript.syntax_tree import (
+    Expression,
+    ArrayIndex,
+    BuiltinCall,
+    BinaryOp,
+    Statement,
+    FileReadStmt,
+    InputStmt,
+    VariableDecl,
+    FunctionDecl,
+    ProcedureDecl,
+    Program,
+    ArrayType,
+    Assignable,
+)
+from cambridgeScript.syntax_tree.visitors import ExpressionVisitor, StatementVisitor
+
+# Name used for statements outside any function or procedure
+MAIN = "(main)"
+
+
+@dataclass
+class LineStats:
+    # Number of times a statement on the line was executed
+    hits: int = 0
+    # Times in nanoseconds
+    total_time: int = 0
+    self_time: int = 0
+
+
+@dataclass
+class RoutineStats:
+    calls: int = 0
+    # Times in nanoseconds
+    total_time: int = 0
+    self_time: int = 0
+
+
+class ProfilingInterpreter(Interpreter):
+    """Interpreter recording the time spent on each line, see the module"""
+
+    lines: dict[int, LineStats]
+    routines: dict[str, RoutineStats]
+    # Self time in nanoseconds of each stack of "routine:line" frames
+    stacks: dict[str, int]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Loops run all at once wouldn't time their bodies line by line
+        self._vectorizer = None
+        self._parallel = None
+        self.lines = defaultdict(LineStats)
+        self.routines = defaultdict(RoutineStats)
+        self.stacks = defaultdict(int)
+        self._lines: dict[int, int | None] = {}
+        # Label and time spent in nested statements, for each statement
+        # being executed
+        self._statements: list[list] = []
+        # Routine being executed, and the frames of the calls leading to it
+        self._routine = MAIN
+        self._prefix = ""
+        # Routine, prefix and start time of the callers
+        self._calls: list[tuple[str, str, int]] = []
+        # Number of activations of each line or routine, for recursion
+        self._active: dict[int | str, int] = defaultdict(int)
+
+    def _line(self, stmt: Statement) -> int | None:
+        key = id(stmt)
+        if key not in self._lines:
+            self._lines[key] = node_line(stmt)
+        return self._lines[key]
+
+    def visit(self, thing: Expression | Statement):
+        if isinstance(thing, Expression):
+            return ExpressionVisitor.visit(self, thing)
+        if isinstance(thing, (Program, FunctionDecl, ProcedureDecl)):
+            # Declarations take no time, and programs span every line
+            return StatementVisitor.visit(self, thing)
+        line = self._line(thing)
+        if line is None:
+            return StatementVisitor.visit(self, thing)
+        label = f"{self._routine}:{line}"
+        entry = [label, 0]
+        self._statements.append(entry)
+        self._active[line] += 1
+        start = perf_counter_ns()
+        try:
+            return StatementVisitor.visit(self, thing)
+        finally:
+            elapsed = perf_counter_ns() - start
+            self._statements.pop()
+            if self._statements:
+                self._statements[-1][1] += elapsed
+            own = elapsed - entry[1]
+            stats = self.lines[line]
+            stats.hits += 1
+            stats.self_time += own
+            self._active[line] -= 1
+            if not self._active[line]:
+                stats.total_time += elapsed
+            self.routines[self._routine].self_time += own
+            self.stacks[self._prefix + label] += own
+
+    def _new_scope(
+        self, routine: FunctionDecl | ProcedureDecl, args: list[Value]
+    ) -> VariableState:
+        state = super()._new_scope(routine, args)
+        self._calls.append((self._routine, self._prefix, perf_counter_ns()))
+        if self._statements:
+            self._prefix += self._statements[-1][0] + ";"
+        self._routine = routine.name.value
+        self.routines[self._routine].calls += 1
+        self._active[self._routine] += 1
+        return state
+
+    def _release_scope(self, state: VariableState) -> None:
+        super()._release_scope(state)
+        caller, prefix, start = self._calls.pop()
+        self._active[self._routine] -= 1
+        if not self._active[self._routine]:
+            elapsed = perf_counter_ns() - start
+            self.routines[self._routine].total_time += elapsed
+        self._routine = caller
+        self._prefix = prefix
+
+    def visit_program(self, stmt: Program) -> None:
+        self.routines[MAIN].calls += 1
+        start = perf_counter_ns()
+        try:
+            super().visit_program(stmt)
+        finally:
+            self.routines[MAIN].total_time += perf_counter_ns() - start
+
+    def write_listing(self, source: str, file: TextIO) -> None:
+        """
+        Write the source code annotated with the time spent on each line,
+        followed by the time spent in each routine.
+        :param source: source code of the profiled program
+        :param file: text stream to write to
+        """
+        total = self.routines[MAIN].total_time or 1
+        file.write(
+            f"{'Line':>6} {'Hits':>10} {'Total ms':>10} {'Self ms':>10} "
+            f"{'Self %':>7}  Source\n"
+        )
+        for number, text in enumerate(source.splitlines(), 1):
+            stats = self.lines.get(number)
+            if stats is None:
+                file.write(f"{number:>6} {'':>40}  {text}\n")
+                continue
+            file.write(
+                f"{number:>6} {stats.hits:>10} {stats.total_time / 1e6:>10.3f} "
+                f"{stats.self_time / 1e6:>10.3f} "
+                f"{stats.self_time / total:>7.1%}  {text}\n"
+            )
+        file.write(
+            f"\n{'Routine':<20} {'Calls':>10} {'Total ms':>10} {'Self ms':>10}\n"
+        )
+        routines = sorted(
+            self.routines.items(), key=lambda item: item[1].total_time, reverse=True
+        )
+        for name, stats in routines:
+            file.write(
+                f"{name:<20} {stats.calls:>10} {stats.total_time / 1e6:>10.3f} "
+                f"{stats.self_time / 1e6:>10.3f}\n"
+            )
+
+    def write_collapsed(self, file: TextIO) -> None:
+        """
+        Write the self time of each stack in the collapsed format read by
+        flamegraph tools, in microseconds.
+        """
+        for stack, time in sorted(self.stacks.items()):
+            if time >= 1000:
+                file.write(f"{stack} {time // 1000}\n")
+
+
+@dataclass
+class AllocationStats:
+    # Number of strings and arrays created
+    count: int = 0
+    # Approximate bytes, see memory.value_size()
+    size: int = 0
+
+
+class AllocationProfiler(Interpreter):
+    """
+    Interpreter recording the strings and arrays created by each line.
+
+    Counted are the results of string operations and builtins (including
+    temporaries that are never stored), strings read by INPUT and READFILE,
+    arrays declared, and the growth of sparse arrays. Appending to a string
+    built by repeated s <- s + ... only counts the appended part, as that is
+    all that is copied.
+    """
+
+    lines: dict[int, AllocationStats]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lines = defaultdict(AllocationStats)
+        self._lines: dict[int, int | None] = {}
+        # Lines of the statements being executed
+        self._line_stack: list[int | None] = [None]
+        self._reading = False
+
+    def _count(self, size: int) -> None:
+        stats = self.lines[self._line_stack[-1]]
+        stats.count += 1
+        stats.size += size
+
+    def visit(self, thing: Expression | Statement):
+        if isinstance(thing, Expression):
+            return ExpressionVisitor.visit(self, thing)
+        key = id(thing)
+        if key not in self._lines:
+            self._lines[key] = node_line(thing)
+        self._line_stack.append(self._lines[key])
+        try:
+            return StatementVisitor.visit(self, thing)
+        finally:
+            self._line_stack.pop()
+
+    def visit_binary_op(self, expr: BinaryOp) -> Value:
+        left = self.visit(expr.left)
+        right = self.visit(expr.right)
+        try:
+            result = expr.operator(left, right)
+        except (ArithmeticError, TypeError, ValueError) as e:
+            raise _operation_error(e) from e
+        if type(result) is Rope:
+            self._count(len(result) - len(left) if type(left) is Rope else len(result))
+        elif type(result) is str:
+            self._count(len(result))
+        return result
+
+    def _call_builtin(self, expr: BuiltinCall, args: list[Value]) -> Value:
+        result = super()._call_builtin(expr, args)
+        if type(result) is str or type(result) is Rope:
+            self._count(len(result))
+        return result
+
+    def visit_variable_decl(self, stmt: VariableDecl) -> None:
+        super().visit_variable_decl(stmt)
+        if isinstance(stmt.type, ArrayType):
+            self._count(value_size(self.variable_state.variables[stmt.name.value]))
+
+    def _assign_element(
+        self, target: ArrayIndex, value: Value, indices: list[Value] | None = None
+    ) -> None:
+        array = self._array(target)
+        size = array.nbytes
+        super()._assign_element(target, value, indices)
+        if array.nbytes > size:
+            self._count(array.nbytes - size)
+
+    def visit_input(self, stmt: InputStmt) -> None:
+        self._reading = True
+        try:
+            super().visit_input(stmt)
+        finally:
+            self._reading = False
+
+    def visit_f_read(self, stmt: FileReadStmt) -> None:
+        self._reading = True
+        try:
+            super().visit_f_read(stmt)
+        finally:
+            self._reading = False
+
+    def _assign(
+        self, target: Assignable, value: Value, indices: list[Value] | None = None
+    ) -> None:
+        if self._reading and type(value) is str:
+            self._count(len(value))
+        super()._assign(target, value, indices)
+
+    def top_lines(self, count: int = 10) -> list[tuple[int | None, AllocationStats]]:
+        """Get the lines which allocated the most bytes, most first"""
+        lines = sorted(self.lines.items(), key=lambda item: item[1].size, reverse=True)
+        return lines[:count]
+
+    def write_report(self, source: str, file: TextIO, count: int = 10) -> None:
+        """
+        Write the lines which allocated the most bytes.
+        :param source: source code of the profiled program
+        :param file: text stream to write to
+        :param count: number of lines to show
+        """
+        text = source.splitlines()
+        total = sum(stats.size for stats in self.lines.values()) or 1
+        file.write(f"{'Line':>6} {'Allocs':>10} {'Bytes':>12} {'%':>7}  Source\n")
+        for line, stats in self.top_lines(count):
+            source_line = text[line - 1].strip() if line is not None else ""
+            file.write(
+                f"{line if line is not None else '-':>6} {stats.count:>10} "
+                f"{stats.size:>12} {stats.size / total:>7.1%}  {source_line}\n"
+            )
@@ -0,0 +1,67 @@
+__all__ = [
+    "resolve_builtins",
+]
+
+from dataclasses import fields
+
+from cambridgeScript.interpreter.analysis import iter_nodes
+from cambridgeScript.interpreter.library import BUILTINS
+from cambridgeScript.syntax_tree import (
+    Expression,
+    Identifier,
+    FunctionCall,
+    BuiltinCall,
+    Statement,
+    FunctionDecl,
+    Program,
+    ArrayType,
+)
+
+
+def resolve_builtins(program: Program) -> None:
+    """
+    Bind calls to library functions before execution, replacing their
+    FunctionCall nodes with BuiltinCall nodes in place.
+    Functions declared by the program take precedence over library functions.
+    Programs already resolved are left alone, so programs shared by runs on
+    many threads are only read.
+    :param program: the program to resolve
+    """
+    if program.builtins_resolved:
+        return
+    user_functions = {
+        node.name.value
+        for node in iter_nodes(program)
+        if isinstance(node, FunctionDecl)
+    }
+    _rewrite(program, user_functions)
+    program.builtins_resolved = True
+
+
+def _rewrite(value, user_functions: set[str]):
+    # Returns the value with its calls to library functions bound
+    if isinstance(value, list):
+        for i, item in enumerate(value):
+            # Only changed items are replaced, so resolving is read-only once done
+            if (new_item := _rewrite(item, user_functions)) is not item:
+                value[i] = new_item
+        return value
+    if isinstance(value, tuple):
+        items = tuple(_rewrite(item, user_functions) for item in value)
+        changed = any(new is not old for new, old in zip(items, value))
+        return items if changed else value
+    if not isinstance(value, (Expression, Statement, ArrayType)):
+        return value
+    for field in fields(value):
+        child = getattr(value, field.name)
+        if (new_child := _rewrite(child, user_functions)) is not child:
+            # ArrayType is frozen
+            object.__setattr__(value, field.name, new_child)
+    if isinstance(value, FunctionCall) and isinstance(value.function, Identifier):
+        name = value.function.token.value
+        if name not in user_functions and name in BUILTINS:
+            builtin = BUILTINS[name]
+            return BuiltinCall(
+                value.function.token, builtin.function, value.params, builtin.contextual
+            )
+    return value
@@ -0,0 +1,97 @@
+"""
+An interpreter which can be suspended and resumed, to run many programs on one
+thread (e.g. from an asyncio event loop).
+
+Execution is a generator which yields a Suspension whenever the program waits
+for input, and every slice_size statements so other programs get a turn.
+Statements that might suspend (INPUT, loops and anything containing them) are
+executed by generators, like statements with calls in StackInterpreter.
+"""
+
+__all__ = [
+    "Suspension",
+    "ResumableInterpreter",
+]
+
+from enum import Enum
+from typing import Generator
+
+from cambridgeScript.interpreter.analysis import iter_nodes
+from cambridgeScript.interpreter.resolver import resolve_builtins
+from cambridgeScript.interpreter.stack import StackInterpreter
+from cambridgeScript.syntax_tree import (
+    Expression,
+    Statement,
+    InputStmt,
+    WhileStmt,
+    RepeatUntilStmt,
+    ForStmt,
+    Program,
+)
+
+_SUSPENDING_STATEMENTS = (InputStmt, WhileStmt, RepeatUntilStmt, ForStmt)
+
+
+class Suspension(Enum):
+    # The program is waiting for a line of input
+    INPUT = "input"
+    # The program ran for slice_size statements
+    YIELD = "yield"
+
+
+class ResumableInterpreter(StackInterpreter):
+    """Interpreter whose execution can be suspended, see execute()"""
+
+    # Number of statements executed between yields
+    slice_size: int
+
+    def __init__(self, *args, slice_size: int = 1000, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.slice_size = slice_size
+        self._countdown = slice_size
+        self._may_suspend: dict[int, bool] = {}
+
+    def execute(self, program: Program) -> Generator[Suspension, None, None]:
+        """
+        Start executing a program.
+        Input is taken from self.input, and execution is suspended with
+        Suspension.INPUT until a whole line has been fed to it.
+        :return: a generator which runs the program when iterated
+        """
+        resolve_builtins(program)
+        self._start_limits()
+        try:
+            result = yield from self._drive(self._statements(program.statements))
+            if result is not None:
+                raise self._misplaced_return(None)
+        finally:
+            self._finish_program()
+
+    def _contains_calls(self, node: Statement | Expression) -> bool:
+        # Statements which might suspend are also executed by generators
+        if super()._contains_calls(node):
+            return True
+        if isinstance(node, Expression):
+            return False
+        key = id(node)
+        if (result := self._may_suspend.get(key)) is None:
+            result = any(
+                isinstance(child, _SUSPENDING_STATEMENTS) for child in iter_nodes(node)
+            )
+            self._may_suspend[key] = result
+        return result
+
+    def _statements(self, statements: list[Statement]):
+        for stmt in statements:
+            self._countdown -= 1
+            if self._countdown <= 0:
+                self._countdown = self.slice_size
+                yield Suspension.YIELD
+            if isinstance(stmt, InputStmt) and not self.input.has_line:
+                self.output.flush()
+                while not self.input.has_line:
+                    yield Suspension.INPUT
+            result = yield from super()._statements([stmt])
+            if result is not None:
+                return result
+        return None
@@ -0,0 +1,464 @@
+"""
+An interpreter which keeps its own call stack instead of using Python's.
+
+Statements which may call user-defined functions or procedures are executed
+by generators. A generator yields a call request instead of calling the
+function directly, and a driver loop pushes a frame for the callee onto a
+heap-allocated stack, sending the return value back once the callee is done.
+Calls in tail position (RETURN f(...)) replace the current frame instead.
+
+Statements without calls are still executed by the (faster) recursive visitor.
+"""
+
+__all__ = [
+    "StackInterpreter",
+]
+
+from typing import Generator
+
+from cambridgeScript.interpreter.analysis import iter_nodes
+from cambridgeScript.interpreter.console import InputReader, OutputWriter
+from cambridgeScript.interpreter.interpreter import (
+    Interpreter,
+    InterpreterError,
+    _Return,
+    _operation_error,
+)
+from cambridgeScript.interpreter.resolver import resolve_builtins
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.constants import Operator
+from cambridgeScript.parser.lexer import Value
+from cambridgeScript.syntax_tree import (
+    Assignable,
+    Expression,
+    ArrayIndex,
+    FunctionCall,
+    BuiltinCall,
+    UnaryOp,
+    BinaryOp,
+    Statement,
+    AssignmentStmt,
+    ProcedureCallStmt,
+    ReturnStmt,
+    OutputStmt,
+    InputStmt,
+    VariableDecl,
+    FileReadStmt,
+    FileWriteStmt,
+    WhileStmt,
+    RepeatUntilStmt,
+    ForStmt,
+    IfStmt,
+    FunctionDecl,
+    ProcedureDecl,
+    Program,
+)
+
+
+class _Call:
+    # Yielded by routines to call a function or procedure
+    __slots__ = ("routine", "args", "is_tail")
+
+    def __init__(
+        self,
+        routine: FunctionDecl | ProcedureDecl,
+        args: list[Value],
+        is_tail: bool = False,
+    ):
+        self.routine = routine
+        self.args = args
+        self.is_tail = is_tail
+
+
+class _Frame:
+    __slots__ = ("routine", "state", "execution", "cache_keys")
+
+    routine: FunctionDecl | ProcedureDecl | None
+    state: VariableState
+    execution: Generator
+    # Keys to memoize the result under, one for each (tail) call
+    cache_keys: list | None
+
+
+# Generators executing statements return a _Return when RETURN was executed
+_Execution = Generator[_Call, Value, _Return | None]
+
+
+class StackInterpreter(Interpreter):
+    """
+    Interpreter that supports deep recursion by keeping calls on an explicit
+    stack of pooled frames, with tail calls reusing the current frame.
+    """
+
+    # Maximum number of frames, None for no limit
+    max_depth: int | None
+
+    def __init__(
+        self,
+        vairable_state: VariableState,
+        memo_size: int = 0,
+        max_depth: int | None = None,
+        output: OutputWriter | None = None,
+        input: InputReader | None = None,
+        workers: int = 0,
+        max_steps: int | None = None,
+        time_limit: float | None = None,
+        max_memory: int | None = None,
+        track_memory: bool = False,
+    ):
+        super().__init__(
+            vairable_state,
+            memo_size,
+            output,
+            input,
+            workers,
+            max_steps,
+            time_limit,
+            max_memory,
+            track_memory,
+        )
+        self.max_depth = max_depth
+        self._frame_pool: list[_Frame] = []
+        self._has_calls: dict[int, bool] = {}
+
+    # Frames
+
+    def _new_frame(
+        self,
+        routine: FunctionDecl | ProcedureDecl | None,
+        state: VariableState,
+        execution: Generator,
+    ) -> _Frame:
+        frame = self._frame_pool.pop() if self._frame_pool else _Frame()
+        frame.routine = routine
+        frame.state = state
+        frame.execution = execution
+        frame.cache_keys = None
+        return frame
+
+    def _release(self, frame: _Frame) -> None:
+        frame.routine = frame.state = frame.execution = frame.cache_keys = None
+        self._frame_pool.append(frame)
+
+    def _run(self, execution: _Execution) -> Value | None:
+        # Runs a generator to the end
+        driver = self._drive(execution)
+        try:
+            request = next(driver)
+        except StopIteration as stop:
+            return stop.value
+        driver.close()
+        raise InterpreterError(f"Execution can't be suspended here ({request})")
+
+    def _drive(self, execution: _Execution) -> Generator[object, None, Value | None]:
+        """
+        Drive a generator, executing the calls it makes on the frame stack.
+        Anything else the generator yields is passed on to the caller.
+        """
+        caller_state = self.variable_state
+        stack = [self._new_frame(None, caller_state, execution)]
+        value = None
+        try:
+            while True:
+                frame = stack[-1]
+                try:
+                    request = frame.execution.send(value)
+                except StopIteration as stop:
+                    stack.pop()
+                    if not stack:
+                        return stop.value
+                    value = self._result(frame.routine, stop.value)
+                    self._finish(frame, value)
+                    self.variable_state = stack[-1].state
+                    continue
+                if not isinstance(request, _Call):
+                    yield request
+                    value = None
+                    continue
+                if request.is_tail and not isinstance(frame.routine, FunctionDecl):
+                    raise self._misplaced_return(frame.routine)
+                key = self._cache_key(request.routine, request.args)
+                if key is not None:
+                    is_cached, value = self.call_cache.get(key)
+                    if is_cached:
+                        if request.is_tail:
+                            # The current call returns the cached result
+                            stack.pop()
+                            frame.execution.close()
+                            self._finish(frame, value)
+                            self.variable_state = stack[-1].state
+                        continue
+                if request.is_tail:
+                    # The current call ends before the next one starts
+                    frame.execution.close()
+                    self._release_scope(frame.state)
+                state = self._new_scope(request.routine, request.args)
+                body = self._statements(request.routine.body)
+                if request.is_tail:
+                    frame.routine = request.routine
+                    frame.state = state
+                    frame.execution = body
+                else:
+                    if self.max_depth is not None and len(stack) >= self.max_depth:
+                        raise InterpreterError(
+                            f"Maximum call depth of {self.max_depth} exceeded"
+                        )
+                    frame = self._new_frame(request.routine, state, body)
+                    stack.append(frame)
+                if key is not None:
+                    if frame.cache_keys is None:
+                        frame.cache_keys = []
+                    frame.cache_keys.append(key)
+                self.variable_state = state
+                value = None
+        finally:
+            for frame in stack:
+                frame.execution.close()
+                self._release(frame)
+            self.variable_state = caller_state
+
+    def _finish(self, frame: _Frame, value: Value | None) -> None:
+        # Memoizes the result of a finished call and releases its frame
+        if frame.cache_keys is not None:
+            for key in frame.cache_keys:
+                self.call_cache.put(key, value)
+        self._release_scope(frame.state)
+        self._release(frame)
+
+    @staticmethod
+    def _misplaced_return(routine: ProcedureDecl | None) -> InterpreterError:
+        if routine is None:
+            return InterpreterError("RETURN can only be used in a function")
+        return InterpreterError(
+            f"Procedure {routine.name.value} can't return a value"
+        )
+
+    def _result(
+        self, routine: FunctionDecl | ProcedureDecl, result: _Return | None
+    ) -> Value | None:
+        # Checks the result of a finished call
+        if isinstance(routine, FunctionDecl):
+            if result is None:
+                raise InterpreterError(
+                    f"Function {routine.name.value} ended without returning a value"
+                )
+            return result.value
+        if result is not None:
+            raise self._misplaced_return(routine)
+        return None
+
+    def _contains_calls(self, node: Statement | Expression) -> bool:
+        key = id(node)
+        if (result := self._has_calls.get(key)) is None:
+            result = any(
+                isinstance(child, (FunctionCall, ProcedureCallStmt))
+                for child in iter_nodes(node)
+            )
+            self._has_calls[key] = result
+        return result
+
+    # Entry points
+
+    def visit_program(self, stmt: Program) -> None:
+        resolve_builtins(stmt)
+        self._start_limits()
+        try:
+            if self._run(self._statements(stmt.statements)) is not None:
+                raise self._misplaced_return(None)
+        finally:
+            self._finish_program()
+
+    def visit_function_call(self, expr: FunctionCall) -> Value:
+        # Only used by statements executed by the recursive visitor
+        return self._run(self._evaluate(expr))
+
+    def visit_proc_call(self, stmt: ProcedureCallStmt) -> None:
+        self._run(self._statements([stmt]))
+
+    # Statements
+
+    def _statements(self, statements: list[Statement]) -> _Execution:
+        for stmt in statements:
+            if not self._contains_calls(stmt):
+                try:
+                    self.visit(stmt)
+                except _Return as result:
+                    return result
+                continue
+            if isinstance(stmt, AssignmentStmt):
+                value = yield from self._evaluate(stmt.value)
+                indices = yield from self._indices(stmt.target)
+                self._assign_result(stmt, value, indices)
+                continue
+            elif isinstance(stmt, OutputStmt):
+                values = []
+                for expr in stmt.values:
+                    values.append((yield from self._evaluate(expr)))
+                self._output(values)
+                continue
+            elif isinstance(stmt, ProcedureCallStmt):
+                args = []
+                for arg in stmt.args or []:
+                    args.append((yield from self._evaluate(arg)))
+                self._steps_left -= 1
+                if self._steps_left <= 0:
+                    self._check_limits(stmt)
+                yield _Call(self._procedure(stmt), args)
+                continue
+            elif isinstance(stmt, VariableDecl):
+                bounds = []
+                for lower, upper in stmt.type.ranges:
+                    lower = yield from self._evaluate(lower)
+                    bounds.append((lower, (yield from self._evaluate(upper))))
+                self._declare(stmt, bounds)
+                continue
+            elif isinstance(stmt, InputStmt):
+                value = self._read_input(stmt)
+                indices = yield from self._indices(stmt.variable)
+                self._assign(stmt.variable, value, indices)
+                continue
+            elif isinstance(stmt, FileReadStmt):
+                value = self._read_file(stmt)
+                indices = yield from self._indices(stmt.target)
+                self._assign(stmt.target, value, indices)
+                continue
+            elif isinstance(stmt, FileWriteStmt):
+                self._write_file(stmt, (yield from self._evaluate(stmt.value)))
+                continue
+            elif isinstance(stmt, ReturnStmt):
+                return (yield from self._return(stmt))
+            elif isinstance(stmt, IfStmt):
+                result = yield from self._if(stmt)
+            elif isinstance(stmt, ForStmt):
+                result = yield from self._for_loop(stmt)
+            elif isinstance(stmt, WhileStmt):
+                result = yield from self._while(stmt)
+            elif isinstance(stmt, RepeatUntilStmt):
+                result = yield from self._repeat_until(stmt)
+            else:
+                # Declarations of routines, and CASE which isn't executed
+                try:
+                    self.visit(stmt)
+                except _Return as result:
+                    return result
+                continue
+            if result is not None:
+                return result
+        return None
+
+    def _return(self, stmt: ReturnStmt) -> _Execution:
+        expr = stmt.value
+        if isinstance(expr, FunctionCall):
+            # Tail call, the current frame is reused
+            function = self._function(expr)
+            args = []
+            for param in expr.params:
+                args.append((yield from self._evaluate(param)))
+            self._steps_left -= 1
+            if self._steps_left <= 0:
+                self._check_limits(expr)
+            yield _Call(function, args, is_tail=True)
+        return _Return((yield from self._evaluate(expr)))
+
+    def _if(self, stmt: IfStmt) -> _Execution:
+        if (yield from self._evaluate(stmt.condition)):
+            return (yield from self._statements(stmt.then_branch))
+        elif stmt.else_branch is not None:
+            return (yield from self._statements(stmt.else_branch))
+        return None
+
+    def _for_loop(self, stmt: ForStmt) -> _Execution:
+        if isinstance(stmt.variable, ArrayIndex):
+            raise InterpreterError("FOR loop variable must be a name")
+        name = stmt.variable.token.value
+        current_value = yield from self._evaluate(stmt.start)
+        end_value = yield from self._evaluate(stmt.end)
+        if stmt.step is not None:
+            step_value = yield from self._evaluate(stmt.step)
+        else:
+            step_value = 1
+        if step_value == 0:
+            raise InterpreterError("FOR loop STEP can't be 0")
+        in_range = Operator.LESS_EQUAL if step_value > 0 else Operator.GREAT_EQUAL
+        variables = self.scope_of(name)
+        while in_range(current_value, end_value):
+            self._steps_left -= 1
+            if self._steps_left <= 0:
+                self._check_limits(stmt)
+            variables[name] = current_value
+            if (result := (yield from self._statements(stmt.body))) is not None:
+                return result
+            current_value += step_value
+        return None
+
+    def _while(self, stmt: WhileStmt) -> _Execution:
+        while (yield from self._evaluate(stmt.condition)):
+            self._steps_left -= 1
+            if self._steps_left <= 0:
+                self._check_limits(stmt)
+            if (result := (yield from self._statements(stmt.body))) is not None:
+                return result
+        return None
+
+    def _repeat_until(self, stmt: RepeatUntilStmt) -> _Execution:
+        while True:
+            if (result := (yield from self._statements(stmt.body))) is not None:
+                return result
+            if (yield from self._evaluate(stmt.condition)):
+                return None
+            self._steps_left -= 1
+            if self._steps_left <= 0:
+                self._check_limits(stmt.condition)
+
+    # Expressions
+
+    def _indices(self, target: Assignable) -> Generator[_Call, Value, list | None]:
+        # Evaluates the indices of an array element if they contain calls,
+        # otherwise they're left to _assign()
+        if not isinstance(target, ArrayIndex) or not self._contains_calls(target):
+            return None
+        indices = []
+        for index in target.index:
+            indices.append((yield from self._evaluate(index)))
+        return indices
+
+    def _evaluate(self, expr: Expression) -> Generator[_Call, Value, Value]:
+        if not self._contains_calls(expr):
+            return self.visit(expr)
+        if isinstance(expr, FunctionCall):
+            function = self._function(expr)
+            args = []
+            for param in expr.params:
+                args.append((yield from self._evaluate(param)))
+            self._steps_left -= 1
+            if self._steps_left <= 0:
+                self._check_limits(expr)
+            return (yield _Call(function, args))
+        if isinstance(expr, BuiltinCall):
+            args = []
+            for param in expr.params:
+                args.append((yield from self._evaluate(param)))
+            return self._call_builtin(expr, args)
+        if isinstance(expr, BinaryOp):
+            left = yield from self._evaluate(expr.left)
+            right = yield from self._evaluate(expr.right)
+            try:
+                return expr.operator(left, right)
+            except (ArithmeticError, TypeError, ValueError) as e:
+                raise _operation_error(e) from e
+        if isinstance(expr, UnaryOp):
+            operand = yield from self._evaluate(expr.operand)
+            try:
+                return expr.operator(operand)
+            except (ArithmeticError, TypeError, ValueError) as e:
+                raise _operation_error(e) from e
+        if isinstance(expr, ArrayIndex):
+            array = self._array(expr)
+            indices = []
+            for index in expr.index:
+                indices.append((yield from self._evaluate(index)))
+            try:
+                return array.get(indices)
+            except IndexError as e:
+                raise InterpreterError(str(e)) from e
+        return self.visit(expr)
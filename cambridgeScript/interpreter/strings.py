@@ -0,0 +1,165 @@
+__all__ = [
+    "Rope",
+    "length",
+    "substring",
+    "ucase",
+    "lcase",
+]
+
+from typing import Callable
+
+
+class Rope:
+    """
+    An immutable string built up by concatenation.
+
+    A rope is a view of the first `count` pieces of a list of strings. The
+    list is shared with the rope it was appended to, so when the newest rope
+    is appended to again the piece is just added to the end of the list. This
+    makes repeated s <- s + x amortized O(1). The pieces are only joined when
+    the whole string is needed.
+    """
+
+    __slots__ = ("_pieces", "_count", "_length")
+
+    _pieces: list[str]
+    _count: int
+    _length: int
+
+    def __init__(self, value: str = ""):
+        self._pieces = [value]
+        self._count = 1
+        self._length = len(value)
+
+    @classmethod
+    def _from_pieces(cls, pieces: list[str], count: int, length: int) -> "Rope":
+        rope = cls.__new__(cls)
+        rope._pieces = pieces
+        rope._count = count
+        rope._length = length
+        return rope
+
+    def __add__(self, other):
+        if isinstance(other, Rope):
+            other = str(other)
+        elif type(other) is not str:
+            return NotImplemented
+        if len(self._pieces) == self._count:
+            pieces = self._pieces
+        else:
+            # Something was already appended to this rope
+            pieces = self._pieces[: self._count]
+        pieces.append(other)
+        return Rope._from_pieces(pieces, self._count + 1, self._length + len(other))
+
+    def __radd__(self, other):
+        if type(other) is not str:
+            return NotImplemented
+        return Rope(other + str(self))
+
+    def __str__(self) -> str:
+        if self._count == 1:
+            return self._pieces[0]
+        flat = "".join(self._pieces[: self._count])
+        # Later ropes might still use the old list, so make a new one
+        self._pieces = [flat]
+        self._count = 1
+        return flat
+
+    def __repr__(self):
+        return repr(str(self))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def _compare(self, other, operator: Callable[[str, str], bool]):
+        if isinstance(other, Rope):
+            other = str(other)
+        elif type(other) is not str:
+            return NotImplemented
+        return operator(str(self), other)
+
+    def __eq__(self, other):
+        return self._compare(other, str.__eq__)
+
+    def __ne__(self, other):
+        return self._compare(other, str.__ne__)
+
+    def __lt__(self, other):
+        return self._compare(other, str.__lt__)
+
+    def __le__(self, other):
+        return self._compare(other, str.__le__)
+
+    def __gt__(self, other):
+        return self._compare(other, str.__gt__)
+
+    def __ge__(self, other):
+        return self._compare(other, str.__ge__)
+
+    def substring(self, start: int, size: int) -> str:
+        """Get size characters from index start (0-based) without joining"""
+        result = []
+        position = 0
+        end = start + size
+        for piece in self._pieces[: self._count]:
+            piece_end = position + len(piece)
+            if piece_end > start:
+                result.append(piece[max(start - position, 0) : end - position])
+            if piece_end >= end:
+                break
+            position = piece_end
+        return "".join(result)
+
+    def map(self, function: Callable[[str], str]) -> "Rope | str":
+        """
+        Apply a case mapping such as str.upper to each piece.
+        Outside ASCII mappings can depend on the neighbouring characters, like
+        the final sigma, so then the whole string is mapped at once.
+        """
+        pieces = self._pieces[: self._count]
+        if not all(piece.isascii() for piece in pieces):
+            return function(str(self))
+        pieces = [function(piece) for piece in pieces]
+        return Rope._from_pieces(pieces, len(pieces), sum(map(len, pieces)))
+
+
+# Library functions
+
+
+def _check_string(value) -> None:
+    if not isinstance(value, (str, Rope)):
+        raise TypeError(f"Expected a string, got {value!r} instead")
+
+
+def length(string: str | Rope) -> int:
+    _check_string(string)
+    return len(string)
+
+
+def substring(string: str | Rope, start: int, size: int) -> str:
+    _check_string(string)
+    if type(start) is not int or type(size) is not int:
+        raise TypeError("SUBSTRING start and length must be integers")
+    if start < 1 or size < 0:
+        raise ValueError(f"Invalid substring start {start} and length {size}")
+    if isinstance(string, Rope):
+        return string.substring(start - 1, size)
+    return string[start - 1 : start - 1 + size]
+
+
+def ucase(string: str | Rope) -> str | Rope:
+    _check_string(string)
+    if isinstance(string, Rope):
+        return string.map(str.upper)
+    return string.upper()
+
+
+def lcase(string: str | Rope) -> str | Rope:
+    _check_string(string)
+    if isinstance(string, Rope):
+        return string.map(str.lower)
+    return string.lower()
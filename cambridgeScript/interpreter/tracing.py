@@ -0,0 +1,192 @@
+"""
+Hooks for following a program as it runs, e.g. for debuggers, visualizers or
+step-by-step teaching tools, like sys.settrace().
+
+A hook is called with an event, the current source line and variables, and an
+argument depending on the event:
+    LINE        a statement is about to be executed, argument None
+    CALL        a function or procedure was called, argument the routine
+    RETURN      a function or procedure finished, argument the routine
+    EXCEPTION   an error was raised by a statement, argument the error
+
+set_trace() installs a hook by replacing the interpreter's dispatch methods
+with traced versions as instance attributes. Interpreters without a hook run
+exactly the same code as before, so tracing costs nothing until it's used.
+Loops are never run all at once (vectorized or in parallel) while traced, as
+their bodies wouldn't be executed statement by statement.
+"""
+
+__all__ = [
+    "TraceEvent",
+    "TraceHook",
+    "set_trace",
+]
+
+from enum import Enum
+from typing import Callable
+
+from cambridgeScript.interpreter.analysis import node_line
+from cambridgeScript.interpreter.interpreter import Interpreter, InterpreterError
+from cambridgeScript.interpreter.stack import StackInterpreter
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.parser.lexer import Value
+from cambridgeScript.syntax_tree import (
+    Expression,
+    Statement,
+    AssignmentStmt,
+    ProcedureCallStmt,
+    ReturnStmt,
+    OutputStmt,
+    InputStmt,
+    VariableDecl,
+    FileReadStmt,
+    FileWriteStmt,
+    WhileStmt,
+    RepeatUntilStmt,
+    ForStmt,
+    IfStmt,
+    FunctionDecl,
+    ProcedureDecl,
+    Program,
+)
+
+
+class TraceEvent(Enum):
+    LINE = "line"
+    CALL = "call"
+    RETURN = "return"
+    EXCEPTION = "exception"
+
+
+# Called with the event, the line (from 1), the current variables and the
+# event's argument
+TraceHook = Callable[[TraceEvent, int | None, VariableState, object], None]
+
+# Methods replaced by set_trace()
+_TRACED_METHODS = ("visit", "_statements", "_new_scope", "_release_scope")
+# Statements which don't get LINE events, as they aren't executed as such
+_UNTRACED = (Program, FunctionDecl, ProcedureDecl)
+# Statements which StackInterpreter executes without visit() if they contain
+# calls
+_GENERATOR_STATEMENTS = (
+    AssignmentStmt,
+    OutputStmt,
+    ProcedureCallStmt,
+    ReturnStmt,
+    VariableDecl,
+    InputStmt,
+    FileReadStmt,
+    FileWriteStmt,
+    IfStmt,
+    ForStmt,
+    WhileStmt,
+    RepeatUntilStmt,
+)
+
+
+class _Tracer:
+    # The traced versions of an interpreter's methods, calling its hook
+
+    def __init__(self, interpreter: Interpreter, hook: TraceHook):
+        self.interpreter = interpreter
+        self.hook = hook
+        self._lines: dict[int, int | None] = {}
+        # Routines being executed, and the line of the current statement
+        self._routines: list[FunctionDecl | ProcedureDecl] = []
+        self._line: int | None = None
+        # The last error reported, so it's only reported where it's raised
+        self._error: InterpreterError | None = None
+        # The methods being replaced, bound to the interpreter
+        cls = type(interpreter)
+        self._visit = cls.visit.__get__(interpreter)
+        self._new_scope = cls._new_scope.__get__(interpreter)
+        self._release_scope = cls._release_scope.__get__(interpreter)
+        if isinstance(interpreter, StackInterpreter):
+            self._statements = cls._statements.__get__(interpreter)
+        # Runners of whole loops, disabled while tracing
+        self._vectorizer = interpreter._vectorizer
+        self._parallel = interpreter._parallel
+
+    def install(self) -> None:
+        interpreter = self.interpreter
+        interpreter._vectorizer = None
+        interpreter._parallel = None
+        interpreter.visit = self.visit
+        interpreter._new_scope = self.new_scope
+        interpreter._release_scope = self.release_scope
+        if isinstance(interpreter, StackInterpreter):
+            interpreter._statements = self.statements
+
+    def uninstall(self) -> None:
+        interpreter = self.interpreter
+        # Using __dict__ would make CPython keep the interpreter's attributes
+        # in a dict for good, slowing down every access to them
+        for name in _TRACED_METHODS:
+            if name != "_statements" or isinstance(interpreter, StackInterpreter):
+                delattr(interpreter, name)
+        interpreter._vectorizer = self._vectorizer
+        interpreter._parallel = self._parallel
+
+    def _emit_line(self, stmt: Statement) -> None:
+        key = id(stmt)
+        if key not in self._lines:
+            self._lines[key] = node_line(stmt)
+        self._line = self._lines[key]
+        self.hook(TraceEvent.LINE, self._line, self.interpreter.variable_state, None)
+
+    def _emit_error(self, error: InterpreterError) -> None:
+        if error is not self._error:
+            self._error = error
+            state = self.interpreter.variable_state
+            self.hook(TraceEvent.EXCEPTION, self._line, state, error)
+
+    def visit(self, thing: Expression | Statement):
+        if isinstance(thing, Statement) and not isinstance(thing, _UNTRACED):
+            self._emit_line(thing)
+        try:
+            return self._visit(thing)
+        except InterpreterError as e:
+            self._emit_error(e)
+            raise
+
+    def statements(self, statements: list[Statement]):
+        # Other statements get their LINE event from visit()
+        for stmt in statements:
+            if isinstance(
+                stmt, _GENERATOR_STATEMENTS
+            ) and self.interpreter._contains_calls(stmt):
+                self._emit_line(stmt)
+            try:
+                result = yield from self._statements([stmt])
+            except InterpreterError as e:
+                self._emit_error(e)
+                raise
+            if result is not None:
+                return result
+        return None
+
+    def new_scope(
+        self, routine: FunctionDecl | ProcedureDecl, args: list[Value]
+    ) -> VariableState:
+        state = self._new_scope(routine, args)
+        self._routines.append(routine)
+        self.hook(TraceEvent.CALL, node_line(routine), state, routine)
+        return state
+
+    def release_scope(self, state: VariableState) -> None:
+        self._release_scope(state)
+        routine = self._routines.pop() if self._routines else None
+        self.hook(TraceEvent.RETURN, self._line, state, routine)
+
+
+def set_trace(interpreter: Interpreter, hook: TraceHook | None) -> None:
+    """
+    Set the hook called as an interpreter runs, see the module.
+    :param interpreter: the interpreter to trace
+    :param hook: the hook, or None to stop tracing
+    """
+    tracer = interpreter.visit.__self__
+    if isinstance(tracer, _Tracer):
+        tracer.uninstall()
+    if hook is not None:
+        _Tracer(interpreter, hook).install()
@@ -1,12 +1,19 @@
 from dataclasses import dataclass, field
 
+from cambridgeScript.interpreter.arrays import Array
 from cambridgeScript.parser.lexer import Value
 from cambridgeScript.syntax_tree import FunctionDecl, ProcedureDecl
+from cambridgeScript.syntax_tree.types import PrimitiveType
 
 
 @dataclass
 class VariableState:
-    variables: dict[str, Value | None] = field(default_factory=dict)
+    variables: dict[str, Value | Array | None] = field(default_factory=dict)
     constants: dict[str, Value] = field(default_factory=dict)
     functions: dict[str, FunctionDecl] = field(default_factory=dict)
     procedures: dict[str, ProcedureDecl] = field(default_factory=dict)
+    # Declared types of the variables which aren't arrays
+    types: dict[str, PrimitiveType] = field(default_factory=dict)
+    # Parameters holding an array passed by reference, whose memory belongs
+    # to the caller
+    shared: frozenset[str] = frozenset()
@@ -0,0 +1,367 @@
+"""
+Runs simple FOR loops over numeric arrays as single NumPy operations.
+
+Recognized loops have a one-statement body indexing a 1-dimensional array
+with the loop variable:
+
+- sums:               total <- total + A[i]
+- maxima and minima:  IF A[i] > m THEN m <- A[i] ENDIF
+- element-wise:       A[i] <- A[i] * 2
+- linear searches:    IF A[i] = target THEN found <- i ENDIF
+
+Whenever the result might differ from the interpreter's (overflow, division
+by zero, out of range indices, mixed types...) the loop isn't vectorized,
+and is executed normally instead.
+"""
+
+__all__ = [
+    "np",
+    "LoopVectorizer",
+]
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from cambridgeScript.constants import Operator
+from cambridgeScript.interpreter.arrays import Array
+from cambridgeScript.parser.lexer import Value
+from cambridgeScript.syntax_tree import (
+    Expression,
+    Identifier,
+    Literal,
+    ArrayIndex,
+    BinaryOp,
+    AssignmentStmt,
+    IfStmt,
+    ForStmt,
+)
+
+if TYPE_CHECKING:
+    from cambridgeScript.interpreter.interpreter import Interpreter
+
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+# Integers that convert to floats the same way in Python and NumPy
+_EXACT_FLOAT_INT = 2**53
+
+
+@dataclass
+class _Sum:
+    total: str
+    array: str
+
+
+@dataclass
+class _Extremum:
+    result: str
+    array: str
+    # Operator.GREATER_THAN for maxima, Operator.LESS_THAN for minima
+    operator: Callable[[Value, Value], bool]
+
+
+@dataclass
+class _ElementWise:
+    array: str
+    operator: Callable[[Value, Value], Value]
+    operand: Expression
+    # Whether the element is the left operand
+    element_left: bool
+
+
+@dataclass
+class _Search:
+    result: str
+    array: str
+    target: Expression
+    # None to store the index, otherwise the literal expression to store
+    value: Literal | None
+
+
+_Pattern = _Sum | _Extremum | _ElementWise | _Search
+
+
+def _indexed_array(expr: Expression, variable: str) -> str | None:
+    # Returns the array name if expr is <array>[<variable>]
+    if not (
+        isinstance(expr, ArrayIndex)
+        and isinstance(expr.array, Identifier)
+        and len(expr.index) == 1
+        and isinstance(expr.index[0], Identifier)
+        and expr.index[0].token.value == variable
+    ):
+        return None
+    return expr.array.token.value
+
+
+def _name(expr: Expression) -> str | None:
+    return expr.token.value if isinstance(expr, Identifier) else None
+
+
+def _is_invariant(expr: Expression, *names: str) -> bool:
+    # Whether expr is a literal, or an identifier that the loop doesn't change
+    if isinstance(expr, Literal):
+        return True
+    return isinstance(expr, Identifier) and expr.token.value not in names
+
+
+def _match_assignment(stmt: AssignmentStmt, variable: str) -> _Pattern | None:
+    value = stmt.value
+    if not isinstance(value, BinaryOp):
+        return None
+    target = _name(stmt.target)
+    if target is not None and value.operator is Operator.ADD:
+        # total <- total + A[i] or total <- A[i] + total
+        for total, element in (
+            (value.left, value.right),
+            (value.right, value.left),
+        ):
+            array = _indexed_array(element, variable)
+            if (
+                array is not None
+                and _name(total) == target
+                and target not in (variable, array)
+            ):
+                return _Sum(target, array)
+        return None
+    array = _indexed_array(stmt.target, variable)
+    if array is None or value.operator not in (
+        Operator.ADD,
+        Operator.SUB,
+        Operator.MUL,
+        Operator.DIV,
+    ):
+        return None
+    # A[i] <- A[i] op x or A[i] <- x op A[i]
+    if _indexed_array(value.left, variable) == array and _is_invariant(
+        value.right, variable, array
+    ):
+        return _ElementWise(array, value.operator, value.right, True)
+    if _indexed_array(value.right, variable) == array and _is_invariant(
+        value.left, variable, array
+    ):
+        return _ElementWise(array, value.operator, value.left, False)
+    return None
+
+
+def _match_if(stmt: IfStmt, variable: str) -> _Pattern | None:
+    condition = stmt.condition
+    if not (
+        stmt.else_branch is None
+        and len(stmt.then_branch) == 1
+        and isinstance(stmt.then_branch[0], AssignmentStmt)
+        and isinstance(condition, BinaryOp)
+    ):
+        return None
+    assignment = stmt.then_branch[0]
+    result = _name(assignment.target)
+    if result is None or result == variable:
+        return None
+    # Put the array element on the left of the comparison
+    left, right, operator = condition.left, condition.right, condition.operator
+    if _indexed_array(left, variable) is None:
+        left, right = right, left
+        operator = {
+            Operator.GREATER_THAN: Operator.LESS_THAN,
+            Operator.LESS_THAN: Operator.GREATER_THAN,
+        }.get(operator, operator)
+    array = _indexed_array(left, variable)
+    if array is None or result == array:
+        return None
+    if operator in (Operator.GREATER_THAN, Operator.LESS_THAN):
+        # IF A[i] > m THEN m <- A[i] ENDIF
+        if (
+            _name(right) == result
+            and _indexed_array(assignment.value, variable) == array
+        ):
+            return _Extremum(result, array, operator)
+        return None
+    if operator is Operator.EQUAL and _is_invariant(right, variable, result, array):
+        # IF A[i] = target THEN found <- i ENDIF
+        if _name(assignment.value) == variable:
+            return _Search(result, array, right, None)
+        if isinstance(assignment.value, Literal):
+            return _Search(result, array, right, assignment.value)
+    return None
+
+
+def _match(stmt: ForStmt) -> _Pattern | None:
+    if not isinstance(stmt.variable, Identifier) or len(stmt.body) != 1:
+        return None
+    variable = stmt.variable.token.value
+    body = stmt.body[0]
+    if isinstance(body, AssignmentStmt):
+        return _match_assignment(body, variable)
+    if isinstance(body, IfStmt):
+        return _match_if(body, variable)
+    return None
+
+
+def _is_number(value) -> bool:
+    return type(value) is int or type(value) is float
+
+
+class LoopVectorizer:
+    """Matches FOR loops against known patterns and runs them with NumPy"""
+
+    _patterns: dict[int, _Pattern | None]
+
+    def __init__(self):
+        self._patterns = {}
+
+    def run(
+        self,
+        interpreter: "Interpreter",
+        stmt: ForStmt,
+        start: int,
+        end: int,
+        step: int,
+    ) -> bool:
+        """
+        Attempt to run a loop with integer bounds as a vectorized operation.
+        :return: whether the loop was run, if not it must be run normally
+        """
+        key = id(stmt)
+        if key not in self._patterns:
+            self._patterns[key] = _match(stmt)
+        pattern = self._patterns[key]
+        if pattern is None:
+            return False
+        stop = end + 1 if step > 0 else end - 1
+        indices = range(start, stop, step)
+        if not indices:
+            return False
+        array = interpreter.scope_of(pattern.array).get(pattern.array)
+        if not isinstance(array, Array) or len(array.bounds) != 1:
+            return False
+        buffer = array.dense_buffer
+        lower, upper = array.bounds[0]
+        if (
+            buffer is None
+            or buffer.typecode not in "qd"
+            or not (lower <= indices[0] <= upper and lower <= indices[-1] <= upper)
+        ):
+            return False
+        # View of the elements in the order the loop visits them
+        first, last = indices[0] - lower, indices[-1] - lower
+        elements = np.frombuffer(buffer, dtype=buffer.typecode)
+        if step > 0:
+            elements = elements[first : last + 1 : step]
+        else:
+            elements = elements[last : first + 1 : -step][::-1]
+        if isinstance(pattern, _Sum):
+            done = self._sum(interpreter, pattern, elements)
+        elif isinstance(pattern, _Extremum):
+            done = self._extremum(interpreter, pattern, elements)
+        elif isinstance(pattern, _ElementWise):
+            done = self._element_wise(interpreter, pattern, elements)
+        else:
+            done = self._search(interpreter, pattern, elements, indices)
+        if done:
+            variable = stmt.variable.token.value
+            interpreter.scope_of(variable)[variable] = indices[-1]
+        return done
+
+    @staticmethod
+    def _sum(interpreter: "Interpreter", pattern: _Sum, elements) -> bool:
+        total = interpreter.scope_of(pattern.total).get(pattern.total)
+        if not _is_number(total):
+            return False
+        if type(total) is int and elements.dtype.kind == "i":
+            largest = max(abs(int(elements.min())), abs(int(elements.max())))
+            if abs(total) + largest * len(elements) > _INT64_MAX:
+                return False
+            result = total + int(elements.sum())
+        else:
+            if type(total) is int and abs(total) >= _EXACT_FLOAT_INT:
+                return False
+            # Accumulate one element at a time to round exactly like the interpreter
+            values = np.concatenate(([float(total)], elements.astype(np.float64)))
+            # Overflows give inf or NaN silently, as in the interpreter
+            with np.errstate(all="ignore"):
+                result = float(np.add.accumulate(values)[-1])
+        interpreter.scope_of(pattern.total)[pattern.total] = result
+        return True
+
+    @staticmethod
+    def _extremum(interpreter: "Interpreter", pattern: _Extremum, elements) -> bool:
+        variables = interpreter.scope_of(pattern.result)
+        current = variables.get(pattern.result)
+        if not _is_number(current):
+            return False
+        if elements.dtype.kind == "f" and np.isnan(elements).any():
+            return False
+        # The first extreme element is the one the interpreter would keep
+        if pattern.operator is Operator.GREATER_THAN:
+            candidate = elements[elements.argmax()].item()
+        else:
+            candidate = elements[elements.argmin()].item()
+        if pattern.operator(candidate, current):
+            variables[pattern.result] = candidate
+        return True
+
+    @staticmethod
+    def _element_wise(
+        interpreter: "Interpreter", pattern: _ElementWise, elements
+    ) -> bool:
+        operand = interpreter.visit(pattern.operand)
+        if not _is_number(operand):
+            return False
+        operator = pattern.operator
+        if elements.dtype.kind == "i":
+            # Results must stay integers that fit in the array
+            if type(operand) is not int or operator is Operator.DIV:
+                return False
+            for extreme in (int(elements.min()), int(elements.max())):
+                result = (
+                    operator(extreme, operand)
+                    if pattern.element_left
+                    else operator(operand, extreme)
+                )
+                if not _INT64_MIN <= result <= _INT64_MAX:
+                    return False
+        else:
+            if type(operand) is int and abs(operand) >= _EXACT_FLOAT_INT:
+                return False
+            if operator is Operator.DIV and (
+                operand == 0 if pattern.element_left else (elements == 0).any()
+            ):
+                return False
+        with np.errstate(all="ignore"):
+            if pattern.element_left:
+                elements[...] = operator(elements, operand)
+            else:
+                elements[...] = operator(operand, elements)
+        return True
+
+    @staticmethod
+    def _search(
+        interpreter: "Interpreter", pattern: _Search, elements, indices: range
+    ) -> bool:
+        variables = interpreter.scope_of(pattern.result)
+        if pattern.result not in variables:
+            return False
+        target = interpreter.visit(pattern.target)
+        if not (_is_number(target) or type(target) is bool) or not (
+            _INT64_MIN <= target <= _INT64_MAX
+        ):
+            return False
+        # NumPy compares integers with floats as floats
+        if elements.dtype.kind == "f":
+            if type(target) is int and abs(target) >= _EXACT_FLOAT_INT:
+                return False
+        elif type(target) is float:
+            largest = max(abs(int(elements.min())), abs(int(elements.max())))
+            if largest >= _EXACT_FLOAT_INT:
+                return False
+        matches = np.flatnonzero(elements == target)
+        if len(matches):
+            if pattern.value is None:
+                variables[pattern.result] = indices[int(matches[-1])]
+            else:
+                variables[pattern.result] = interpreter.visit(pattern.value)
+        return True
@@ -118,6 +118,8 @@ def _parse_literal(literal: str) -> Value:
 
 def _parse_token(token_string: str, token_type: str, **token_kwargs) -> Token:
     if token_type == "KEYWORD":
+        if token_string in (Keyword.TRUE, Keyword.FALSE):
+            return LiteralToken(value=token_string == Keyword.TRUE, **token_kwargs)
         return KeywordToken(keyword=Keyword(token_string), **token_kwargs)
     elif token_type == "IDENTIFIER":
         return IdentifierToken(value=token_string, **token_kwargs)
@@ -558,7 +558,10 @@ class Parser:
             else:
                 end_type = Symbol.RBRAKET
                 ast_class = ArrayIndex
-            arg_list = self._match_multiple(self._expression)
+            if self._check(end_type):
+                arg_list = []
+            else:
+                arg_list = self._match_multiple(self._expression)
             self._consume(end_type)
             left = ast_class(left, arg_list)
         return left
@@ -0,0 +1,65 @@
+"""
+Messages exchanged by the interpreter server and its client.
+
+The client sends the source code as one frame, then the program's input as it
+becomes available, and shuts down its side of the connection at the end of
+the input. The server replies with frames of output, optionally an error
+message, and finally the exit status.
+
+A frame is a kind byte, a 4-byte big-endian length and the data. Only the
+standard library is used, so importing this from the client is cheap.
+"""
+
+__all__ = [
+    "DEFAULT_SOCKET",
+    "SOURCE",
+    "INPUT",
+    "OUTPUT",
+    "ERROR",
+    "EXIT",
+    "send_frame",
+    "read_frame",
+]
+
+import os
+import socket
+import struct
+import tempfile
+
+DEFAULT_SOCKET = os.environ.get(
+    "CAMBRIDGESCRIPT_SOCKET",
+    os.path.join(tempfile.gettempdir(), f"cambridgeScript-{os.getuid()}.sock"),
+)
+
+# Frame kinds
+SOURCE = b"S"
+INPUT = b"I"
+OUTPUT = b"O"
+ERROR = b"E"
+EXIT = b"X"
+
+_HEADER = struct.Struct(">cI")
+
+
+def send_frame(connection: socket.socket, kind: bytes, data: bytes) -> None:
+    connection.sendall(_HEADER.pack(kind, len(data)) + data)
+
+
+def _read_exactly(stream, size: int) -> bytes | None:
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return data
+
+
+def read_frame(stream) -> tuple[bytes, bytes] | None:
+    """
+    Read a frame from a buffered binary stream.
+    :return: the kind and data of the frame, or None at the end of the stream
+    """
+    if (header := _read_exactly(stream, _HEADER.size)) is None:
+        return None
+    kind, size = _HEADER.unpack(header)
+    if (data := _read_exactly(stream, size)) is None:
+        return None
+    return kind, data
@@ -0,0 +1,187 @@
+"""
+A long-running server which runs programs in forked worker processes.
+
+The server imports and warms up the interpreter once, freezes everything it
+allocated with gc.freeze() so forked workers don't copy it, then listens on a
+Unix socket and forks a worker for every program submitted. See client.py for
+the client, and protocol.py for the messages exchanged.
+
+Run with `python -m cambridgeScript.server [--socket PATH]`
+"""
+
+__all__ = [
+    "serve",
+]
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import traceback
+
+from cambridgeScript.api import Limits, compile_program, run
+from cambridgeScript.parser.parser import ParserError
+from cambridgeScript.protocol import (
+    DEFAULT_SOCKET,
+    SOURCE,
+    INPUT,
+    OUTPUT,
+    ERROR,
+    EXIT,
+    send_frame,
+    read_frame,
+)
+
+# Exit statuses reported to the client
+EXIT_OK = 0
+EXIT_RUNTIME_ERROR = 1
+EXIT_SYNTAX_ERROR = 2
+EXIT_PROTOCOL_ERROR = 64
+EXIT_INTERNAL_ERROR = 70
+
+_WARM_UP_PROGRAM = """
+DECLARE i : INTEGER
+FOR i <- 1 TO 3
+    OUTPUT LENGTH(UCASE("x")), MOD(i, 2)
+NEXT
+"""
+
+
+class _FramedInput:
+    # Binary stream of the data of the input frames sent by the client
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        frame = read_frame(self._stream)
+        if frame is None or frame[0] != INPUT:
+            # The client closed its side, or misbehaved
+            return b""
+        return frame[1]
+
+
+class _FramedOutput:
+    # Binary stream sending what is written as output frames
+
+    def __init__(self, connection: socket.socket):
+        self._connection = connection
+
+    def write(self, data: bytes) -> None:
+        send_frame(self._connection, OUTPUT, data)
+
+    def flush(self) -> None:
+        pass
+
+
+def _handle(connection: socket.socket, limits: Limits) -> int:
+    # Runs the program sent on a connection, returns the exit status
+    stream = connection.makefile("rb")
+    frame = read_frame(stream)
+    if frame is None or frame[0] != SOURCE:
+        return EXIT_PROTOCOL_ERROR
+    try:
+        program = compile_program(frame[1].decode())
+    except (ParserError, ValueError) as e:
+        send_frame(connection, ERROR, f"Syntax error: {e}".encode())
+        return EXIT_SYNTAX_ERROR
+    result = run(
+        program,
+        stdin=_FramedInput(stream),
+        stdout=_FramedOutput(connection),
+        limits=limits,
+    )
+    if result.error is not None:
+        send_frame(connection, ERROR, f"Error: {result.error}".encode())
+        return EXIT_RUNTIME_ERROR
+    return EXIT_OK
+
+
+def _work(connection: socket.socket, limits: Limits) -> None:
+    # Body of a forked worker, never returns
+    status = EXIT_INTERNAL_ERROR
+    try:
+        # Workers may have child processes of their own to wait for
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        try:
+            status = _handle(connection, limits)
+        except Exception:
+            send_frame(connection, ERROR, traceback.format_exc().encode())
+        send_frame(connection, EXIT, bytes([status]))
+        connection.close()
+    finally:
+        os._exit(status)
+
+
+def serve(path: str = DEFAULT_SOCKET, limits: Limits | None = None) -> None:
+    """
+    Serve programs on a Unix socket until interrupted.
+    :param path: path of the socket, replaced if it already exists
+    :param limits: resources each program may use
+    """
+    if limits is None:
+        limits = Limits()
+    # Import and initialize everything the workers will need
+    run(_WARM_UP_PROGRAM)
+    if os.path.exists(path):
+        os.unlink(path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # Only the current user may connect
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(128)
+    # Finished workers are reaped automatically
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    # Remove the socket when stopped
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    gc.collect()
+    # Workers won't write to these objects' headers, keeping pages shared
+    gc.freeze()
+    try:
+        while True:
+            connection, _ = listener.accept()
+            if os.fork() == 0:
+                listener.close()
+                _work(connection, limits)
+            connection.close()
+    finally:
+        listener.close()
+        os.unlink(path)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run the interpreter server")
+    arg_parser.add_argument("--socket", default=DEFAULT_SOCKET, help="socket path")
+    arg_parser.add_argument(
+        "--max-call-depth", type=int, default=Limits.max_call_depth
+    )
+    arg_parser.add_argument(
+        "--max-steps", type=int, help="loop iterations and calls per program"
+    )
+    arg_parser.add_argument(
+        "--time-limit", type=float, help="seconds each program may run for"
+    )
+    arg_parser.add_argument(
+        "--max-memory", type=int, help="bytes of strings and arrays per program"
+    )
+    args = arg_parser.parse_args()
+    limits = Limits(
+        max_call_depth=args.max_call_depth,
+        max_steps=args.max_steps,
+        time_limit=args.time_limit,
+        max_memory=args.max_memory,
+    )
+    try:
+        serve(args.socket, limits)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
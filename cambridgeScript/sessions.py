@@ -0,0 +1,112 @@
+"""
+Interactive programs running on an asyncio event loop.
+
+A Session runs one program with a ResumableInterpreter. While the program
+waits for input the session only holds the interpreter's state, so a single
+event loop can keep thousands of sessions open.
+"""
+
+__all__ = [
+    "Session",
+]
+
+import asyncio
+import io
+import random
+
+from cambridgeScript.api import Limits, compile_program
+from cambridgeScript.interpreter.console import FlushPolicy, InputReader, OutputWriter
+from cambridgeScript.interpreter.interpreter import InterpreterError
+from cambridgeScript.interpreter.resumable import ResumableInterpreter, Suspension
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.syntax_tree import Program
+
+
+class Session:
+    """
+    A program run interactively: input is sent to it and output taken from it
+    while it runs, see run().
+    """
+
+    # The error that stopped the program, if any
+    error: InterpreterError | None
+    finished: bool
+
+    def __init__(
+        self,
+        program: str | Program,
+        limits: Limits | None = None,
+        *,
+        slice_size: int = 1000,
+        seed: int | None = None,
+    ):
+        """
+        :param program: the source code, or a program from compile_program()
+        :param limits: resources the program may use
+        :param slice_size: number of statements executed between yields
+        :param seed: seed for RANDOM, by default it's unpredictable
+        """
+        if isinstance(program, str):
+            program = compile_program(program)
+        if limits is None:
+            limits = Limits()
+        self._output = io.BytesIO()
+        self._input = InputReader.from_bytes(b"")
+        self.interpreter = ResumableInterpreter(
+            VariableState(),
+            memo_size=limits.memo_size,
+            max_depth=limits.max_call_depth,
+            output=OutputWriter(self._output, FlushPolicy.EXIT),
+            input=self._input,
+            max_steps=limits.max_steps,
+            max_memory=limits.max_memory,
+            track_memory=limits.track_memory,
+            slice_size=slice_size,
+        )
+        if seed is not None:
+            self.interpreter.random = random.Random(seed)
+        self._execution = self.interpreter.execute(program)
+        self._input_event = asyncio.Event()
+        self.waiting_for_input = False
+        self.error = None
+        self.finished = False
+
+    def send_input(self, text: str) -> None:
+        """Send input to the program, lines must end with a newline"""
+        self._input.feed(text)
+        self._input_event.set()
+
+    def end_input(self) -> None:
+        """Signal that no more input will be sent"""
+        self._input.end()
+        self._input_event.set()
+
+    def take_output(self) -> bytes:
+        """Get the output written since the last call"""
+        self.interpreter.output.flush()
+        output = self._output.getvalue()
+        self._output.seek(0)
+        self._output.truncate()
+        return output
+
+    async def run(self) -> None:
+        """Run the program until it ends, waiting whenever it needs input"""
+        try:
+            for suspension in self._execution:
+                if suspension is Suspension.INPUT:
+                    self.waiting_for_input = True
+                    await self._input_event.wait()
+                    self._input_event.clear()
+                    self.waiting_for_input = False
+                else:
+                    # Let other sessions run
+                    await asyncio.sleep(0)
+        except InterpreterError as e:
+            self.error = e
+        finally:
+            self.finished = True
+            self._execution.close()
+
+    def close(self) -> None:
+        """Stop a program which hasn't finished"""
+        self._execution.close()
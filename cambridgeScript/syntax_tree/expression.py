@@ -4,6 +4,7 @@ __all__ = [
     "BinaryOp",
     "UnaryOp",
     "FunctionCall",
+    "BuiltinCall",
     "ArrayIndex",
     "Literal",
     "Identifier",
@@ -53,6 +54,20 @@ class FunctionCall(Expression):
         return visitor.visit_function_call(self)
 
 
+@dataclass
+class BuiltinCall(Expression):
+    """A call to a library function, bound before the program is executed"""
+
+    name: IdentifierToken
+    function: Callable[..., Value]
+    params: list[Expression]
+    # Whether the function takes the interpreter as its first argument
+    contextual: bool = False
+
+    def accept(self, visitor: "ExpressionVisitor") -> Any:
+        return visitor.visit_builtin_call(self)
+
+
 @dataclass
 class ArrayIndex(Expression):
     array: Expression
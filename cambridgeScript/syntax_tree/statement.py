@@ -217,6 +217,9 @@ class AssignmentStmt(Statement):
 @dataclass
 class Program(Statement):
     statements: list[Statement]
+    # Whether calls to library functions were bound, by resolve_builtins().
+    # Not a field, so it doesn't take part in comparisons or hashing
+    builtins_resolved = False
 
     def accept(self, visitor: "StatementVisitor") -> Any:
         return visitor.visit_program(self)
@@ -14,7 +14,9 @@ from cambridgeScript.syntax_tree import Expression
 class PrimitiveType(Enum):
     INTEGER = int
     REAL = float
-    CHAR = str
+    # Also held in a str, but given another value so it isn't an alias of
+    # STRING, as a CHAR is a single character
+    CHAR = "char"
     STRING = str
     BOOLEAN = bool
 
@@ -26,6 +26,10 @@ class ExpressionVisitor(ABC):
     def visit_function_call(self, expr: FunctionCall) -> Any:
         pass
 
+    @abstractmethod
+    def visit_builtin_call(self, expr: BuiltinCall) -> Any:
+        pass
+
     @abstractmethod
     def visit_array_index(self, expr: ArrayIndex) -> Any:
         pass
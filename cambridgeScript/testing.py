@@ -0,0 +1,191 @@
+"""
+Runs a program against a directory of test cases.
+
+A test case is a pair of files NAME.in and NAME.out, the input given to the
+program and the output expected from it. The program is parsed once, and the
+cases are run on a pool of processes. Output is compared with the expected
+output as it is written, so transcripts are never held in memory, and a
+program stops as soon as its output is wrong.
+"""
+
+__all__ = [
+    "TestCase",
+    "find_cases",
+    "run_tests",
+]
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from cambridgeScript.api import Limits, compile_program, run
+from cambridgeScript.cache import ResultCache
+from cambridgeScript.interpreter.coverage import Coverage
+from cambridgeScript.syntax_tree import Program
+
+
+@dataclass
+class TestCase:
+    name: str
+    input_path: str
+    expected_path: str
+
+
+def find_cases(directory: str) -> list[TestCase]:
+    """Find the NAME.in and NAME.out pairs in a directory, sorted by name"""
+    cases = []
+    for entry in sorted(os.listdir(directory)):
+        name, extension = os.path.splitext(entry)
+        expected_path = os.path.join(directory, name + ".out")
+        if extension == ".in" and os.path.isfile(expected_path):
+            cases.append(
+                TestCase(name, os.path.join(directory, entry), expected_path)
+            )
+    return cases
+
+
+class _Mismatch(Exception):
+    # Raised to stop a program as soon as its output is wrong
+    pass
+
+
+class _ExpectedOutput:
+    # Binary stream comparing what is written with the expected output
+
+    def __init__(self, expected: BinaryIO):
+        self._expected = expected
+        # Number of the line being compared, from 1
+        self.line = 1
+        self.mismatch: str | None = None
+
+    def write(self, data: bytes) -> None:
+        expected = self._expected.read(len(data))
+        if expected == data:
+            self.line += data.count(b"\n")
+            return
+        # Find the line of the first difference
+        same = 0
+        while same < len(expected) and expected[same] == data[same]:
+            same += 1
+        self.line += data.count(b"\n", 0, same)
+        if same == len(expected):
+            self.mismatch = f"Extra output at line {self.line}"
+        else:
+            self.mismatch = f"Output differs from expected at line {self.line}"
+        raise _Mismatch
+
+    def flush(self) -> None:
+        pass
+
+    def finish(self) -> None:
+        # Checks that all of the expected output was written
+        if self.mismatch is None and self._expected.read(1):
+            self.mismatch = f"Output ended early at line {self.line}"
+
+
+# The program being tested, set in each worker
+_program: Program | None = None
+_limits: Limits | None = None
+_cache: ResultCache | None = None
+# Coverage of all the cases run by the worker
+_coverage: Coverage | None = None
+
+
+def _init_worker(
+    program: Program, limits: Limits, cache_directory: str | None, coverage: bool
+) -> None:
+    global _program, _limits, _cache, _coverage
+    _program = program
+    _limits = limits
+    if cache_directory is not None:
+        _cache = ResultCache(cache_directory)
+    if coverage:
+        _coverage = Coverage(program)
+
+
+def _run_case(case: TestCase) -> dict:
+    start = time.perf_counter()
+    with open(case.input_path, "rb") as stdin, open(case.expected_path, "rb") as file:
+        expected = _ExpectedOutput(file)
+        result = None
+        error = None
+        try:
+            result = run(
+                _program, stdin, expected, _limits, cache=_cache, coverage=_coverage
+            )
+            error = result.error
+        except _Mismatch:
+            pass
+        except Exception as e:
+            # Only this case fails, the others still get a report
+            error = f"{type(e).__name__}: {e}"
+        if error is not None:
+            status, message = "error", str(error)
+        else:
+            expected.finish()
+            if expected.mismatch is None:
+                status, message = "pass", None
+            else:
+                status, message = "fail", expected.mismatch
+    report = {
+        "name": case.name,
+        "status": status,
+        "message": message,
+        "time": time.perf_counter() - start,
+        "peak_memory": None if result is None else result.peak_memory,
+    }
+    if _coverage is not None:
+        report["coverage"] = (bytes(_coverage.executed), bytes(_coverage.taken))
+    return report
+
+
+def run_tests(
+    code: str,
+    directory: str,
+    workers: int | None = None,
+    limits: Limits | None = None,
+    cache_directory: str | None = None,
+    coverage: bool = False,
+) -> dict:
+    """
+    Run a program against the test cases in a directory.
+    :param code: the source code of the program
+    :param directory: directory containing NAME.in and NAME.out files
+    :param workers: number of processes, by default one per CPU
+    :param limits: resources the program may use in each case
+    :param cache_directory: directory to cache the results of cases in, if
+        the program is deterministic, None for no cache
+    :param coverage: whether to record the coverage of the program by all of
+        the cases, see Coverage.report()
+    :return: a report with the number of passed and failed cases, the status,
+        message, time and peak memory (if tracked) of each case, and the
+        coverage if recorded
+    :raises ParserError: if the program is invalid
+    """
+    program = compile_program(code)
+    if limits is None:
+        limits = Limits()
+    cases = find_cases(directory)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        workers,
+        initializer=_init_worker,
+        initargs=(program, limits, cache_directory, coverage),
+    ) as pool:
+        results = list(pool.map(_run_case, cases))
+    passed = sum(result["status"] == "pass" for result in results)
+    report = {
+        "passed": passed,
+        "failed": len(results) - passed,
+        "time": time.perf_counter() - start,
+        "cases": results,
+    }
+    if coverage:
+        # Each worker's bitmaps include all of the cases it ran
+        total = Coverage(program)
+        for result in results:
+            total.merge(*result.pop("coverage"))
+        report["coverage"] = total.report()
+    return report
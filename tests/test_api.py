@@ -0,0 +1,87 @@
+"""
+Running programs through the API. A compiled program is shared by every run
+of it, so runs on many threads must give the same results as sequential runs
+and leave the program unchanged. On free-threaded builds of CPython the runs
+are truly parallel.
+"""
+
+import copy
+import threading
+
+import pytest
+
+from cambridgeScript.api import Limits, ProgramRunner, compile_program, run
+from cambridgeScript.interpreter import resolver
+from cambridgeScript.interpreter.analysis import iter_nodes
+
+PROGRAM = """
+FUNCTION fib(n : INTEGER) RETURNS INTEGER
+    IF n < 2 THEN
+        RETURN n
+    ENDIF
+    RETURN fib(n - 1) + fib(n - 2)
+ENDFUNCTION
+DECLARE n : INTEGER
+DECLARE i : INTEGER
+DECLARE name : STRING
+DECLARE squares : ARRAY[1:20] OF INTEGER
+INPUT n
+INPUT name
+FOR i <- 1 TO 20
+    squares[i] <- i * i + n
+NEXT
+OUTPUT fib(n), " ", UCASE(name), " ", LENGTH(name), " ", squares[n]
+OUTPUT DIV(squares[20], n), " ", MOD(squares[20], n), " ", ROUND(n / 7, 2)
+"""
+
+INPUTS = [f"{n}\nname{n}\n" for n in range(1, 17)]
+
+
+def _results(results) -> list:
+    return [(result.output, str(result.error)) for result in results]
+
+
+@pytest.fixture
+def program():
+    return compile_program(PROGRAM)
+
+
+def test_program_runner_matches_sequential(program):
+    expected = _results(run(program, stdin) for stdin in INPUTS)
+    with ProgramRunner(max_workers=8) as runner:
+        futures = [runner.submit(program, stdin) for stdin in INPUTS * 4]
+        results = _results(future.result() for future in futures)
+    assert results == expected * 4
+
+
+def test_threads_match_sequential(program):
+    expected = _results(run(program, stdin) for stdin in INPUTS)
+    results = [None] * len(INPUTS)
+    barrier = threading.Barrier(len(INPUTS))
+
+    def target(index: int) -> None:
+        # Start every run at the same time
+        barrier.wait()
+        results[index] = run(program, INPUTS[index], limits=Limits(memo_size=64))
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(len(INPUTS))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert _results(results) == expected
+
+
+def test_runs_dont_modify_program(program, monkeypatch):
+    before = copy.deepcopy(program)
+    nodes = [id(node) for node in iter_nodes(program)]
+
+    def rewrite(*args):
+        raise AssertionError("compiled program resolved again")
+
+    monkeypatch.setattr(resolver, "_rewrite", rewrite)
+    with ProgramRunner(max_workers=4) as runner:
+        for future in [runner.submit(program, stdin) for stdin in INPUTS]:
+            assert future.result().ok
+    assert program == before
+    assert [id(node) for node in iter_nodes(program)] == nodes
@@ -0,0 +1,110 @@
+"""
+Exit statuses of the server's client. The server's status for the program is
+passed on, and the client's own failures each have a status of their own.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from cambridgeScript import client, server
+from cambridgeScript.protocol import EXIT, OUTPUT, read_frame, send_frame
+
+
+def _client(tmp_path, socket_path, source: str) -> subprocess.CompletedProcess:
+    program = tmp_path / "program.txt"
+    program.write_text(source)
+    return subprocess.run(
+        [sys.executable, "-m", "cambridgeScript.client", str(program)]
+        + ["--socket", socket_path],
+        input=b"",
+        capture_output=True,
+        timeout=60,
+    )
+
+
+@pytest.fixture
+def server_socket(tmp_path):
+    path = str(tmp_path / "server.sock")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "cambridgeScript.server", "--socket", path]
+    )
+    try:
+        for _ in range(200):
+            if os.path.exists(path):
+                break
+            time.sleep(0.05)
+        yield path
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _fake_server(path: str, frames: list[tuple[bytes, bytes]]) -> threading.Thread:
+    # Replies to one connection with the given frames, then closes it
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+
+    def reply():
+        connection, _ = listener.accept()
+        with connection, listener:
+            read_frame(connection.makefile("rb"))
+            for kind, data in frames:
+                send_frame(connection, kind, data)
+
+    thread = threading.Thread(target=reply, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_program_statuses(tmp_path, server_socket):
+    result = _client(tmp_path, server_socket, 'OUTPUT "hi"\n')
+    assert (result.returncode, result.stdout) == (0, b"hi\n")
+    result = _client(tmp_path, server_socket, "OUTPUT DIV(1, 0)\n")
+    assert result.returncode == 1
+    assert result.stderr.startswith(b"Error:")
+    result = _client(tmp_path, server_socket, "OUTPUT (\n")
+    assert result.returncode == 2
+    assert result.stderr.startswith(b"Syntax error:")
+
+
+def test_no_server(tmp_path):
+    result = _client(tmp_path, str(tmp_path / "missing.sock"), 'OUTPUT "hi"\n')
+    assert result.returncode == client.EXIT_NO_SERVER
+
+
+@pytest.mark.parametrize(
+    "frames, status",
+    [
+        ([(OUTPUT, b"partial")], client.EXIT_CONNECTION_LOST),
+        ([(OUTPUT, b"hi\n"), (b"?", b"")], client.EXIT_BAD_REPLY),
+        ([(EXIT, b"")], client.EXIT_BAD_REPLY),
+        ([(EXIT, bytes([3]))], 3),
+    ],
+)
+def test_client_failures(tmp_path, frames, status):
+    path = str(tmp_path / "fake.sock")
+    thread = _fake_server(path, frames)
+    result = _client(tmp_path, path, 'OUTPUT "hi"\n')
+    thread.join(timeout=10)
+    assert result.returncode == status
+
+
+def test_statuses_are_distinct():
+    statuses = [
+        server.EXIT_OK,
+        server.EXIT_RUNTIME_ERROR,
+        server.EXIT_SYNTAX_ERROR,
+        server.EXIT_PROTOCOL_ERROR,
+        server.EXIT_INTERNAL_ERROR,
+        client.EXIT_NO_SERVER,
+        client.EXIT_CONNECTION_LOST,
+        client.EXIT_BAD_REPLY,
+    ]
+    assert len(set(statuses)) == len(statuses)
@@ -0,0 +1,46 @@
+"""
+Values read by INPUT and READFILE.
+"""
+
+import pytest
+
+from cambridgeScript.api import run
+from cambridgeScript.interpreter.console import parse_value
+from cambridgeScript.syntax_tree import PrimitiveType
+
+
+@pytest.mark.parametrize("text", ["a", " ", "7", "é"])
+def test_char(text):
+    assert parse_value(text, PrimitiveType.CHAR) == text
+
+
+@pytest.mark.parametrize("text", ["", "ab", " a"])
+def test_char_length(text):
+    with pytest.raises(ValueError, match="Expected a CHAR"):
+        parse_value(text, PrimitiveType.CHAR)
+
+
+def test_input_char():
+    code = """
+    DECLARE c : CHAR
+    INPUT c
+    OUTPUT c, c
+    """
+    assert run(code, "x\n").output == b"xx\n"
+    assert "Expected a CHAR" in str(run(code, "xy\n").error)
+
+
+def test_read_file_char(tmp_path):
+    (tmp_path / "chars.txt").write_text("q\nqq\n")
+    result = run(
+        """
+        DECLARE c : CHAR
+        OPENFILE "chars.txt" FOR READ
+        READFILE "chars.txt", c
+        OUTPUT c
+        READFILE "chars.txt", c
+        """,
+        directory=str(tmp_path),
+    )
+    assert result.output == b"q\n"
+    assert "Expected a CHAR" in str(result.error)
@@ -0,0 +1,35 @@
+"""
+Statement and branch coverage. Only code the interpreter can run is counted,
+so a program can always reach full coverage.
+"""
+
+from cambridgeScript.api import compile_program, run
+from cambridgeScript.interpreter.coverage import Coverage
+
+PROGRAM = """
+DECLARE n : INTEGER
+INPUT n
+IF n > 0 THEN
+    OUTPUT "positive"
+ELSE
+    OUTPUT "not positive"
+ENDIF
+CASE OF n
+    1 : OUTPUT "one"
+    2 : IF n = 2 THEN
+            OUTPUT "two"
+        ENDIF
+    OTHERWISE : OUTPUT "other"
+ENDCASE
+"""
+
+
+def test_case_is_left_out():
+    coverage = Coverage(compile_program(PROGRAM))
+    assert [label for _, label in coverage.branches] == ["THEN", "ELSE"]
+    for stdin in ("1\n", "0\n"):
+        run(coverage.program, stdin, coverage=coverage)
+    report = coverage.report()
+    assert report["statements"]["executed"] == report["statements"]["total"] == 6
+    assert report["branches"]["taken"] == report["branches"]["total"] == 2
+    assert report["missed_branches"] == []
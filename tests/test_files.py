@@ -0,0 +1,59 @@
+"""
+Files used by programs run with a directory can't be outside of it.
+"""
+
+import pytest
+
+from cambridgeScript.api import run
+
+READ = """
+DECLARE line : STRING
+OPENFILE "{name}" FOR READ
+READFILE "{name}", line
+CLOSEFILE "{name}"
+OUTPUT line
+"""
+
+WRITE = """
+OPENFILE "{name}" FOR WRITE
+WRITEFILE "{name}", "written"
+CLOSEFILE "{name}"
+"""
+
+
+@pytest.fixture
+def directory(tmp_path):
+    (tmp_path / "secret.txt").write_text("secret\n")
+    root = tmp_path / "root"
+    (root / "sub").mkdir(parents=True)
+    (root / "in.txt").write_text("inside\n")
+    return root
+
+
+@pytest.mark.parametrize("name", ["in.txt", "sub/../in.txt", "./in.txt"])
+def test_inside(directory, name):
+    result = run(READ.format(name=name), directory=str(directory))
+    assert result.ok, result.error
+    assert result.output == b"inside\n"
+
+
+def test_absolute_name(directory):
+    name = str(directory.parent / "secret.txt")
+    for code in (READ, WRITE):
+        result = run(code.format(name=name), directory=str(directory))
+        assert "outside the program's directory" in str(result.error)
+    assert (directory.parent / "secret.txt").read_text() == "secret\n"
+
+
+@pytest.mark.parametrize("name", ["../secret.txt", "sub/../../secret.txt"])
+def test_parent_directory(directory, name):
+    for code in (READ, WRITE):
+        result = run(code.format(name=name), directory=str(directory))
+        assert "outside the program's directory" in str(result.error)
+    assert (directory.parent / "secret.txt").read_text() == "secret\n"
+
+
+def test_symbolic_link(directory):
+    (directory / "link.txt").symlink_to(directory.parent / "secret.txt")
+    result = run(READ.format(name="link.txt"), directory=str(directory))
+    assert "outside the program's directory" in str(result.error)
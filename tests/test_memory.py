@@ -0,0 +1,58 @@
+"""
+Memory limits. Every allocation a program makes has to be charged, and large
+ones before they are made.
+"""
+
+from dataclasses import replace
+
+from cambridgeScript.api import Limits, compile_program, run
+from cambridgeScript.interpreter.arrays import Array
+from cambridgeScript.interpreter.console import OutputWriter
+from cambridgeScript.interpreter.interpreter import Interpreter, LimitExceeded
+from cambridgeScript.interpreter.variables import VariableState
+
+SPARSE = """
+DECLARE cells : ARRAY[1:1000000] OF INTEGER
+DECLARE i : INTEGER
+FOR i <- 1 TO 1000000
+    cells[i] <- i
+NEXT
+"""
+
+STRINGS = """
+DECLARE names : ARRAY[1:20000] OF STRING
+DECLARE i : INTEGER
+FOR i <- 1 TO 20000
+    names[i] <- "name"
+NEXT
+OUTPUT names[20000]
+"""
+
+
+def test_dense_buffer_checked_before_materializing():
+    interpreter = Interpreter(
+        VariableState(), output=OutputWriter.to_bytes(), max_memory=6_000_000
+    )
+    try:
+        interpreter.visit(compile_program(SPARSE))
+    except LimitExceeded as e:
+        assert e.limit == "memory"
+        assert e.line == 5
+    else:
+        assert False, "the memory limit wasn't enforced"
+    cells = interpreter.variable_state.variables["cells"]
+    assert isinstance(cells, Array)
+    # The 8MB buffer was never allocated
+    assert cells.representation == "sparse"
+
+
+def test_parallel_string_writes_are_charged():
+    program = compile_program(STRINGS)
+    for limits in (Limits(), Limits(workers=2)):
+        result = run(program, "", limits=replace(limits, max_memory=200_000))
+        assert isinstance(result.error, LimitExceeded)
+        assert result.error.line == 5
+        result = run(program, "", limits=replace(limits, track_memory=True))
+        assert result.error is None
+        assert result.output == b"name\n"
+        assert result.peak_memory >= 80_000 + 160_000
@@ -0,0 +1,144 @@
+"""
+Calls in any statement of an interactive program can be suspended, for a
+slice of statements or for input.
+"""
+
+import asyncio
+
+from cambridgeScript.sessions import Session
+
+# Runs a loop, so calling it spans several slices of 10 statements
+LOOP = """
+FUNCTION f(n : INTEGER) RETURNS INTEGER
+    DECLARE i : INTEGER
+    DECLARE total : INTEGER
+    total <- 0
+    FOR i <- 1 TO n
+        total <- total + 1
+    NEXT
+    RETURN total
+ENDFUNCTION
+"""
+
+# Waits for input
+READ = """
+FUNCTION g(k : INTEGER) RETURNS INTEGER
+    DECLARE n : INTEGER
+    INPUT n
+    RETURN n
+ENDFUNCTION
+"""
+
+
+def _run(code: str, input: str = "", directory=None) -> Session:
+    session = Session(code, slice_size=10)
+    if directory is not None:
+        session.interpreter.files.directory = str(directory)
+
+    async def main():
+        task = asyncio.create_task(session.run())
+        # Input is only sent once the program waits for it
+        for line in input.splitlines(keepends=True):
+            while not session.waiting_for_input and not session.finished:
+                await asyncio.sleep(0)
+            session.send_input(line)
+            # Let the program take the line before checking if it waits again
+            await asyncio.sleep(0)
+        session.end_input()
+        await task
+
+    asyncio.run(main())
+    assert session.error is None, session.error
+    return session
+
+
+def test_declare_bounds():
+    session = _run(
+        LOOP
+        + """
+        DECLARE a : ARRAY[1:f(100)] OF INTEGER
+        a[100] <- 5
+        OUTPUT a[100]
+        """
+    )
+    assert session.take_output() == b"5\n"
+
+
+def test_declare_bounds_input():
+    session = _run(
+        READ
+        + """
+        DECLARE a : ARRAY[1:g(0)] OF INTEGER
+        a[3] <- 5
+        OUTPUT a[3]
+        """,
+        "3\n",
+    )
+    assert session.take_output() == b"5\n"
+
+
+def test_write_file(tmp_path):
+    _run(
+        LOOP
+        + """
+        OPENFILE "out.txt" FOR WRITE
+        WRITEFILE "out.txt", f(100)
+        CLOSEFILE "out.txt"
+        """,
+        directory=tmp_path,
+    )
+    assert (tmp_path / "out.txt").read_text() == "100\n"
+
+
+def test_input_target_index():
+    session = _run(
+        LOOP
+        + """
+        DECLARE a : ARRAY[1:100] OF INTEGER
+        INPUT a[f(50)]
+        OUTPUT a[50]
+        """,
+        "7\n",
+    )
+    assert session.take_output() == b"7\n"
+
+
+def test_input_target_index_input():
+    session = _run(
+        READ
+        + """
+        DECLARE a : ARRAY[1:5] OF INTEGER
+        INPUT a[g(0)]
+        OUTPUT a[4]
+        """,
+        "7\n4\n",
+    )
+    assert session.take_output() == b"7\n"
+
+
+def test_read_file_target_index(tmp_path):
+    (tmp_path / "in.txt").write_text("9\n")
+    session = _run(
+        LOOP
+        + """
+        DECLARE a : ARRAY[1:100] OF INTEGER
+        OPENFILE "in.txt" FOR READ
+        READFILE "in.txt", a[f(20)]
+        CLOSEFILE "in.txt"
+        OUTPUT a[20]
+        """,
+        directory=tmp_path,
+    )
+    assert session.take_output() == b"9\n"
+
+
+def test_assignment_target_index():
+    session = _run(
+        LOOP
+        + """
+        DECLARE a : ARRAY[1:100] OF INTEGER
+        a[f(30)] <- 2
+        OUTPUT a[30]
+        """
+    )
+    assert session.take_output() == b"2\n"
@@ -0,0 +1,35 @@
+"""
+String functions must give the same results for ropes, the strings built up
+by concatenation, as for plain strings.
+"""
+
+from cambridgeScript.api import compile_program, run
+from cambridgeScript.interpreter.strings import Rope, lcase, ucase
+
+PROGRAM = """
+DECLARE word : STRING
+DECLARE i : INTEGER
+word <- ""
+FOR i <- 1 TO 3
+    word <- word + "ΟΔΟΣ"
+    word <- word + "ΑΣ "
+NEXT
+OUTPUT LCASE(word)
+OUTPUT UCASE(LCASE(word) + "straße")
+"""
+
+
+def test_case_mapping_across_pieces():
+    rope = Rope("ΟΔΟΣ") + "Α" + "Σ"
+    assert lcase(rope) == "οδοσας"
+    assert ucase(Rope("stra") + "ße") == "STRASSE"
+    ascii_rope = Rope("Hello") + ", " + "World"
+    assert isinstance(lcase(ascii_rope), Rope)
+    assert str(lcase(ascii_rope)) == "hello, world"
+    assert str(ucase(ascii_rope)) == "HELLO, WORLD"
+
+
+def test_case_mapping_in_program():
+    word = "ΟΔΟΣΑΣ " * 3
+    expected = f"{word.lower()}\n{(word.lower() + 'straße').upper()}\n"
+    assert run(compile_program(PROGRAM), "").output == expected.encode()
@@ -0,0 +1,63 @@
+"""
+Events reported by tracing hooks.
+"""
+
+from cambridgeScript.api import compile_program
+from cambridgeScript.interpreter.console import OutputWriter
+from cambridgeScript.interpreter.stack import StackInterpreter
+from cambridgeScript.interpreter.tracing import TraceEvent, set_trace
+from cambridgeScript.interpreter.variables import VariableState
+
+
+def _calls(code: str) -> list[tuple[str, str, dict]]:
+    # The CALL and RETURN events, with the routine and its variables
+    interpreter = StackInterpreter(VariableState(), output=OutputWriter.to_bytes())
+    events = []
+
+    def hook(event, line, state, arg):
+        if event in (TraceEvent.CALL, TraceEvent.RETURN):
+            events.append((event.name, arg.name.value, dict(state.variables)))
+
+    set_trace(interpreter, hook)
+    interpreter.visit(compile_program(code))
+    return events
+
+
+def test_tail_call_order():
+    events = _calls(
+        """
+        FUNCTION g(y : INTEGER) RETURNS INTEGER
+            RETURN y + 1
+        ENDFUNCTION
+        FUNCTION f(x : INTEGER) RETURNS INTEGER
+            RETURN g(x * 2)
+        ENDFUNCTION
+        OUTPUT f(3)
+        """
+    )
+    assert events == [
+        ("CALL", "f", {"x": 3}),
+        ("RETURN", "f", {"x": 3}),
+        ("CALL", "g", {"y": 6}),
+        ("RETURN", "g", {"y": 6}),
+    ]
+
+
+def test_nested_call_order():
+    events = _calls(
+        """
+        FUNCTION g(y : INTEGER) RETURNS INTEGER
+            RETURN y + 1
+        ENDFUNCTION
+        FUNCTION f(x : INTEGER) RETURNS INTEGER
+            RETURN g(x * 2) + 1
+        ENDFUNCTION
+        OUTPUT f(3)
+        """
+    )
+    assert events == [
+        ("CALL", "f", {"x": 3}),
+        ("CALL", "g", {"y": 6}),
+        ("RETURN", "g", {"y": 6}),
+        ("RETURN", "f", {"x": 3}),
+    ]
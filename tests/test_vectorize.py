@@ -0,0 +1,229 @@
+"""
+Loops run by the LoopVectorizer must give the same results as interpreting
+them one iteration at a time.
+"""
+
+import warnings
+
+import pytest
+
+from cambridgeScript.api import compile_program
+from cambridgeScript.interpreter.console import OutputWriter
+from cambridgeScript.interpreter.interpreter import Interpreter
+from cambridgeScript.interpreter.variables import VariableState
+from cambridgeScript.interpreter.vectorize import np
+
+pytestmark = pytest.mark.skipif(np is None, reason="NumPy isn't installed")
+
+INTEGERS = """
+DECLARE a : ARRAY[1:6] OF INTEGER
+a[1] <- 4
+a[2] <- -7
+a[3] <- 12
+a[4] <- 12
+a[5] <- 0
+a[6] <- -7
+DECLARE i : INTEGER
+"""
+
+REALS = """
+DECLARE a : ARRAY[1:6] OF REAL
+a[1] <- 0.1
+a[2] <- -2.5
+a[3] <- 10000000000000000.0
+a[4] <- 0.2
+a[5] <- -10000000000000000.0
+a[6] <- 0.3
+DECLARE i : INTEGER
+"""
+
+
+def _run(code: str, vectorize: bool) -> tuple[bytes, bool]:
+    # The output of a program, and whether any loop was vectorized
+    output = OutputWriter.to_bytes()
+    interpreter = Interpreter(VariableState(), output=output)
+    vectorized = False
+    if vectorize:
+        run = interpreter._vectorizer.run
+
+        def spy(*args):
+            nonlocal vectorized
+            done = run(*args)
+            vectorized |= done
+            return done
+
+        interpreter._vectorizer.run = spy
+    else:
+        interpreter._vectorizer = None
+    interpreter.visit(compile_program(code))
+    return output.getvalue(), vectorized
+
+
+def _check(code: str, vectorized: bool = True) -> None:
+    expected, _ = _run(code, vectorize=False)
+    output, ran = _run(code, vectorize=True)
+    assert output == expected
+    assert ran is vectorized
+
+
+@pytest.mark.parametrize("array", [INTEGERS, REALS])
+@pytest.mark.parametrize("start", ["0", "0.5", "9007199254740993"])
+@pytest.mark.parametrize("loop", ["1 TO 6", "6 TO 1 STEP -1", "2 TO 5 STEP 2"])
+def test_sum(array, start, loop):
+    vectorized = not (array is REALS and start == "9007199254740993")
+    _check(
+        array
+        + f"""
+        DECLARE total : REAL
+        total <- {start}
+        FOR i <- {loop}
+            total <- total + a[i]
+        NEXT
+        OUTPUT total
+        OUTPUT i
+        """,
+        vectorized,
+    )
+
+
+@pytest.mark.parametrize("array", [INTEGERS, REALS])
+@pytest.mark.parametrize("operator", [">", "<"])
+@pytest.mark.parametrize("start", ["0", "-100", "100", "12"])
+def test_extremum(array, operator, start):
+    _check(
+        array
+        + f"""
+        DECLARE m : REAL
+        m <- {start}
+        FOR i <- 1 TO 6
+            IF a[i] {operator} m THEN
+                m <- a[i]
+            ENDIF
+        NEXT
+        OUTPUT m
+        """
+    )
+
+
+@pytest.mark.parametrize(
+    "array, expression",
+    [
+        (INTEGERS, "a[i] * 3"),
+        (INTEGERS, "a[i] - 5"),
+        (INTEGERS, "10 - a[i]"),
+        (REALS, "a[i] * 0.5"),
+        (REALS, "a[i] + 3"),
+        (REALS, "a[i] / 4"),
+        (REALS, "1 - a[i]"),
+    ],
+)
+def test_element_wise(array, expression):
+    _check(
+        array
+        + f"""
+        FOR i <- 1 TO 6
+            a[i] <- {expression}
+        NEXT
+        DECLARE j : INTEGER
+        FOR j <- 1 TO 6
+            OUTPUT a[j]
+        NEXT
+        """
+    )
+
+
+@pytest.mark.parametrize("array", [INTEGERS, REALS])
+@pytest.mark.parametrize("target", ["12", "-7", "0.2", "5", "12.0"])
+def test_search(array, target):
+    _check(
+        array
+        + f"""
+        DECLARE found : INTEGER
+        found <- 0
+        FOR i <- 1 TO 6
+            IF a[i] = {target} THEN
+                found <- i
+            ENDIF
+        NEXT
+        OUTPUT found
+        """
+    )
+
+
+def test_search_real_for_large_integer():
+    # 2^53 + 1 isn't equal to 2^53 as a Python int, but it is as a float
+    _check(
+        """
+        DECLARE a : ARRAY[1:3] OF REAL
+        a[1] <- 1.5
+        a[2] <- 9007199254740992.0
+        a[3] <- 2.5
+        DECLARE i : INTEGER
+        DECLARE found : INTEGER
+        found <- 0
+        FOR i <- 1 TO 3
+            IF a[i] = 9007199254740993 THEN
+                found <- i
+            ENDIF
+        NEXT
+        OUTPUT found
+        """,
+        vectorized=False,
+    )
+
+
+def test_search_large_integer_for_real():
+    _check(
+        """
+        DECLARE a : ARRAY[1:3] OF INTEGER
+        a[1] <- 1
+        a[2] <- 9007199254740993
+        a[3] <- 2
+        DECLARE i : INTEGER
+        DECLARE found : INTEGER
+        found <- 0
+        FOR i <- 1 TO 3
+            IF a[i] = 9007199254740992.0 THEN
+                found <- i
+            ENDIF
+        NEXT
+        OUTPUT found
+        """,
+        vectorized=False,
+    )
+
+
+def test_overflow_is_silent():
+    # inf and NaN come out of the loops without NumPy warning about them
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        _check(
+            """
+            DECLARE a : ARRAY[1:4] OF REAL
+            DECLARE i : INTEGER
+            DECLARE k : INTEGER
+            DECLARE total : REAL
+            DECLARE big : REAL
+            a[1] <- 10000000000.0
+            a[2] <- -10000000000.0
+            a[3] <- 1.5
+            a[4] <- 0.0
+            FOR k <- 1 TO 40
+                FOR i <- 1 TO 4
+                    a[i] <- a[i] * 10000000000.0
+                NEXT
+            NEXT
+            total <- 0
+            FOR i <- 1 TO 4
+                total <- total + a[i]
+            NEXT
+            OUTPUT total
+            big <- a[1]
+            FOR i <- 1 TO 4
+                a[i] <- a[i] - big
+            NEXT
+            FOR i <- 1 TO 4
+                OUTPUT a[i]
+            NEXT
+            """
+        )